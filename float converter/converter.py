@@ -1,4 +1,8 @@
-import struct
+import os
+import sys
+# decoder register dipakai bersama logger / debug: satu file di qt-pymodbus-logger
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'qt-pymodbus-logger'))
+from register_decoder import decode_values, encode_value
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QComboBox,
     QPushButton, QGridLayout, QMessageBox
@@ -57,16 +61,7 @@ class ModbusFloatConverter(QWidget):
             r2 = int(self.reg2_input.text())
             encoding = self.encoding_box.currentText()
 
-            # ubah ke bytes sesuai encoding
-            bytes_order = {
-                "ABCD": [r1 >> 8, r1 & 0xFF, r2 >> 8, r2 & 0xFF],
-                "BADC": [r1 & 0xFF, r1 >> 8, r2 & 0xFF, r2 >> 8],
-                "CDAB": [r2 >> 8, r2 & 0xFF, r1 >> 8, r1 & 0xFF],
-                "DCBA": [r2 & 0xFF, r2 >> 8, r1 & 0xFF, r1 >> 8],
-            }[encoding]
-
-            b = bytes(bytes_order)
-            f = struct.unpack(">f", b)[0]
+            f = decode_values([r1, r2], "float32" + encoding)[0]
             self.float_result.setText(f"Result: {f:.6f}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal konversi ke float:\n{e}")
@@ -75,19 +70,7 @@ class ModbusFloatConverter(QWidget):
         try:
             f = float(self.float_input.text())
             encoding = self.encoding_box.currentText()
-            b = struct.pack(">f", f)
-            b_list = list(b)
-
-            # urutkan kembali sesuai encoding
-            order_map = {
-                "ABCD": b_list,
-                "BADC": [b_list[1], b_list[0], b_list[3], b_list[2]],
-                "CDAB": [b_list[2], b_list[3], b_list[0], b_list[1]],
-                "DCBA": [b_list[3], b_list[2], b_list[1], b_list[0]],
-            }[encoding]
-
-            r1 = (order_map[0] << 8) + order_map[1]
-            r2 = (order_map[2] << 8) + order_map[3]
+            r1, r2 = encode_value(f, "float32" + encoding)
             self.uint_result.setText(f"Registers: {r1} , {r2}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal konversi ke uint16:\n{e}")
@@ -1,3 +1,4 @@
+import os
 import sys
 from datetime import datetime
 from PyQt5.QtWidgets import (
@@ -12,6 +13,10 @@ import glob
 #Pilih versi pymodbus yang dipakai
 #from modbus_client import ModbusClient
 from modbus_client_v3 import ModbusClient
+# decoder register dipakai bersama logger / converter: satu file di qt-pymodbus-logger
+# (append: modbus_client_v3 di folder ini tetap yang dipakai)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'qt-pymodbus-logger'))
+from register_decoder import decode_values, parse_encoding
 
 class ModbusGUI(QWidget):
     def __init__(self):
@@ -70,6 +75,8 @@ class ModbusGUI(QWidget):
         self.qty_edit = QSpinBox(); self.qty_edit.setRange(0, 1000); self.qty_edit.setValue(1)
         self.encoding_combo = QComboBox()
         self.encoding_combo.addItems(["float32[ABCD]", "float32[DCBA]", "float32[CDAB]", "float32[BADC]", "u16"])
+        self.encoding_combo.addItems(["int16"] + [f"{t}[{o}]" for t in ("int32", "uint32", "float64", "int64")
+                                                  for o in ("ABCD", "DCBA", "CDAB", "BADC")])
         self.interval_spin = QDoubleSpinBox()
         self.interval_spin.setRange(0.1, 600.0); self.interval_spin.setValue(1.0)
         self.func_combo = QComboBox()
@@ -255,28 +262,13 @@ class ModbusGUI(QWidget):
             self.table.setItem(0, 1, QTableWidgetItem("No data"))
             return
 
-        entries = []
-        if encoding.startswith('float32'):
-            for i in range(0, len(regs), 2):
-                try:
-                    a = regs[i]
-                    b = regs[i + 1] if i + 1 < len(regs) else 0
-                    if encoding == 'float32be' or encoding == 'float32[abcd]':
-                        v = ModbusClient.decode_float32_from_regs(a, b, encoding='ABCD')
-                    elif encoding == 'float32le' or encoding == 'float32[dcba]':
-                        v = ModbusClient.decode_float32_from_regs(a, b, encoding='DCBA')
-                    elif encoding == 'float32cdab' or encoding == 'float32[cdab]':
-                        v = ModbusClient.decode_float32_from_regs(a, b, encoding='CDAB')
-                    elif encoding == 'float32badc' or encoding == 'float32[badc]':
-                        v = ModbusClient.decode_float32_from_regs(a, b, encoding='BADC')
-                    else:
-                        # default to ABCD
-                        v = ModbusClient.decode_float32_from_regs(a, b, encoding='ABCD')
-                except Exception:
-                    v = None
-                entries.append(v)
-        elif encoding == "u16":
-            for r in regs: entries.append(ModbusClient.decode_u16(r))
+        # decode seluruh blok sekaligus; word terakhir yang kurang diisi 0
+        try:
+            width = parse_encoding(encoding).width
+            regs = list(regs) + [0] * (-len(regs) % width)
+            entries = decode_values(regs, encoding)
+        except Exception:
+            entries = []
 
         self.table.setRowCount(len(entries))
         for i, val in enumerate(entries):
@@ -0,0 +1,477 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient
+except Exception:
+    raise ImportError('pymodbus >= 3.0 async clients not found; install pymodbus>=3')
+
+from connection_manager import TRANSPORT_ERRORS
+from metrics import registry
+from modbus_client_v3 import device_key
+from modbus_worker import LINK_KEYS
+from poll_plan import compile_plan
+from scheduler import DEVICE_SINK_KEYS, link_key
+from timing import FixedRateTimer
+
+
+# nama argumen unit ID per versi pymodbus (dihitung sekali)
+DEVICE_KEY = device_key()
+
+# nama method baca pada client async pymodbus
+ASYNC_READ_METHODS = {
+    'holding': 'read_holding_registers', 'input': 'read_input_registers',
+    'coils': 'read_coils', 'discrete': 'read_discrete_inputs',
+}
+
+
+class AsyncConnection:
+    """
+    Versi asyncio dari ConnectionManager: satu client async per link,
+    dipakai ulang antar poll, reconnect dengan backoff.
+    Lock menjaga agar device di link yang sama tidak saling tumpuk request.
+    """
+
+    def __init__(self, cfg, backoff_initial=0.5, backoff_max=30.0):
+        self.cfg = cfg
+        self.mode = cfg.get('type', 'rtu').lower()
+        self.backoff_initial = float(backoff_initial)
+        self.backoff_max = float(backoff_max)
+        self.client = None
+        self.lock = asyncio.Lock()
+
+        self.connects = 0
+        self.reuses = 0
+        self.failures = 0
+        self.drops = 0
+
+        self._delay = self.backoff_initial
+        self._next_attempt = 0.0
+
+    def _make_client(self):
+        timeout = float(self.cfg.get('timeout', 1))
+        if self.mode == 'rtu':
+            return AsyncModbusSerialClient(
+                port=self.cfg.get('port', '/dev/ttyUSB0'),
+                baudrate=int(self.cfg.get('baudrate', 9600)),
+                bytesize=int(self.cfg.get('bytesize', 8)),
+                parity=self.cfg.get('parity', 'N'),
+                stopbits=int(self.cfg.get('stopbits', 1)),
+                timeout=timeout,
+                reconnect_delay=0,
+            )
+        return AsyncModbusTcpClient(
+            host=self.cfg.get('host', '127.0.0.1'),
+            port=int(self.cfg.get('tcp_port', 502)),
+            timeout=timeout,
+            reconnect_delay=0,
+        )
+
+    async def acquire(self):
+        if self.client is not None and self.client.connected:
+            self.reuses += 1
+            return self.client
+
+        now = time.monotonic()
+        if now < self._next_attempt:
+            raise ConnectionError(
+                f'Modbus reconnect backoff, retry in {self._next_attempt - now:.1f}s')
+
+        self._drop()
+        client = self._make_client()
+        try:
+            ok = await client.connect()
+        except Exception:
+            ok = False
+
+        if not ok:
+            client.close()
+            self.failures += 1
+            self._next_attempt = now + self._delay
+            self._delay = min(self._delay * 2, self.backoff_max)
+            raise ConnectionError('Cannot open modbus client')
+
+        self.client = client
+        self.connects += 1
+        self._delay = self.backoff_initial
+        self._next_attempt = 0.0
+        return client
+
+    def invalidate(self):
+        if self.client is not None:
+            self.drops += 1
+        self._drop()
+
+    def close(self):
+        self._drop()
+
+    def _drop(self):
+        if self.client is not None:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+            self.client = None
+
+    def stats(self):
+        return {
+            'connects': self.connects,
+            'reuses': self.reuses,
+            'failures': self.failures,
+            'drops': self.drops,
+        }
+
+
+class AsyncPoller:
+    """
+    Padanan ModbusPoller untuk asyncio. Rencana baca sama (plan_reads),
+    hasil diteruskan ke logger BaseLogger lewat satu thread sink
+    agar urutan tulis tetap dan event loop tidak ikut tertahan.
+    """
+
+    def __init__(self, cfg, conn, logger_list=None, points=None, sink_executor=None, plan=None):
+        self.cfg = cfg
+        self.name = cfg.get('name', 'device')
+        self.conn = conn
+        self.logger_list = logger_list or []
+        self.sink_executor = sink_executor
+        self.plan = plan or compile_plan(cfg, points, where=f'[Device:{self.name}]')
+        self.unit_id = self.plan.unit_id
+        self.interval_s = max(0.05, self.plan.interval_s)
+        self.timer = FixedRateTimer(
+            self.interval_s,
+            align=str(cfg.get('align', 'true')).lower() in ('1', 'true', 'yes'),
+            overrun=cfg.get('overrun', 'late').lower(),
+        )
+
+        self.points = self.plan.points
+        self.blocks = self.plan.blocks
+        # method baca terikat per client; diikat ulang bila client berganti
+        self._bound_client = None
+        self._readers = ()
+        self.metrics = registry.device(self.name)
+        # di-set saat device dilepas (hot reload) atau engine berhenti
+        self.stop_event = asyncio.Event()
+
+    def reconfigure(self, cfg, plan, conn=None):
+        """
+        Padanan ModbusPoller.reconfigure untuk thread event loop: plan,
+        interval/overrun timer dan conn diganti bila berubah. Logger diganti
+        lewat replace_loggers() di thread sink. Return daftar perubahan.
+        """
+        changes = []
+        old = self.plan
+        self.cfg = cfg
+        self.plan = plan
+        if (plan.unit_id, plan.points, plan.requests) != (old.unit_id, old.points, old.requests):
+            self.unit_id = plan.unit_id
+            self.points = plan.points
+            self.blocks = plan.blocks
+            self._bound_client = None
+            self._readers = ()
+            changes.append('plan')
+        if plan.interval_s != old.interval_s:
+            self.interval_s = max(0.05, plan.interval_s)
+            self.timer.set_interval(self.interval_s)
+            changes.append('interval')
+        overrun = cfg.get('overrun', 'late').lower()
+        if overrun != self.timer.overrun_policy:
+            self.timer.overrun_policy = overrun
+            changes.append('overrun')
+        if conn is not None and conn is not self.conn:
+            self.conn = conn
+            self._bound_client = None
+            self._readers = ()
+            changes.append('connection')
+        return changes
+
+    def replace_loggers(self, make):
+        """Di thread sink: logger lama ditutup (buffer di-flush) lalu make() dipanggil."""
+        self.close_loggers()
+        self.logger_list = list(make())
+
+    def _bind(self, client):
+        if client is not self._bound_client:
+            self._readers = tuple(getattr(client, ASYNC_READ_METHODS[b.function])
+                                  for b in self.blocks)
+            self._bound_client = client
+        return self._readers
+
+    async def _read_block(self, read, block):
+        rr = await read(block.address, count=block.count, **{DEVICE_KEY: self.unit_id})
+
+        if hasattr(rr, 'isError') and rr.isError():
+            self.metrics.error('request', 'ExceptionResponse')
+            return []
+        if block.function in ('coils', 'discrete'):
+            return getattr(rr, 'bits', [])
+        return getattr(rr, 'registers', [])
+
+    async def run_once(self):
+        m = self.metrics
+        entries = [{'sensor_name': name, 'value': None} for name in self.plan.columns]
+        async with self.conn.lock:
+            # waktu tunggu lock link tidak ikut dihitung
+            t0 = time.perf_counter()
+            try:
+                client = await self.conn.acquire()
+            except Exception as e:
+                m.error('connect', e)
+                raise
+            t1 = time.perf_counter()
+            m.observe('connect', t1 - t0)
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            request_s = decode_s = 0.0
+            try:
+                for read, block in zip(self._bind(client), self.blocks):
+                    regs = await self._read_block(read, block)
+                    t = time.perf_counter()
+                    request_s += t - t1
+                    # satu pass untuk seluruh blok
+                    try:
+                        values = block.decoder.decode(regs)
+                    except Exception as e:
+                        m.error('decode', e)
+                        values = ()
+                    for (idx, _, _), v in zip(block.points, values):
+                        entries[idx]['value'] = v
+                    t1 = time.perf_counter()
+                    decode_s += t1 - t
+            except Exception as e:
+                m.error('request', e)
+                # hanya error jalur yang membuang koneksi bersama link
+                if isinstance(e, TRANSPORT_ERRORS):
+                    self.conn.invalidate()
+                raise
+            m.observe('request', request_s)
+            m.observe('decode', decode_s)
+
+        if self.logger_list:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.sink_executor, self._log, timestamp, entries)
+        m.poll.add(time.perf_counter() - t0)
+        return timestamp, entries
+
+    def _log(self, timestamp, entries):
+        m = self.metrics
+        t = time.perf_counter()
+        for logger in self.logger_list:
+            stage = 'sink:' + type(logger).__name__
+            try:
+                logger.log(timestamp, entries)
+            except Exception as e:
+                m.error(stage, e)
+            t1 = time.perf_counter()
+            m.observe(stage, t1 - t)
+            t = t1
+
+    def close_loggers(self):
+        loggers, self.logger_list = self.logger_list, []
+        for logger in loggers:
+            try:
+                logger.close()
+            except Exception as e:
+                print(f"Logger close error: {e}")
+
+
+class AsyncPollEngine:
+    """
+    Menjalankan banyak device secara bersamaan dalam satu event loop.
+    Device di link berbeda dibaca paralel, sehingga satu siklus poll
+    sekitar satu round trip, bukan N round trip.
+    """
+
+    def __init__(self, devices, points_for=None, loggers_for=None,
+                 on_result=None, on_error=None):
+        self.devices = devices
+        self.points_for = points_for
+        self.loggers_for = loggers_for
+        self.on_result = on_result
+        self.on_error = on_error
+        # config divalidasi di thread pemanggil, sebelum event loop jalan
+        self.plans = [
+            compile_plan(d, points_for(d) if points_for else None,
+                         where=f"[Device:{d.get('name', 'device')}]")
+            for d in devices
+        ]
+        self.conns = {}
+        self.pollers = []
+        self.stats = {}
+        self._tasks = {}
+        self._loop = None
+        self._stop = None
+        self._stopping = False
+        # semua sink dijalankan berurutan di satu thread terpisah
+        self.sink_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sink')
+
+    @staticmethod
+    def _make_conn(d):
+        return AsyncConnection(
+            d,
+            backoff_initial=float(d.get('reconnect_backoff', 0.5)),
+            backoff_max=float(d.get('reconnect_backoff_max', 30.0)),
+        )
+
+    def _conn_for(self, d):
+        key = link_key(d)
+        conn = self.conns.get(key)
+        if conn is None:
+            conn = self.conns[key] = self._make_conn(d)
+        return conn
+
+    def _add(self, d, plan):
+        poller = AsyncPoller(
+            d, self._conn_for(d),
+            logger_list=self.loggers_for(d) if self.loggers_for else None,
+            sink_executor=self.sink_executor,
+            plan=plan,
+        )
+        self.pollers.append(poller)
+        self.stats[poller.name] = {'polls': 0, 'errors': 0, 'last_error': None}
+        if self._loop is not None:
+            self._tasks[poller.name] = self._loop.create_task(self._device_loop(poller))
+
+    def _build(self):
+        # dipanggil di dalam event loop (asyncio.Lock terikat ke loop)
+        for d, plan in zip(self.devices, self.plans):
+            self._add(d, plan)
+
+    async def _device_loop(self, poller):
+        st = self.stats[poller.name]
+        while await poller.timer.wait_async(poller.stop_event):
+            try:
+                ts, entries = await poller.run_once()
+                st['polls'] += 1
+                if self.on_result:
+                    self.on_result(poller.name, ts, entries)
+            except Exception as e:
+                st['errors'] += 1
+                st['last_error'] = f'{type(e).__name__}: {e}'
+                if self.on_error:
+                    self.on_error(poller.name, e)
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        if self._stopping:
+            self._stop.set()
+        if not self.pollers:
+            self._build()
+        self._loop = asyncio.get_running_loop()
+        # task per device; hot reload menambah / melepas task saat berjalan
+        for poller in self.pollers:
+            self._tasks[poller.name] = self._loop.create_task(self._device_loop(poller))
+        try:
+            await self._stop.wait()
+            for poller in self.pollers:
+                poller.stop_event.set()
+            await asyncio.gather(*self._tasks.values())
+        finally:
+            self._loop = None
+            for task in self._tasks.values():
+                task.cancel()
+            for conn in self.conns.values():
+                conn.close()
+            self.sink_executor.shutdown(wait=True)
+            for poller in self.pollers:
+                poller.close_loggers()
+
+    def stop(self):
+        """Harus dipanggil dari thread event loop (pakai call_soon_threadsafe dari luar)."""
+        self._stopping = True
+        if self._stop is not None:
+            self._stop.set()
+
+    def reconfigure(self, devices, points_for=None, loggers_for=None, rebuild_sinks=False):
+        """
+        Hot reload, padanan PollScheduler.reconfigure: device baru ditambah,
+        yang hilang dilepas (logger ditutup), yang berubah hanya diganti
+        bagian yang berubah (plan, interval/overrun, koneksi link, sink).
+        Dipanggil dari thread lain (watcher / GUI); plan dikompilasi di thread
+        pemanggil (ConfigError sebelum ada yang diubah), perubahan dijalankan
+        di event loop dan ditunggu. Return {nama: [perubahan]}.
+        """
+        prev = (self.points_for, self.loggers_for)
+        if points_for is not None:
+            self.points_for = points_for
+        if loggers_for is not None:
+            self.loggers_for = loggers_for
+        try:
+            plans = [
+                compile_plan(d, self.points_for(d) if self.points_for else None,
+                             where=f"[Device:{d.get('name', 'device')}]")
+                for d in devices
+            ]
+        except Exception:
+            # config baru ditolak: fungsi lama tetap dipakai
+            self.points_for, self.loggers_for = prev
+            raise
+        loop = self._loop
+        if loop is None or self._stopping:
+            # belum / sudah tidak berjalan: dipakai saat run() berikutnya
+            if not self.pollers:
+                self.devices, self.plans = list(devices), plans
+            return {}
+        return asyncio.run_coroutine_threadsafe(
+            self._apply(devices, plans, rebuild_sinks), loop).result()
+
+    async def _apply(self, devices, plans, rebuild_sinks):
+        loop = asyncio.get_running_loop()
+        new = {d['name']: (d, plan) for d, plan in zip(devices, plans)}
+        current = {p.name: p for p in self.pollers}
+        changes = {}
+
+        for name in [n for n in current if n not in new]:
+            poller = current.pop(name)
+            # tunggu poll yang sedang jalan selesai, baru logger ditutup
+            poller.stop_event.set()
+            task = self._tasks.pop(name, None)
+            if task is not None:
+                await task
+            self.pollers.remove(poller)
+            self.stats.pop(name, None)
+            await loop.run_in_executor(self.sink_executor, poller.close_loggers)
+            changes[name] = ['removed']
+
+        # parameter link berubah: client baru untuk semua device di link itu
+        stale = []
+        for name, (d, _) in new.items():
+            old = current[name].cfg if name in current else None
+            key = link_key(d)
+            if (old is not None and link_key(old) == key and key in self.conns
+                    and self.conns[key] not in stale
+                    and any(old.get(k) != d.get(k) for k in LINK_KEYS)):
+                stale.append(self.conns.pop(key))
+
+        for name, (d, plan) in new.items():
+            poller = current.get(name)
+            if poller is None:
+                self._add(d, plan)
+                changes[name] = ['added']
+                continue
+            old = poller.cfg
+            changed = poller.reconfigure(d, plan, conn=self._conn_for(d))
+            if self.loggers_for and (rebuild_sinks or any(
+                    old.get(k) != d.get(k) for k in DEVICE_SINK_KEYS)):
+                # di thread sink: urutan tulis ke logger lama tetap terjaga
+                await loop.run_in_executor(
+                    self.sink_executor, poller.replace_loggers,
+                    lambda d=d, make=self.loggers_for: make(d))
+                changed.append('sinks')
+            changes[name] = changed
+        self.devices, self.plans = list(devices), plans
+
+        # client lama / tanpa device ditutup setelah poll yang memakainya selesai
+        used = {link_key(p.cfg) for p in self.pollers}
+        stale += [self.conns.pop(k) for k in list(self.conns) if k not in used]
+        for conn in stale:
+            async with conn.lock:
+                conn.close()
+        return {n: c for n, c in changes.items() if c}
+
+    def connection_stats(self):
+        return {':'.join(str(k) for k in key): c.stats() for key, c in self.conns.items()}
+
+    def timing_stats(self):
+        return {p.name: p.timer.stats() for p in self.pollers}
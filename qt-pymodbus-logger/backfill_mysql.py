@@ -0,0 +1,51 @@
+"""
+Backfill tabel MySQL dari segmen CSV CSVLogger (polos, .gz, .zst), mis.
+setelah jaringan ke server putus. Baris yang timestamp-nya sudah ada dilewati,
+jadi aman dijalankan ulang.
+
+    python3 backfill_mysql.py logs/modbus_data_202610*.csv*
+    python3 backfill_mysql.py --table sensor_data_boiler logs/modbus_data_boiler*.csv.gz
+
+Server harus mengizinkan LOAD DATA LOCAL (local_infile=ON); bila tidak,
+otomatis memakai INSERT multi-baris (lebih lambat).
+"""
+import argparse
+import glob
+import time
+from config_manager import load_config
+from storage.mysql_logger import MySQLLogger, NarrowMySQLLogger
+from storage.mysql_backfill import MySQLBackfill
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('paths', nargs='+', help='file / pola glob segmen CSV')
+    ap.add_argument('--table', help='tabel tujuan (default [MYSQL] table)')
+    ap.add_argument('--chunk-rows', type=int, default=50000)
+    ap.add_argument('--no-load-data', action='store_true',
+                    help='pakai INSERT multi-baris, bukan LOAD DATA LOCAL INFILE')
+    args = ap.parse_args()
+
+    paths = sorted({p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])})
+    conf = dict(load_config()['MYSQL'])
+    if args.table:
+        conf['table'] = args.table
+    conf['local_infile'] = 'false' if args.no_load_data else 'true'
+    narrow = conf.get('schema', 'wide').lower() == 'narrow'
+    logger = (NarrowMySQLLogger if narrow else MySQLLogger)(conf)
+
+    backfill = MySQLBackfill(logger, chunk_rows=args.chunk_rows, load_data=not args.no_load_data)
+    t0 = time.monotonic()
+    try:
+        st = backfill.run(paths)
+    except KeyboardInterrupt:
+        # chunk yang sudah di-commit tetap ada; jalankan ulang untuk melanjutkan
+        print('Stopped by user')
+        st = backfill.stats()
+    finally:
+        logger.close()
+    print(f"Done in {time.monotonic() - t0:.1f}s:", st)
+
+
+if __name__ == '__main__':
+    main()
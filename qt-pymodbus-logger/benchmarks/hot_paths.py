@@ -0,0 +1,367 @@
+"""
+Micro-benchmark jalur panas: decode register, satu poll ke simulator lokal,
+sink CSV / MySQL, parser lutron dan logger_rata. Tidak butuh hardware.
+Hasil (ns per operasi, min dan median dari beberapa ulangan) ditulis ke JSON
+agar bisa dibandingkan antar versi.
+
+    python3 benchmarks/hot_paths.py --output bench_new.json
+    python3 benchmarks/hot_paths.py --only decode csv
+    python3 benchmarks/hot_paths.py --output bench_new.json --compare bench_old.json
+
+--compare keluar dengan kode 1 bila ada benchmark (ns/op minimum) yang lebih
+lambat dari --threshold (default 10%). MySQLLogger memakai server [MYSQL] bila --mysql,
+selain itu stand-in SQLite (hanya mengukur sisi Python + commit lokal).
+Benchmark yang dependensinya tidak terpasang dicatat sebagai skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+REPO_DIR = os.path.dirname(APP_DIR)
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, HERE)
+
+from storage.csv_logger import CSVLogger
+from storage.mysql_logger import MySQLLogger
+
+CHANNELS = 32
+TS = '2026-10-18 12:00:00'
+BENCHMARKS = []
+
+
+class Skip(Exception):
+    """Benchmark tidak bisa dijalankan di mesin ini."""
+
+
+def bench(name, group):
+    """Daftarkan setup benchmark; setup mengembalikan (op, teardown atau None)."""
+    def register(setup):
+        BENCHMARKS.append((name, group, setup))
+        return setup
+    return register
+
+
+def _entries(n=CHANNELS):
+    return [{'sensor_name': f'ch{i + 1}', 'value': i * 1.25} for i in range(n)]
+
+
+# --- decode ---
+@bench('decode_float32_abcd', 'decode')
+def _decode_float32_abcd(args):
+    from modbus_client_v3 import ModbusClient
+    decode = ModbusClient.decode_float32_from_regs
+    return (lambda: decode(0x4148, 0xF5C3, 'ABCD')), None
+
+
+@bench('decode_float32_cdab', 'decode')
+def _decode_float32_cdab(args):
+    from modbus_client_v3 import ModbusClient
+    decode = ModbusClient.decode_float32_from_regs
+    return (lambda: decode(0xF5C3, 0x4148, 'CDAB')), None
+
+
+@bench('decode_u16', 'decode')
+def _decode_u16(args):
+    from modbus_client_v3 import ModbusClient
+    decode = ModbusClient.decode_u16
+    return (lambda: decode(0x1234)), None
+
+
+@bench('decode_block_float32x32', 'decode')
+def _decode_block(args):
+    # decoder terkompilasi yang dipakai ModbusPoller untuk satu blok
+    from poll_plan import compile_plan
+    plan = compile_plan({'type': 'tcp', 'register': '0', 'quantity': str(CHANNELS * 2),
+                         'encoding': 'float32be'})
+    decoder = plan.blocks[0].decoder
+    regs = [0x4148, 0xF5C3] * CHANNELS
+    return (lambda: decoder.decode(regs)), None
+
+
+# --- poll ---
+@bench('poller_run_once_tcp', 'poll')
+def _poller_run_once(args):
+    import simulator
+    from modbus_worker import ModbusPoller
+    proc, endpoints = simulator.start(tcp=1)
+    cfg = {'type': 'tcp', 'host': '127.0.0.1', 'tcp_port': str(endpoints['tcp'][0]), 'timeout': '1',
+           'unit_id': '1', 'register': '0', 'quantity': str(CHANNELS * 2),
+           'encoding': 'float32be'}
+    poller = ModbusPoller(cfg)
+    poller.run_once()
+
+    def teardown():
+        poller.close()
+        proc.terminate()
+        proc.wait(5)
+    return poller.run_once, teardown
+
+
+# --- sink ---
+@bench('csv_logger_log', 'csv')
+def _csv_logger(args):
+    tmp = tempfile.TemporaryDirectory()
+    lg = CSVLogger(os.path.join(tmp.name, 'bench.csv'))
+    entries = _entries()
+
+    def teardown():
+        lg.close()
+        tmp.cleanup()
+    return (lambda: lg.log(TS, entries)), teardown
+
+
+class _SQLiteCursor:
+    # cukup untuk jalur log/flush MySQLLogger: placeholder %s -> ?
+    def __init__(self, cur):
+        self.cur = cur
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cur.close()
+
+    def execute(self, sql, args=()):
+        return self.cur.execute(sql.replace('%s', '?'), args)
+
+    def executemany(self, sql, rows):
+        return self.cur.executemany(sql.replace('%s', '?'), rows)
+
+    def fetchall(self):
+        return self.cur.fetchall()
+
+
+class _SQLiteConnection:
+    open = True
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+
+    def cursor(self):
+        return _SQLiteCursor(self.db.cursor())
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        self.db.close()
+        self.open = False
+
+
+class SQLiteStandInLogger(MySQLLogger):
+    """MySQLLogger dengan koneksi SQLite lokal, untuk mesin tanpa server MySQL."""
+
+    def __init__(self, path, cfg):
+        self.path = path
+        super().__init__(cfg)
+
+    def connect(self):
+        return _SQLiteConnection(self.path)
+
+    def create_table_if_not_exists(self):
+        self._run(lambda cur: cur.execute(
+            f"CREATE TABLE IF NOT EXISTS `{self.table}` "
+            f"(id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+            + ", ".join(f"ch{i + 1} REAL" for i in range(CHANNELS)) + ")"))
+        self.max_channels = self.get_current_channel_count()
+
+    def get_current_channel_count(self):
+        def count(cur):
+            cur.execute(f"PRAGMA table_info(`{self.table}`)")
+            return sum(1 for row in cur.fetchall() if row[1].startswith('ch'))
+        return self._run(count)
+
+
+@bench('mysql_logger_log', 'mysql')
+def _mysql_logger(args):
+    entries = _entries()
+    if args.mysql:
+        from config_manager import load_config
+        conf = dict(load_config()['MYSQL'])
+        conf['table'] = 'bench_hot_paths'
+        lg = MySQLLogger(conf)
+
+        def teardown():
+            lg.close()
+            lg._run(lambda cur: cur.execute(f"DROP TABLE IF EXISTS `{lg.table}`"))
+            lg._drop()
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        lg = SQLiteStandInLogger(os.path.join(tmp.name, 'bench.db'), {'table': 'bench'})
+
+        def teardown():
+            lg.close()
+            tmp.cleanup()
+    lg.log(TS, entries)
+    return (lambda: lg.log(TS, entries)), teardown
+
+
+# --- parser serial ---
+def _import_repo_module(name):
+    if REPO_DIR not in sys.path:
+        sys.path.append(REPO_DIR)
+    try:
+        return __import__(name)
+    except ImportError as e:
+        raise Skip(f'{name}: {e}')
+
+
+# header 41, unit 01 (C), polaritas +, 1 desimal, nilai 00000235 -> 23.5
+_LUTRON_FRAME = b'\x0241010100000235\r'
+
+
+@bench('lutron_extract_frames', 'lutron')
+def _lutron_extract(args):
+    lutron = _import_repo_module('lutron_logger')
+    buffer = _LUTRON_FRAME * 3 + b'\x02410100'
+    return (lambda: lutron.extract_frames(buffer)), None
+
+
+@bench('lutron_parse_frame', 'lutron')
+def _lutron_parse(args):
+    lutron = _import_repo_module('lutron_logger')
+    frame = _LUTRON_FRAME[1:-1]
+    return (lambda: lutron.parse_frame(frame)), None
+
+
+@bench('logger_rata_parse_line_to_dict', 'logger_rata')
+def _logger_rata_parse(args):
+    rata = _import_repo_module('logger_rata')
+    line = '\t'.join(['2026-10-18 12:00:00'] + [f'{i},5' for i in range(21)]
+                     + ['0', '0', '0']) + '\n'
+    parse = rata.MonitorThread.parse_line_to_dict
+    return (lambda: parse(None, line)), None
+
+
+# --- runner ---
+def measure(op, min_time, repeat):
+    """Kalibrasi jumlah loop agar satu ulangan >= min_time, lalu ulangi."""
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            op()
+        dt = time.perf_counter() - t0
+        if dt >= min_time / 10 or n >= 1 << 24:
+            break
+        n *= 10
+    n = max(1, int(n * min_time / max(dt, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            op()
+        samples.append((time.perf_counter() - t0) / n)
+    median = statistics.median(samples)
+    return {
+        'loops': n,
+        'repeat': repeat,
+        'ns_per_op_min': min(samples) * 1e9,
+        'ns_per_op_median': median * 1e9,
+        'ops_per_s': 1.0 / median if median else 0.0,
+    }
+
+
+def metadata():
+    meta = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+    try:
+        meta['git'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                                     capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        meta['git'] = None
+    for mod in ('pymodbus', 'numpy', 'pymysql'):
+        try:
+            meta[mod] = __import__(mod).__version__
+        except Exception:
+            meta[mod] = None
+    return meta
+
+
+def run(args):
+    results = {}
+    for name, group, setup in BENCHMARKS:
+        if args.only and group not in args.only and name not in args.only:
+            continue
+        try:
+            op, teardown = setup(args)
+        except Skip as e:
+            results[name] = {'skipped': str(e)}
+            print(f"{name:34s} skipped: {e}")
+            continue
+        except Exception as e:
+            results[name] = {'skipped': f'{type(e).__name__}: {e}'}
+            print(f"{name:34s} skipped: {type(e).__name__}: {e}")
+            continue
+        try:
+            r = measure(op, args.min_time, args.repeat)
+        finally:
+            if teardown:
+                teardown()
+        results[name] = r
+        print(f"{name:34s} {r['ns_per_op_median']:12.0f} ns/op  {r['ops_per_s']:12.0f} ops/s")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Cetak rasio baru/lama; return daftar benchmark yang regresi."""
+    regressions = []
+    for name, r in results.items():
+        old = baseline.get('results', {}).get(name, {})
+        if 'ns_per_op_min' not in r or 'ns_per_op_min' not in old:
+            continue
+        # min lebih stabil dari median terhadap gangguan proses lain
+        ratio = r['ns_per_op_min'] / old['ns_per_op_min']
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:34s} x{ratio:6.2f}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--output', default='hot_paths.json', help='file JSON hasil')
+    ap.add_argument('--only', nargs='+', help='nama atau grup: decode poll csv mysql lutron logger_rata')
+    ap.add_argument('--min-time', type=float, default=0.2, help='detik minimal per ulangan')
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--mysql', action='store_true', help='pakai server MySQL di [MYSQL]')
+    ap.add_argument('--compare', help='file JSON hasil sebelumnya')
+    ap.add_argument('--threshold', type=float, default=0.10)
+    args = ap.parse_args()
+
+    doc = {'meta': metadata(), 'results': run(args)}
+    with open(args.output, 'w') as f:
+        json.dump(doc, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(doc['results'], baseline, args.threshold)
+        if regressions:
+            print(f"Slower than {args.compare} by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Uji beban: berapa device yang sanggup ditangani satu proses logger.
+Untuk tiap jumlah device N: jalankan simulator (benchmarks/simulator.py,
+endpoint TCP dan/atau RTU lewat PTY dengan latency/jitter/dropout), buat
+config.ini sementara berisi N section [Device:..], jalankan jalur main_cli.py
+di proses anak selama --duration detik, lalu laporkan polls/s, latency poll
+p50/p99, error per jenis, CPU dan RSS proses logger -> kurva kapasitas.
+
+    python3 benchmarks/load_test.py --devices 1 10 50 100 --interval 1 --duration 20
+    python3 benchmarks/load_test.py --devices 4 8 --transport rtu --latency-ms 5 --jitter-ms 2 --dropout 0.01
+    python3 benchmarks/load_test.py --devices 10 100 --engine async --units-per-link 4 --output capacity.json
+    python3 benchmarks/load_test.py --devices 10 --registers 200 --latency-ms 5 --pipeline-depth 4
+"""
+import argparse
+import configparser
+import json
+import os
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, HERE)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+# --- proses anak: main_cli dengan pengukur di run_once ---
+def run_child(args):
+    import async_worker
+    import main_cli
+    import modbus_worker
+
+    t_start = time.monotonic() + args.warmup
+    t_end = t_start + args.duration
+    latencies = []
+    errors = Counter()
+
+    def record(t0, e=None):
+        now = time.monotonic()
+        if not t_start <= now <= t_end:
+            return
+        if e is None:
+            latencies.append(now - t0)
+        else:
+            errors[type(e).__name__] += 1
+
+    sync_run_once = modbus_worker.ModbusPoller.run_once
+
+    def run_once(self):
+        t0 = time.monotonic()
+        try:
+            result = sync_run_once(self)
+        except Exception as e:
+            record(t0, e)
+            raise
+        record(t0)
+        return result
+
+    async_run_once = async_worker.AsyncPoller.run_once
+
+    async def run_once_async(self):
+        t0 = time.monotonic()
+        try:
+            result = await async_run_once(self)
+        except Exception as e:
+            record(t0, e)
+            raise
+        record(t0)
+        return result
+
+    modbus_worker.ModbusPoller.run_once = run_once
+    async_worker.AsyncPoller.run_once = run_once_async
+
+    # Ctrl+C buatan: main_cli berhenti lewat jalur KeyboardInterrupt biasa
+    threading.Timer(args.warmup + args.duration,
+                    lambda: os.kill(os.getpid(), signal.SIGINT)).start()
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            main_cli.main(args.child)
+        finally:
+            sys.stdout = stdout
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    latencies.sort()
+    result = {
+        'polls': len(latencies),
+        'errors': dict(errors),
+        'latencies_ms': [x * 1000.0 for x in latencies],
+        # CPU termasuk warmup dan startup
+        'cpu_s': usage.ru_utime + usage.ru_stime,
+        'max_rss_kb': usage.ru_maxrss,
+    }
+    with open(args.result, 'w') as f:
+        json.dump(result, f)
+
+
+# --- proses induk ---
+def write_config(path, endpoints, args, tmp_dir):
+    cfg = configparser.ConfigParser()
+    cfg['Modbus'] = {
+        'type': 'tcp',
+        'host': '127.0.0.1',
+        'baudrate': '115200',
+        'timeout': str(args.timeout),
+        'function': 'holding',
+        'register': '0',
+        'quantity': str(args.registers),
+        'encoding': 'float32be',
+        'poll_interval': str(args.interval),
+        'engine': args.engine,
+        'pipeline_depth': str(args.pipeline_depth),
+    }
+    cfg['Logger'] = {
+        'enable_csv': 'true' if args.csv else 'false',
+        'csv_file': os.path.join(tmp_dir, 'load.csv'),
+        'enable_mysql': 'false',
+    }
+    links = [{'type': 'tcp', 'tcp_port': str(p)} for p in endpoints['tcp']]
+    links += [{'type': 'rtu', 'port': p} for p in endpoints['rtu']]
+    n = 0
+    for link in links:
+        for unit in range(1, args.units_per_link + 1):
+            if n >= args.n:
+                break
+            n += 1
+            cfg[f'Device:dev{n:04d}'] = dict(link, unit_id=str(unit))
+    with open(path, 'w') as f:
+        cfg.write(f)
+    return n
+
+
+def split_links(n_links, transport):
+    if transport == 'tcp':
+        return n_links, 0
+    if transport == 'rtu':
+        return 0, n_links
+    rtu = n_links // 2
+    return n_links - rtu, rtu
+
+
+def run_step(n, args):
+    links = -(-n // args.units_per_link)
+    tcp, rtu = split_links(links, args.transport)
+    import simulator
+    sim, endpoints = simulator.start(tcp=tcp, rtu=rtu, registers=max(2000, args.registers),
+                                     latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                     dropout=args.dropout)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            args.n = n
+            config = os.path.join(tmp, 'config.ini')
+            devices = write_config(config, endpoints, args, tmp)
+            result_path = os.path.join(tmp, 'result.json')
+            cmd = [sys.executable, os.path.abspath(__file__), '--child', config,
+                   '--result', result_path, '--duration', str(args.duration),
+                   '--warmup', str(args.warmup)]
+            subprocess.run(cmd, check=True, timeout=args.warmup + args.duration + 60)
+            with open(result_path) as f:
+                child = json.load(f)
+    finally:
+        sim.terminate()
+        sim.wait(10)
+
+    lat = child.pop('latencies_ms')
+    expected = devices / args.interval
+    polls_s = child['polls'] / args.duration
+    return {
+        'devices': devices,
+        'links': {'tcp': tcp, 'rtu': rtu},
+        'expected_polls_per_s': expected,
+        'polls_per_s': polls_s,
+        'achieved': polls_s / expected if expected else 0.0,
+        'p50_ms': percentile(lat, 50),
+        'p99_ms': percentile(lat, 99),
+        'max_ms': lat[-1] if lat else None,
+        'errors': child['errors'],
+        'cpu_pct': 100.0 * child['cpu_s'] / (args.duration + args.warmup),
+        'max_rss_mb': child['max_rss_kb'] / 1024.0,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--devices', type=int, nargs='+', default=[1, 10, 50, 100])
+    ap.add_argument('--transport', choices=('tcp', 'rtu', 'mixed'), default='tcp')
+    ap.add_argument('--units-per-link', type=int, default=1,
+                    help='device (unit ID) per endpoint TCP/PTY')
+    ap.add_argument('--registers', type=int, default=16, help='register per device (float32)')
+    ap.add_argument('--interval', type=float, default=1.0)
+    ap.add_argument('--timeout', type=float, default=0.5, help='timeout Modbus device')
+    ap.add_argument('--engine', choices=('thread', 'async'), default='thread')
+    ap.add_argument('--pipeline-depth', type=int, default=1,
+                    help='pipeline_depth TCP (> 1: beberapa blok register sekaligus di jalur)')
+    ap.add_argument('--latency-ms', type=float, default=0.0)
+    ap.add_argument('--jitter-ms', type=float, default=0.0)
+    ap.add_argument('--dropout', type=float, default=0.0)
+    ap.add_argument('--csv', action='store_true', help='aktifkan sink CSV (di direktori sementara)')
+    ap.add_argument('--duration', type=float, default=20.0, help='detik pengukuran per langkah')
+    ap.add_argument('--warmup', type=float, default=3.0)
+    ap.add_argument('--output', help='file JSON kurva kapasitas')
+    ap.add_argument('--child', help=argparse.SUPPRESS)
+    ap.add_argument('--result', help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    steps = []
+    print(f"{'devices':>7} {'polls/s':>9} {'expect':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'cpu %':>6} {'rss MB':>7}  errors")
+    for n in args.devices:
+        r = run_step(n, args)
+        steps.append(r)
+        p50 = f"{r['p50_ms']:8.2f}" if r['p50_ms'] is not None else f"{'-':>8}"
+        p99 = f"{r['p99_ms']:8.2f}" if r['p99_ms'] is not None else f"{'-':>8}"
+        print(f"{r['devices']:7d} {r['polls_per_s']:9.1f} {r['expected_polls_per_s']:8.1f} "
+              f"{p50} {p99} {r['cpu_pct']:6.1f} {r['max_rss_mb']:7.1f}  {r['errors'] or ''}")
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k not in ('child', 'result', 'output', 'n')}
+        with open(args.output, 'w') as f:
+            json.dump({'params': params, 'steps': steps}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
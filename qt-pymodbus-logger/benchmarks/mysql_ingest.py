@@ -0,0 +1,107 @@
+"""
+Bandingkan laju tulis MySQL: jalur lama (connect/INSERT/close per baris,
+autocommit) vs MySQLLogger dengan koneksi persisten dan batch executemany.
+
+Pakai server di [MYSQL] config.ini; tabel bench_* dibuat lalu dihapus.
+    python3 benchmarks/mysql_ingest.py --rows 2000 --channels 16
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pymysql
+from config_manager import load_config
+from storage.mysql_logger import MySQLLogger
+
+
+def make_rows(n, channels):
+    base = time.time() - n
+    return [
+        (time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(base + i)),
+         [{'sensor_name': f'ch{c + 1}', 'value': i * 0.5 + c} for c in range(channels)])
+        for i in range(n)
+    ]
+
+
+def connect(conf, autocommit):
+    return pymysql.connect(host=conf['host'], user=conf['user'], password=conf['password'],
+                           database=conf['database'], autocommit=autocommit)
+
+
+def create_table(conf, table, channels):
+    conn = connect(conf, True)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS `{table}`")
+        cols = ", ".join(f"ch{i + 1} DOUBLE" for i in range(channels))
+        cur.execute(f"CREATE TABLE `{table}` (id INT AUTO_INCREMENT PRIMARY KEY, "
+                    f"timestamp DATETIME NOT NULL, {cols}) ENGINE=InnoDB")
+    conn.close()
+
+
+def drop_table(conf, table):
+    conn = connect(conf, True)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS `{table}`")
+    conn.close()
+
+
+def bench_legacy(conf, rows, channels):
+    """Jalur sebelum batching: satu koneksi dan satu INSERT per baris."""
+    table = 'bench_legacy'
+    create_table(conf, table, channels)
+    cols = ", ".join(f"ch{i + 1}" for i in range(channels))
+    sql = f"INSERT INTO `{table}` (timestamp, {cols}) VALUES ({', '.join(['%s'] * (channels + 1))})"
+    t0 = time.perf_counter()
+    for ts, entries in rows:
+        conn = connect(conf, True)
+        cur = conn.cursor()
+        cur.execute(sql, [ts] + [d['value'] for d in entries])
+        conn.commit()
+        conn.close()
+    elapsed = time.perf_counter() - t0
+    drop_table(conf, table)
+    return elapsed
+
+
+def bench_batched(conf, rows, channels, batch_size):
+    table = 'bench_batched'
+    create_table(conf, table, channels)
+    logger = MySQLLogger(dict(conf, table=table, batch_size=batch_size, flush_interval_s=3600))
+    t0 = time.perf_counter()
+    for ts, entries in rows:
+        logger.log(ts, entries)
+    logger.close()
+    elapsed = time.perf_counter() - t0
+    drop_table(conf, table)
+    return elapsed, logger.stats()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--rows', type=int, default=2000)
+    ap.add_argument('--channels', type=int, default=16)
+    ap.add_argument('--batch-size', type=int, nargs='+', default=[10, 100, 1000])
+    ap.add_argument('--legacy-rows', type=int, default=None,
+                    help='baris untuk jalur lama (default sama dengan --rows)')
+    args = ap.parse_args()
+
+    conf = dict(load_config()['MYSQL'])
+    rows = make_rows(args.rows, args.channels)
+
+    legacy_rows = rows[:args.legacy_rows] if args.legacy_rows else rows
+    t = bench_legacy(conf, legacy_rows, args.channels)
+    legacy_rate = len(legacy_rows) / t
+    print(f"legacy      rows={len(legacy_rows):6d}  {legacy_rate:10.1f} rows/s")
+
+    for bs in args.batch_size:
+        t, st = bench_batched(conf, rows, args.channels, bs)
+        rate = len(rows) / t
+        print(f"batch={bs:<5d} rows={len(rows):6d}  {rate:10.1f} rows/s  "
+              f"x{rate / legacy_rate:.1f}  flushes={st['flushes']} reconnects={st['reconnects']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+Simulator Modbus lokal untuk benchmark dan uji beban tanpa hardware.
+Holding/input register berisi i % 65536, coil/discrete bergantian; semua
+unit ID dijawab dari datastore yang sama.
+
+Tiap endpoint adalah server pymodbus sendiri:
+  --tcp N : N server Modbus TCP
+  --rtu N : N pasangan PTY; sisi slave (/dev/pts/..) dibuka logger sebagai port
+            serial RTU, sisi master dijembatani ke server pymodbus berframer RTU
+Endpoint TCP dilayani proxy di depan server pymodbus yang memisah frame
+beruntun dari client pipelined; gangguan jalur (--latency-ms, --jitter-ms,
+--dropout) diterapkan di proxy ini (TCP) / di jembatan PTY (RTU) pada respons.
+Setelah siap, satu baris JSON endpoint ditulis ke stdout:
+    {"tcp": [port, ...], "rtu": ["/dev/pts/7", ...]}
+
+    python3 benchmarks/simulator.py --tcp 1 --port 5020
+    python3 benchmarks/simulator.py --tcp 50 --rtu 4 --latency-ms 5 --jitter-ms 2 --dropout 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from pymodbus.server import ModbusTcpServer
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext
+try:
+    from pymodbus.datastore import ModbusDeviceContext as _DeviceContext
+except ImportError:
+    # pymodbus < 3.10
+    from pymodbus.datastore import ModbusSlaveContext as _DeviceContext
+try:
+    from pymodbus.framer import FramerType
+    _SOCKET, _RTU = FramerType.SOCKET, FramerType.RTU
+except ImportError:
+    from pymodbus.framer import ModbusSocketFramer as _SOCKET, ModbusRtuFramer as _RTU
+
+
+def make_context(registers=2000):
+    regs = lambda: ModbusSequentialDataBlock(1, [i % 65536 for i in range(registers)])
+    bits = lambda: ModbusSequentialDataBlock(1, [i % 2 for i in range(registers)])
+    device = _DeviceContext(hr=regs(), ir=regs(), co=bits(), di=bits())
+    return ModbusServerContext(device, single=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Impairment:
+    """Latency + jitter (ms) dan peluang respons hilang untuk satu endpoint."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, dropout=0.0, seed=None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.dropout = dropout
+        self.rng = random.Random(seed)
+
+    @property
+    def active(self):
+        return self.latency > 0 or self.jitter > 0 or self.dropout > 0
+
+    def drop(self):
+        return self.dropout > 0 and self.rng.random() < self.dropout
+
+    def delay(self):
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+
+async def _respond(data, write, imp):
+    if imp.drop():
+        return
+    d = imp.delay()
+    if d:
+        await asyncio.sleep(d)
+    write(data)
+
+
+async def _serve_backend(context, port, framer):
+    server = ModbusTcpServer(context, framer=framer, address=('127.0.0.1', port))
+    await server.serve_forever()
+
+
+async def _wait_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, w = await asyncio.open_connection('127.0.0.1', port)
+            w.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'backend on port {port} did not start')
+            await asyncio.sleep(0.02)
+
+
+async def _read_mbap(reader):
+    """Satu frame Modbus TCP utuh (header MBAP + PDU); None bila koneksi ditutup."""
+    try:
+        head = await reader.readexactly(6)
+        return head + await reader.readexactly(int.from_bytes(head[4:6], 'big'))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+async def _tcp_proxy(port, backend_port, imp):
+    """
+    Depan server pymodbus: frame yang datang beruntun (client pipelined)
+    dipisah dan diteruskan satu per satu, karena server pymodbus hanya
+    menjawab frame pertama dari satu potongan data. Delay respons berjalan
+    bersamaan (seperti gateway dengan beberapa transaksi di jalur), urutan
+    respons per koneksi tetap.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def handle(reader, writer):
+        b_reader, b_writer = await asyncio.open_connection('127.0.0.1', backend_port)
+        out = asyncio.Queue()
+
+        async def upstream():
+            while True:
+                frame = await _read_mbap(reader)
+                if frame is None:
+                    break
+                b_writer.write(frame)
+                resp = await _read_mbap(b_reader)
+                if resp is None:
+                    break
+                if not imp.drop():
+                    out.put_nowait((loop.time() + imp.delay(), resp))
+            b_writer.close()
+            out.put_nowait(None)
+
+        async def downstream():
+            while True:
+                item = await out.get()
+                if item is None:
+                    break
+                due, resp = item
+                wait = due - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(resp)
+            writer.close()
+
+        await asyncio.gather(upstream(), downstream(), return_exceptions=True)
+
+    return await asyncio.start_server(handle, '127.0.0.1', port)
+
+
+def _open_pty():
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    os.set_blocking(master, False)
+    # fd slave tetap dibuka di sini agar PTY tidak EIO saat logger reconnect
+    return master, slave, os.ttyname(slave)
+
+
+async def _rtu_bridge(master, backend_port, imp):
+    loop = asyncio.get_running_loop()
+    b_reader, b_writer = await asyncio.open_connection('127.0.0.1', backend_port)
+
+    def on_request():
+        try:
+            data = os.read(master, 4096)
+        except (BlockingIOError, OSError):
+            return
+        b_writer.write(data)
+
+    loop.add_reader(master, on_request)
+
+    def write(data):
+        try:
+            os.write(master, data)
+        except OSError:
+            pass
+
+    while True:
+        data = await b_reader.read(4096)
+        if not data:
+            break
+        await _respond(data, write, imp)
+
+
+async def serve(args):
+    context = make_context(args.registers)
+    tasks = []
+    endpoints = {'tcp': [], 'rtu': []}
+    ptys = []
+
+    for i in range(args.tcp):
+        imp = Impairment(args.latency_ms, args.jitter_ms, args.dropout, args.seed + i)
+        public = (args.port + i) if args.port else free_port()
+        backend = free_port()
+        tasks.append(asyncio.create_task(_serve_backend(context, backend, _SOCKET)))
+        await _wait_port(backend)
+        # selalu lewat proxy agar client pipelined (pipeline_depth > 1) dilayani
+        await _tcp_proxy(public, backend, imp)
+        endpoints['tcp'].append(public)
+
+    for i in range(args.rtu):
+        imp = Impairment(args.latency_ms, args.jitter_ms, args.dropout, args.seed + args.tcp + i)
+        backend = free_port()
+        tasks.append(asyncio.create_task(_serve_backend(context, backend, _RTU)))
+        await _wait_port(backend)
+        master, slave, path = _open_pty()
+        ptys.append((master, slave))
+        tasks.append(asyncio.create_task(_rtu_bridge(master, backend, imp)))
+        endpoints['rtu'].append(path)
+
+    print(json.dumps(endpoints), flush=True)
+    await asyncio.gather(*tasks)
+
+
+def start(tcp=1, rtu=0, registers=2000, latency_ms=0.0, jitter_ms=0.0, dropout=0.0,
+          port=None, timeout=30.0):
+    """Jalankan simulator di proses terpisah; return (proses, endpoint dict) setelah siap."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--tcp', str(tcp), '--rtu', str(rtu),
+           '--registers', str(registers), '--latency-ms', str(latency_ms),
+           '--jitter-ms', str(jitter_ms), '--dropout', str(dropout)]
+    if port:
+        cmd += ['--port', str(port)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = proc.stdout.readline()
+    if not line:
+        proc.wait(timeout)
+        raise RuntimeError(f'simulator exited with {proc.returncode}')
+    return proc, json.loads(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--tcp', type=int, default=1, help='jumlah endpoint TCP')
+    ap.add_argument('--rtu', type=int, default=0, help='jumlah endpoint RTU lewat PTY')
+    ap.add_argument('--port', type=int, default=0, help='port TCP pertama (0 = bebas)')
+    ap.add_argument('--registers', type=int, default=2000)
+    ap.add_argument('--latency-ms', type=float, default=0.0)
+    ap.add_argument('--jitter-ms', type=float, default=0.0)
+    ap.add_argument('--dropout', type=float, default=0.0, help='peluang respons hilang (0..1)')
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
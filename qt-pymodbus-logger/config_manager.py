@@ -1,5 +1,10 @@
-import os, configparser
+import os, configparser, threading
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.ini")
+DEVICE_PREFIX = "Device:"
+
+
+class ConfigError(ValueError):
+    """Config tidak valid; dilempar saat startup, bukan saat poll."""
 
 def load_config(path=None):
     p = path or CONFIG_FILE
@@ -45,3 +50,138 @@ def save_config(config, path=None):
     p = path or CONFIG_FILE
     with open(p, 'w') as f:
         config.write(f)
+
+def load_devices(config):
+    """
+    Daftar device dari section [Device:<nama>].
+    Key yang tidak diisi diambil dari section [Modbus].
+    """
+    base = dict(config['Modbus']) if 'Modbus' in config else {}
+    devices = []
+    for sec in config.sections():
+        if not sec.startswith(DEVICE_PREFIX):
+            continue
+        d = dict(base)
+        d.update(config[sec])
+        d['name'] = sec[len(DEVICE_PREFIX):].strip()
+        devices.append(d)
+    return devices
+
+
+class ConfigDiff:
+    """
+    Perbedaan dua config: changes = {section: {key: (lama, baru)}},
+    None untuk key / section yang tidak ada di salah satu sisi.
+    """
+
+    def __init__(self, old, new):
+        self.changes = {}
+        for sec in sorted(set(old.sections()) | set(new.sections())):
+            a = dict(old[sec]) if old.has_section(sec) else {}
+            b = dict(new[sec]) if new.has_section(sec) else {}
+            keys = {k: (a.get(k), b.get(k)) for k in sorted(a.keys() | b.keys())
+                    if a.get(k) != b.get(k)}
+            if keys:
+                self.changes[sec] = keys
+        self.added = [s for s in new.sections() if not old.has_section(s)]
+        self.removed = [s for s in old.sections() if not new.has_section(s)]
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def touches(self, *sections):
+        return any(sec in self.changes for sec in sections)
+
+    def __str__(self):
+        parts = [f'+[{s}]' for s in self.added] + [f'-[{s}]' for s in self.removed]
+        for sec, keys in self.changes.items():
+            if sec not in self.added and sec not in self.removed:
+                parts.append(f"[{sec}] {', '.join(keys)}")
+        return '; '.join(parts)
+
+
+def diff_config(old, new):
+    return ConfigDiff(old, new)
+
+
+class ConfigWatcher:
+    """
+    Pantau file config (mtime + ukuran). Bila isinya berubah, config baru
+    dibaca dan on_change(config, diff) dipanggil; poller / sink yang
+    berjalan menerapkan hanya yang berubah (logger_setup.apply_config).
+    Bila on_change melempar exception (mis. ConfigError) config baru tidak
+    dipakai sebagai acuan: diff berikutnya tetap dihitung dari config lama
+    dan file yang sama dicoba lagi pada poll() berikutnya.
+    poll() dipanggil berkala (thread start() atau QTimer GUI): perubahan
+    baru diterapkan setelah file tidak berubah satu putaran, agar file yang
+    sedang ditulis editor tidak terbaca setengah. check() langsung.
+    """
+
+    def __init__(self, on_change, path=None, interval_s=1.0):
+        self.path = path or CONFIG_FILE
+        self.on_change = on_change
+        self.interval_s = float(interval_s)
+        self.config = self._read()
+        self._sig = self._signature()
+        self._seen = self._sig
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        config = configparser.ConfigParser()
+        config.read(self.path)
+        return config
+
+    def poll(self):
+        sig = self._signature()
+        if sig != self._seen:
+            # baru berubah: tunggu satu putaran lagi
+            self._seen = sig
+            return None
+        return self.check()
+
+    def check(self):
+        """Bandingkan file dengan config terakhir; return diff atau None."""
+        with self._lock:
+            sig = self._signature()
+            if sig is None or sig == self._sig:
+                return None
+            self._seen = sig
+            try:
+                new = self._read()
+            except configparser.Error as e:
+                raise ConfigError(f'{self.path}: {e}')
+            diff = diff_config(self.config, new)
+            if diff:
+                self.on_change(new, diff)
+                self.config = new
+            # baru dicatat setelah berhasil: config yang ditolak dicoba lagi
+            # pada poll berikutnya (mis. MySQL belum siap saat sink dibangun)
+            self._sig = sig
+            return diff or None
+
+    def start(self):
+        def loop():
+            last_error = None
+            while not self._stop_event.wait(self.interval_s):
+                try:
+                    self.poll()
+                    last_error = None
+                except Exception as e:
+                    # dicoba ulang tiap putaran; error yang sama dicetak sekali
+                    if str(e) != last_error:
+                        print(f"Config reload failed: {e}")
+                    last_error = str(e)
+
+        threading.Thread(target=loop, name='config-watcher', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,94 @@
+import time
+from modbus_client_v3 import ModbusClient
+
+try:
+    from pymodbus.exceptions import ConnectionException
+except ImportError:
+    ConnectionException = ConnectionError
+
+# error jalur (socket / port serial / koneksi pymodbus): koneksi dibuang dan
+# dibuka ulang. Timeout / exception response pymodbus (ModbusIOException,
+# ExceptionResponse) tidak termasuk: link tetap dipakai device lain.
+TRANSPORT_ERRORS = (OSError, ConnectionError, ConnectionException)
+
+
+class ConnectionManager:
+    """
+    Menyimpan satu koneksi Modbus yang dipakai ulang antar poll.
+    Koneksi dibuka sekali, ditandai rusak bila request gagal, lalu
+    dibuka ulang dengan backoff eksponensial.
+    """
+
+    def __init__(self, cfg, backoff_initial=0.5, backoff_max=30.0, factory=None):
+        self.cfg = cfg
+        self.mode = cfg.get('type', 'rtu')
+        # factory(cfg) -> objek dengan open/close/is_open (default ModbusClient)
+        self.factory = factory or (lambda c: ModbusClient(mode=self.mode, cfg=c))
+        self.backoff_initial = float(backoff_initial)
+        self.backoff_max = float(backoff_max)
+        self.client = None
+
+        # statistik
+        self.connects = 0
+        self.reuses = 0
+        self.failures = 0
+        self.drops = 0
+
+        self._delay = self.backoff_initial
+        self._next_attempt = 0.0
+
+    def acquire(self):
+        """
+        Kembalikan ModbusClient yang sudah terbuka.
+        Raise ConnectionError bila gagal connect atau masih dalam masa backoff.
+        """
+        if self.client is not None and self.client.is_open():
+            self.reuses += 1
+            return self.client
+
+        now = time.monotonic()
+        if now < self._next_attempt:
+            raise ConnectionError(
+                f'Modbus reconnect backoff, retry in {self._next_attempt - now:.1f}s')
+
+        self._drop()
+        mc = self.factory(self.cfg)
+        try:
+            ok = mc.open()
+        except Exception:
+            ok = False
+
+        if not ok:
+            mc.close()
+            self.failures += 1
+            self._next_attempt = now + self._delay
+            self._delay = min(self._delay * 2, self.backoff_max)
+            raise ConnectionError('Cannot open modbus client')
+
+        self.client = mc
+        self.connects += 1
+        self._delay = self.backoff_initial
+        self._next_attempt = 0.0
+        return mc
+
+    def invalidate(self):
+        """Tandai koneksi rusak; acquire() berikutnya akan connect ulang."""
+        if self.client is not None:
+            self.drops += 1
+        self._drop()
+
+    def close(self):
+        self._drop()
+
+    def _drop(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    def stats(self):
+        return {
+            'connects': self.connects,
+            'reuses': self.reuses,
+            'failures': self.failures,
+            'drops': self.drops,
+        }
@@ -0,0 +1,371 @@
+"""
+Mode daemon tanpa GUI untuk banyak device.
+Device [Device:<nama>] dibagi (shard) ke beberapa proses worker sehingga
+baca + decode berjalan di beberapa core, bukan satu GIL:
+  shard = link : satu proses per link (gateway TCP / port serial)
+  shard = N    : link dikemas ke proses berisi sekitar N device
+Satu link tidak pernah dipecah ke dua proses (port serial hanya bisa
+dibuka sekali, unit ID di satu gateway tetap bergiliran).
+
+Tiap worker menjalankan PollScheduler biasa; hasil poll dikirim ke proses
+induk lewat pipe per worker, dikumpulkan per batch (ipc_batch_rows baris
+atau ipc_flush_s detik) dalam satu pesan pickle. Proses induk memegang
+sink bersama (build_loggers dari logger_setup: CSV, MySQL, rollup, ...) dan
+menjalankan ulang worker yang mati dengan backoff.
+
+    python3 daemon.py [config.ini]
+
+[Daemon] (opsional):
+  shard = link
+  ipc_batch_rows = 500
+  ipc_flush_s = 0.5
+  restart_backoff_s = 1
+  restart_backoff_max_s = 60
+"""
+import multiprocessing
+import pickle
+import signal
+import sys
+import threading
+import time
+from multiprocessing.connection import wait
+
+from config_manager import ConfigError, load_config, load_devices
+from logger_setup import build_loggers, iter_loggers
+from metrics import metrics_from_config, registry
+from poll_plan import compile_plan
+from register_map import load_points
+from scheduler import PollScheduler, link_key
+from storage.base_logger import BaseLogger
+
+# worker yang hidup selama ini dianggap sehat: backoff restart direset
+STABLE_S = 60.0
+
+
+def daemon_devices(cfg):
+    """Device dari [Device:..]; tanpa section device, [Modbus] jadi satu device."""
+    devices = load_devices(cfg)
+    if devices:
+        return devices, True
+    return [dict(cfg['Modbus'], name='modbus')], False
+
+
+def shard_devices(devices, shard='link'):
+    """Daftar shard (list nama device); device satu link selalu satu shard."""
+    links = {}
+    for d in devices:
+        links.setdefault(link_key(d), []).append(d['name'])
+    groups = list(links.values())
+    if str(shard).strip().lower() == 'link':
+        return groups
+    per = max(1, int(shard))
+    shards = []
+    for names in groups:
+        if shards and len(shards[-1]) + len(names) <= per:
+            shards[-1].extend(names)
+        else:
+            shards.append(list(names))
+    return shards
+
+
+# --- sisi worker ---
+class RowChannel:
+    """Batch baris poll satu worker ke pipe; aman dipanggil dari banyak thread link."""
+
+    def __init__(self, conn, batch_rows=500):
+        self.conn = conn
+        self.batch_rows = max(1, int(batch_rows))
+        self.rows = []
+        self.lock = threading.Lock()
+
+    def send(self, msg):
+        data = pickle.dumps(msg, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.conn.send_bytes(data)
+
+    def add(self, row):
+        with self.lock:
+            self.rows.append(row)
+            if len(self.rows) >= self.batch_rows:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            rows, self.rows = self.rows, []
+            self.conn.send_bytes(pickle.dumps(('rows', rows), pickle.HIGHEST_PROTOCOL))
+
+
+class PipeLogger(BaseLogger):
+    """Sink di worker: hanya nilai (tanpa nama channel) yang dikirim ke induk."""
+
+    def __init__(self, channel, index):
+        self.channel = channel
+        self.index = index
+
+    def log(self, timestamp, data_list):
+        self.channel.add((self.index, timestamp, tuple(d['value'] for d in data_list)))
+
+    def create_table_if_not_exists(self):
+        pass
+
+
+def _worker(config_path, names, conn, batch_rows, flush_s):
+    # Ctrl+C ditangani proses induk; induk menghentikan worker dengan SIGTERM.
+    # Bukan multiprocessing.Event: lock-nya bisa tertinggal terkunci bila
+    # worker lain mati di tengah wait() (kill -9, OOM)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    cfg = load_config(config_path)
+    devices = {d['name']: d for d in daemon_devices(cfg)[0]}
+    devices = [devices[n] for n in names]
+    channel = RowChannel(conn, batch_rows)
+    index = {n: i for i, n in enumerate(names)}
+    sched = PollScheduler(
+        devices,
+        points_for=lambda d: load_points(cfg, d.get('points', 'Points')),
+        loggers_for=lambda d: [PipeLogger(channel, index[d['name']])],
+    )
+    columns = {}
+    for w in sched.links.values():
+        for name, poller in w.pollers.items():
+            columns[name] = poller.plan.columns
+    channel.send(('hello', [columns[n] for n in names]))
+
+    def report():
+        stats = {n: {k: st[k] for k in ('polls', 'errors', 'last_error', 'connection')}
+                 for n, st in sched.stats().items()}
+        channel.send(('stats', stats, {n: registry.devices[n] for n in names
+                                       if n in registry.devices}))
+
+    sched.start()
+    try:
+        last_report = time.monotonic()
+        while not stop_event.wait(flush_s):
+            channel.flush()
+            if time.monotonic() - last_report >= 1.0:
+                report()
+                last_report = time.monotonic()
+    finally:
+        sched.stop()
+        channel.flush()
+        report()
+        conn.close()
+
+
+# --- sisi induk ---
+class WorkerShard:
+    def __init__(self, index, names):
+        self.index = index
+        self.names = names
+        self.proc = None
+        self.conn = None
+        self.columns = None
+        self.started = 0.0
+        self.restarts = 0
+        self.next_start = 0.0
+        self.delay = 0.0
+        self.stats = {}
+
+
+class Daemon:
+    """Supervisor proses worker + sink bersama di proses induk."""
+
+    def __init__(self, cfg, config_path=None):
+        self.cfg = cfg
+        self.config_path = config_path
+        opts = cfg['Daemon'] if 'Daemon' in cfg else {}
+        self.batch_rows = int(opts.get('ipc_batch_rows', 500))
+        self.flush_s = float(opts.get('ipc_flush_s', 0.5))
+        self.backoff_initial = float(opts.get('restart_backoff_s', 1.0))
+        self.backoff_max = float(opts.get('restart_backoff_max_s', 60.0))
+
+        devices, multi = daemon_devices(cfg)
+        # config divalidasi di induk: config salah tidak memicu restart terus-menerus
+        for d in devices:
+            compile_plan(d, load_points(cfg, d.get('points', 'Points')),
+                         where=f"[Device:{d['name']}]" if multi else '[Modbus]')
+        self.shards = [WorkerShard(i, names) for i, names in
+                       enumerate(shard_devices(devices, opts.get('shard', 'link')))]
+        self.sinks = {d['name']: build_loggers(cfg, d if multi else None) for d in devices}
+        self.sink_errors = 0
+        # spawn: worker tidak mewarisi thread sink / koneksi milik induk
+        self.ctx = multiprocessing.get_context('spawn')
+        self._stopping = False
+        self._shutdown = False
+
+    def _start(self, shard):
+        recv, send = self.ctx.Pipe(duplex=False)
+        shard.proc = self.ctx.Process(
+            target=_worker, name=f'modbus-worker-{shard.index}',
+            args=(self.config_path, shard.names, send, self.batch_rows, self.flush_s),
+            daemon=True,
+        )
+        shard.proc.start()
+        # ujung kirim hanya milik worker agar EOF terdeteksi saat worker mati
+        send.close()
+        shard.conn = recv
+        shard.columns = None
+        shard.started = time.monotonic()
+
+    def _dispatch(self, shard, msg):
+        kind = msg[0]
+        if kind == 'rows':
+            columns = shard.columns
+            for idx, timestamp, values in msg[1]:
+                name = shard.names[idx]
+                entries = [{'sensor_name': c, 'value': v} for c, v in zip(columns[idx], values)]
+                self._log(name, timestamp, entries)
+        elif kind == 'hello':
+            shard.columns = msg[1]
+        elif kind == 'stats':
+            shard.stats = msg[1]
+            for name, remote in msg[2].items():
+                registry.device(name).update_from(remote)
+
+    def _log(self, name, timestamp, entries):
+        m = registry.device(name)
+        t = time.perf_counter()
+        for logger in self.sinks[name]:
+            stage = 'sink:' + type(logger).__name__
+            try:
+                logger.log(timestamp, entries)
+            except Exception as e:
+                self.sink_errors += 1
+                m.error(stage, e)
+            t1 = time.perf_counter()
+            m.observe(stage, t1 - t)
+            t = t1
+
+    def _drain(self, shard):
+        """Baca semua pesan yang sudah ada di pipe; False bila pipe tertutup."""
+        try:
+            while shard.conn.poll():
+                self._dispatch(shard, pickle.loads(shard.conn.recv_bytes()))
+        except (EOFError, OSError):
+            shard.conn.close()
+            shard.conn = None
+            return False
+        return True
+
+    def _reap(self, shard):
+        """Worker mati: sisa data dibaca, restart dijadwalkan dengan backoff."""
+        if shard.conn is not None:
+            self._drain(shard)
+            if shard.conn is not None:
+                shard.conn.close()
+                shard.conn = None
+        # sentinel bisa siap sebelum waitpid; join agar exitcode terisi
+        shard.proc.join(1.0)
+        code = shard.proc.exitcode
+        shard.proc = None
+        if self._stopping:
+            return
+        now = time.monotonic()
+        if now - shard.started >= STABLE_S:
+            shard.delay = 0.0
+        shard.delay = min(self.backoff_max, shard.delay * 2 or self.backoff_initial)
+        shard.next_start = now + shard.delay
+        print(f"[worker {shard.index}] exited with code {code}, "
+              f"restart in {shard.delay:.1f}s ({', '.join(shard.names)})")
+
+    def _restart_due(self):
+        now = time.monotonic()
+        for shard in self.shards:
+            if shard.proc is None and now >= shard.next_start:
+                shard.restarts += 1
+                self._start(shard)
+
+    def run_forever(self):
+        for shard in self.shards:
+            self._start(shard)
+        print(f"Daemon: {sum(len(s.names) for s in self.shards)} devices "
+              f"in {len(self.shards)} worker processes")
+        while not self._shutdown:
+            self._restart_due()
+            running = [s for s in self.shards if s.proc is not None]
+            by_obj = {}
+            for s in running:
+                by_obj[s.proc.sentinel] = s
+                if s.conn is not None:
+                    by_obj[s.conn] = s
+            for obj in wait(list(by_obj), timeout=0.5):
+                shard = by_obj[obj]
+                if obj is shard.conn:
+                    self._drain(shard)
+                elif shard.proc is not None:
+                    self._reap(shard)
+
+    def request_stop(self, signum=None, frame=None):
+        """Handler SIGINT/SIGTERM: hanya menandai, loop utama yang berhenti."""
+        self._shutdown = True
+
+    def stop(self, timeout=10.0):
+        """Hentikan worker, baca sisa batch, lalu tutup sink (sekali)."""
+        self._stopping = True
+        for shard in self.shards:
+            if shard.proc is not None:
+                shard.proc.terminate()
+        deadline = time.monotonic() + timeout
+        for shard in self.shards:
+            # pipe tetap dibaca agar flush terakhir worker tidak tertahan
+            while shard.proc is not None and time.monotonic() < deadline:
+                shard.proc.join(0.1)
+                if shard.conn is not None:
+                    self._drain(shard)
+                if shard.proc.exitcode is not None:
+                    self._reap(shard)
+            if shard.proc is not None:
+                shard.proc.kill()
+                shard.proc.join(1.0)
+                self._reap(shard)
+        for loggers in self.sinks.values():
+            for logger in loggers:
+                try:
+                    logger.close()
+                except Exception as e:
+                    print(f"Logger close error: {e}")
+
+    def stats(self):
+        out = {}
+        for shard in self.shards:
+            for name in shard.names:
+                st = dict(shard.stats.get(name, {}))
+                st['worker'] = shard.index
+                st['restarts'] = shard.restarts
+                out[name] = st
+        return out
+
+
+def main(config_path=None):
+    cfg = load_config(config_path)
+    daemon = Daemon(cfg, config_path)
+    metrics_from_config(cfg)
+    # Ctrl+C dan SIGTERM (systemd / kill) tidak dilempar sebagai exception
+    # di tengah penulisan sink; loop utama berhenti di iterasi berikutnya
+    signal.signal(signal.SIGINT, daemon.request_stop)
+    signal.signal(signal.SIGTERM, daemon.request_stop)
+    try:
+        daemon.run_forever()
+        print('Stopped')
+    finally:
+        daemon.stop()
+        for name, st in daemon.stats().items():
+            print(f"{name}: worker={st['worker']} restarts={st['restarts']} "
+                  f"polls={st.get('polls', 0)} errors={st.get('errors', 0)}")
+        for loggers in daemon.sinks.values():
+            for lg in iter_loggers(loggers):
+                if hasattr(lg, 'stats'):
+                    print(f'{type(lg).__name__} stats:', lg.stats())
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1] if len(sys.argv) > 1 else None)
+    except ConfigError as e:
+        print(e)
+        raise SystemExit(1)
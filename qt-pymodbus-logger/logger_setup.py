@@ -0,0 +1,195 @@
+"""
+Bangun sink dari config dan terapkan config baru ke poller yang berjalan.
+Dipakai bersama main_cli.py, main_gui.py dan daemon.py.
+"""
+import os
+from config_manager import load_devices
+from storage.csv_logger import CSVLogger
+from storage.mysql_logger import MySQLLogger, NarrowMySQLLogger
+from storage.columnar_logger import ColumnarLogger
+from storage.sqlite_buffer import StoreAndForwardLogger
+from storage.deadband_filter import deadband_from_config
+from storage.sink_dispatcher import dispatcher_from_config
+from storage.rollup import RollupAggregator, window_label
+from modbus_worker import LINK_KEYS, ModbusPoller, make_connection
+from poll_plan import compile_plan
+from register_map import load_points
+from scheduler import PollScheduler
+
+# section yang dibaca build_loggers; berubah -> sink dibangun ulang saat hot reload
+SINK_SECTIONS = ('Logger', 'MYSQL', 'Deadband')
+
+def csv_path(cfg, device=None, suffix=''):
+    """Path CSV [Logger] csv_file; multi-device: csv_file device atau <csv_file>_<nama>."""
+    path = cfg['Logger'].get('csv_file','logs/modbus_data.csv')
+    if device:
+        root, ext = os.path.splitext(path)
+        path = device.get('csv_file', f"{root}_{device['name']}{ext or '.csv'}")
+    if suffix:
+        root, ext = os.path.splitext(path)
+        path = f"{root}_{suffix}{ext or '.csv'}"
+    return path
+
+def build_mysql(cfg, device=None, suffix=''):
+    """
+    Logger MySQL sesuai [MYSQL]; bila enable_store_forward lewat buffer SQLite.
+    suffix (mis. '1m' untuk rollup) ditambahkan ke nama tabel dan file buffer.
+    """
+    logger_cfg = cfg['Logger']
+    mysql_conf = cfg['MYSQL']
+    mysql_conf = {k: mysql_conf.get(k) for k in ('host','user','password','database','table',
+                                                  'batch_size','flush_interval_s','max_buffer',
+                                                  'retry_s','connect_timeout',
+                                                  'partitions_ahead','retention_months')}
+    if device:
+        mysql_conf['table'] = device.get('table', f"{mysql_conf['table']}_{device['name']}")
+    if suffix:
+        mysql_conf['table'] = f"{mysql_conf['table']}_{suffix}"
+    # schema = wide (ts, ch1..chN) atau narrow (ts, channel_id, value) berpartisi
+    narrow = cfg['MYSQL'].get('schema', 'wide').lower() == 'narrow'
+    mysql_logger = (NarrowMySQLLogger if narrow else MySQLLogger)(mysql_conf)
+    if logger_cfg.get('enable_store_forward','false').lower() in ('1','true','yes'):
+        # buffer SQLite lokal; replikator meneruskan ke MySQL per batch
+        db_path = logger_cfg.get('store_forward_db','logs/mysql_buffer.db')
+        root, ext = os.path.splitext(db_path)
+        name = ''.join(f"_{p}" for p in (device['name'] if device else '', suffix) if p)
+        mysql_logger = StoreAndForwardLogger(
+            f"{root}{name}{ext or '.db'}", mysql_logger,
+            batch_rows=int(logger_cfg.get('forward_batch_rows', 5000)),
+            retry_s=float(logger_cfg.get('forward_retry_s', 5)),
+        )
+    return mysql_logger
+
+def build_loggers(cfg, device=None):
+    """Buat logger sesuai [Logger]; untuk multi-device file/tabel diberi nama device."""
+    logger_cfg = cfg['Logger']
+    loggers = []
+    if logger_cfg.get('enable_csv','true').lower() in ('1','true','yes'):
+        loggers.append(CSVLogger(
+            csv_path(cfg, device),
+            flush_rows=int(logger_cfg.get('csv_flush_rows', 100)),
+            flush_interval_s=float(logger_cfg.get('csv_flush_interval_s', 1.0)),
+            fsync=logger_cfg.get('csv_fsync', 'false').lower() in ('1','true','yes'),
+            rotate=logger_cfg.get('csv_rotate', 'none').lower(),
+            max_bytes=int(float(logger_cfg.get('csv_max_mb', 0)) * 1024 * 1024),
+            compress=logger_cfg.get('csv_compress', 'none').lower(),
+            keep_days=float(logger_cfg.get('csv_keep_days', 0)),
+            keep_files=int(logger_cfg.get('csv_keep_files', 0)),
+            index_every_bytes=int(float(logger_cfg.get('csv_index_kb', 0)) * 1024),
+        ))
+    if logger_cfg.get('enable_mysql','false').lower() in ('1','true','yes'):
+        loggers.append(build_mysql(cfg, device))
+    if logger_cfg.get('enable_columnar','false').lower() in ('1','true','yes'):
+        loggers.append(ColumnarLogger(
+            logger_cfg.get('columnar_dir','logs/columnar'),
+            name=device['name'] if device else 'modbus',
+            chunk_rows=int(logger_cfg.get('columnar_chunk_rows', 3600)),
+            chunk_s=float(logger_cfg.get('columnar_chunk_s', 300)),
+        ))
+    # thread penulis per sink agar sink lambat tidak menahan poll (opsional)
+    loggers = dispatcher_from_config(cfg, loggers, device)
+    # filter report-by-exception di depan semua sink (opsional)
+    loggers = deadband_from_config(cfg, loggers)
+    # rollup menerima data mentah, bukan hasil filter deadband
+    rollup = build_rollup(cfg, device)
+    return loggers + [rollup] if rollup else loggers
+
+def build_rollup(cfg, device=None):
+    """
+    RollupAggregator sesuai enable_rollup / rollup_windows di [Logger].
+    Tiap window ditulis ke CSV <csv_file>_<1m|15m|1h>.csv dan/atau tabel
+    MySQL <table>_<1m|15m|1h>, mengikuti enable_csv / enable_mysql, lewat
+    store-and-forward / async_sinks yang sama dengan sink data mentah.
+    Window yang berjalan saat close disimpan ke <csv_file>_rollup.json.
+    """
+    logger_cfg = cfg['Logger']
+    if logger_cfg.get('enable_rollup','false').lower() not in ('1','true','yes'):
+        return None
+    windows = {}
+    for w in logger_cfg.get('rollup_windows', '60, 900, 3600').split(','):
+        seconds = int(w)
+        label = window_label(seconds)
+        sinks = []
+        if logger_cfg.get('enable_csv','true').lower() in ('1','true','yes'):
+            sinks.append(CSVLogger(csv_path(cfg, device, label)))
+        if logger_cfg.get('enable_mysql','false').lower() in ('1','true','yes'):
+            sinks.append(build_mysql(cfg, device, label))
+        # thread penulis sendiri per window: flush MySQL tidak menahan thread poll
+        prefix = f"{device['name']}_{label}" if device else label
+        windows[seconds] = dispatcher_from_config(cfg, sinks, {'name': prefix})
+    # window yang belum selesai disimpan saat close, dilanjutkan saat dibuat lagi
+    state_path = f"{os.path.splitext(csv_path(cfg, device))[0]}_rollup.json"
+    return RollupAggregator(windows, state_path=state_path)
+
+def iter_loggers(loggers):
+    """Semua logger termasuk yang dibungkus filter/dispatcher."""
+    for lg in loggers:
+        yield lg
+        yield from iter_loggers(getattr(lg, 'loggers', []))
+
+def apply_config(target, cfg, diff):
+    """
+    Hot reload: terapkan cfg baru ke ModbusPoller (mode satu device),
+    PollScheduler atau AsyncPollEngine yang sedang berjalan; hanya bagian
+    yang berubah diganti, koneksi dan buffer sink lain tetap.
+    Return {device: [perubahan]}, atau None bila perubahan butuh restart
+    (ganti engine / mode satu <-> multi device pada engine thread).
+    ConfigError bila config baru salah; yang berjalan tidak diubah.
+    """
+    rebuild_sinks = diff.touches(*SINK_SECTIONS)
+    devices = load_devices(cfg)
+    engine = cfg['Modbus'].get('engine', 'thread').lower()
+    if engine == 'async':
+        # import di sini: engine async butuh pymodbus >= 3
+        from async_worker import AsyncPollEngine
+        if not isinstance(target, AsyncPollEngine):
+            return None
+        if devices:
+            loggers_for = lambda d: build_loggers(cfg, d)
+        else:
+            # tanpa [Device:..]: [Modbus] jadi satu device bernama 'device'
+            devices = [dict(cfg['Modbus'], name='device')]
+            loggers_for = lambda d: build_loggers(cfg)
+        return target.reconfigure(
+            devices,
+            points_for=lambda d: load_points(cfg, d.get('points', 'Points')),
+            loggers_for=loggers_for,
+            rebuild_sinks=rebuild_sinks,
+        )
+    if engine != 'thread' or not isinstance(target, (PollScheduler, ModbusPoller)):
+        return None
+    if isinstance(target, PollScheduler):
+        if not devices:
+            return None
+        # points / sink dibaca dari cfg baru, bukan cfg saat startup
+        return target.reconfigure(
+            devices,
+            points_for=lambda d: load_points(cfg, d.get('points', 'Points')),
+            loggers_for=lambda d: build_loggers(cfg, d),
+            rebuild_sinks=rebuild_sinks,
+        )
+    if devices:
+        return None
+
+    # mode satu device: diterapkan di thread poll sebelum poll berikutnya
+    old = target.cfg
+    new = dict(cfg['Modbus'])
+    plan = compile_plan(new, load_points(cfg))
+    loggers = (lambda: build_loggers(cfg)) if rebuild_sinks else None
+    relink = any(old.get(k) != new.get(k) for k in LINK_KEYS)
+    cur = target.plan
+    changes = [c for c, hit in (
+        ('plan', (plan.unit_id, plan.points, plan.requests) != (cur.unit_id, cur.points, cur.requests)),
+        ('interval', plan.interval_s != cur.interval_s),
+        ('connection', relink),
+        ('sinks', rebuild_sinks)) if hit]
+
+    def apply(poller):
+        conn = None
+        if relink:
+            poller.conn.close()
+            conn = make_connection(new)
+        poller.reconfigure(new, plan, conn=conn, loggers=loggers)
+
+    target.submit(apply)
+    return {'modbus': changes} if changes else {}
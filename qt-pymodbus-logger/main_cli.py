@@ -1,29 +1,119 @@
-import time, os
-from config_manager import load_config
-from storage.csv_logger import CSVLogger
-from storage.mysql_logger import MySQLLogger
+import time, os, sys
+from config_manager import load_config, load_devices, ConfigError, ConfigWatcher
+from logger_setup import apply_config, build_loggers, iter_loggers
 from modbus_worker import ModbusPoller
+from metrics import metrics_from_config
+from register_map import load_points
+from scheduler import PollScheduler
+
+def watch_config(cfg, target, config_path=None):
+    """Watcher config.ini untuk CLI bila watch_config = true di [Modbus]."""
+    if cfg['Modbus'].get('watch_config', 'false').lower() not in ('1','true','yes'):
+        return None
+
+    def on_change(new, diff):
+        changes = apply_config(target, new, diff)
+        if changes is None:
+            print(f"Config changed ({diff}); restart needed to apply")
+        else:
+            print(f"Config reloaded ({diff}): {changes or 'no poller changes'}")
+
+    return ConfigWatcher(on_change, config_path).start()
+
+def run_devices(cfg, devices, config_path=None):
+    def on_error(name, e):
+        print(f"[{name}] {type(e).__name__}: {e}")
+
+    sched = PollScheduler(
+        devices,
+        points_for=lambda d: load_points(cfg, d.get('points', 'Points')),
+        loggers_for=lambda d: build_loggers(cfg, d),
+        on_error=on_error,
+    )
+    print(f"Polling {len(devices)} devices on {len(sched.links)} links")
+    watcher = watch_config(cfg, sched, config_path)
+    try:
+        sched.run_forever()
+    except KeyboardInterrupt:
+        print('Stopped by user')
+    finally:
+        if watcher:
+            watcher.stop()
+        sched.stop()
+        for name, st in sched.stats().items():
+            print(f"{name}: polls={st['polls']} errors={st['errors']} connection={st['connection']}")
+
+def run_async(cfg, devices, config_path=None):
+    import asyncio
+    from async_worker import AsyncPollEngine
+
+    if devices:
+        loggers_for = lambda d: build_loggers(cfg, d)
+    else:
+        devices = [dict(cfg['Modbus'], name='device')]
+        loggers_for = lambda d: build_loggers(cfg)
+
+    def on_error(name, e):
+        print(f"[{name}] {type(e).__name__}: {e}")
+
+    engine = AsyncPollEngine(
+        devices,
+        points_for=lambda d: load_points(cfg, d.get('points', 'Points')),
+        loggers_for=loggers_for,
+        on_error=on_error,
+    )
+    print(f"Async polling {len(devices)} devices")
+    watcher = watch_config(cfg, engine, config_path)
+    try:
+        asyncio.run(engine.run())
+    except KeyboardInterrupt:
+        print('Stopped by user')
+    finally:
+        if watcher:
+            watcher.stop()
+        for name, st in engine.stats.items():
+            print(f"{name}: polls={st['polls']} errors={st['errors']}")
+        print('Connection stats:', engine.connection_stats())
+
+def main(config_path=None):
+    cfg = load_config(config_path)
+    devices = load_devices(cfg)
+    # endpoint /metrics Prometheus dan baris stats periodik (section [Metrics])
+    metrics_from_config(cfg)
+    if cfg['Modbus'].get('engine', 'thread').lower() == 'async':
+        run_async(cfg, devices, config_path)
+        return
+    if devices:
+        run_devices(cfg, devices, config_path)
+        return
 
-def main():
-    cfg = load_config()
     modbus = cfg['Modbus']
-    logger_cfg = cfg['Logger']
-
-    loggers = []
-    if logger_cfg.get('enable_csv','true').lower() in ('1','true','yes'):
-        csv_path = logger_cfg.get('csv_file','logs/modbus_data.csv')
-        loggers.append(CSVLogger(csv_path))
-    if logger_cfg.get('enable_mysql','false').lower() in ('1','true','yes'):
-        mysql_conf = cfg['MYSQL']
-        mysql_conf = {k: mysql_conf.get(k) for k in ('host','user','password','database','table')}
-        loggers.append(MySQLLogger(mysql_conf))
-
-    poll = ModbusPoller(dict(modbus), logger_list=loggers)
-    interval = float(modbus.get('poll_interval', 1.0))
+    loggers = build_loggers(cfg)
+
+    poll = ModbusPoller(dict(modbus), logger_list=loggers, points=load_points(cfg))
+    interval = poll.plan.interval_s
+    watcher = watch_config(cfg, poll, config_path)
     try:
         poll.run_loop(interval)
     except KeyboardInterrupt:
         print('Stopped by user')
+    finally:
+        if watcher:
+            watcher.stop()
+        # sink bisa sudah diganti hot reload
+        loggers = poll.logger_list
+        poll.close()
+        print('Connection stats:', poll.connection_stats())
+        print('Timing stats:', poll.timing_stats())
+        for lg in iter_loggers(loggers):
+            if hasattr(lg, 'stats'):
+                print(f'{type(lg).__name__} stats:', lg.stats())
 
 if __name__ == '__main__':
-    main()
+    try:
+        # argumen opsional: path config.ini lain (default di samping skrip)
+        main(sys.argv[1] if len(sys.argv) > 1 else None)
+    except ConfigError as e:
+        # config salah dilaporkan sekali saat startup, lalu keluar
+        print(e)
+        raise SystemExit(1)
@@ -3,20 +3,23 @@
 # Requires: PyQt5, config_manager.py, modbus_worker.py, storage/*.py
 # Save this file in the project root next to config_manager.py
 
+import asyncio
 import os
 import sys
+import threading
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
     QTextEdit, QLabel, QTabWidget, QFormLayout, QLineEdit, QComboBox,
     QSpinBox, QFileDialog, QMessageBox, QCheckBox
 )
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
 
-from config_manager import load_config, save_config
-from storage.csv_logger import CSVLogger
-from storage.mysql_logger import MySQLLogger
+from config_manager import load_config, save_config, load_devices, ConfigError, ConfigWatcher
 from modbus_worker import ModbusPoller
+from register_map import load_points
+from scheduler import PollScheduler
+from logger_setup import apply_config, build_loggers, iter_loggers
 import serial.tools.list_ports
 
 # Thread wrapper for polling (calls run_once periodically)
@@ -27,26 +30,66 @@ class PollThread(QThread):
         super().__init__()
         self.poller = poller
         self.interval_s = max(0.1, float(interval_s))
-        self._running = True
+        self._stop_event = threading.Event()
 
     def run(self):
-        while self._running:
+        # laju tetap: tidak bergeser sebesar waktu poll
+        self.poller.timer = timer = self.poller.make_timer(self.interval_s)
+        while timer.wait(self._stop_event):
             try:
                 ts, entries = self.poller.run_once()
-                values = "; ".join([f"{e['value']:.6g}" for e in entries])
+                values = "; ".join([f"{e['value']:.6g}" if e['value'] is not None else "-" for e in entries])
                 self.logline.emit(f"[{ts}] {values}")
             except Exception as e:
                 self.logline.emit(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {e}")
-            # sleep using QThread.sleep would block; use wait with milliseconds
-            self.msleep(int(self.interval_s * 1000))
+        # tutup koneksi persistent di thread yang sama
+        self.poller.close()
 
     def stop(self):
-        self._running = False
+        self._stop_event.set()
         # ensure the thread loop exits quickly
         self.wait(1000)
 
 
+# Bridge Qt <-> asyncio: event loop AsyncPollEngine berjalan di QThread sendiri
+class AsyncEngineThread(QThread):
+    logline = pyqtSignal(str)
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self.loop = None
+        engine.on_result = self._on_result
+        engine.on_error = self._on_error
+
+    def _on_result(self, name, ts, entries):
+        values = "; ".join([f"{e['value']:.6g}" if e['value'] is not None else "-" for e in entries])
+        self.logline.emit(f"[{ts}] {name}: {values}")
+
+    def _on_error(self, name, e):
+        self.logline.emit(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {name} error: {e}")
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self.engine.run())
+        finally:
+            self.loop.close()
+            self.loop = None
+
+    def stop(self):
+        loop = self.loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self.engine.stop)
+        else:
+            self.engine.stop()
+        self.wait(3000)
+
+
 class MainWindow(QWidget):
+    # dipakai callback scheduler dari thread link (queued ke thread GUI)
+    logline = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Modbus Logger v1.1")
@@ -56,11 +99,22 @@ class MainWindow(QWidget):
         self.config = load_config()
         self.poll_thread = None
         self.poller = None
+        self.scheduler = None
+        self.engine = None
+        self.loggers = []
+        self.logline.connect(self.on_logline)
 
         # UI
         self._build_ui()
         self._load_settings_to_form()
 
+        # config.ini dipantau; perubahan diterapkan ke poller yang berjalan
+        self.watcher = ConfigWatcher(self.apply_config_change)
+        self._config_error = None
+        self.config_timer = QTimer(self)
+        self.config_timer.timeout.connect(lambda: self._check_config())
+        self.config_timer.start(1000)
+
     def _build_ui(self):
         main_layout = QVBoxLayout(self)
 
@@ -109,6 +163,8 @@ class MainWindow(QWidget):
         self.cmb_encoding = QComboBox(); self.cmb_encoding.addItems([
             "float32be", "float32le", "float32cdab", "float32badc", "u16"
         ])
+        self.cmb_encoding.addItems(["int16"] + [f"{t}{o}" for t in ("int32", "uint32", "float64", "int64")
+                                                for o in ("be", "le", "cdab", "badc")])
         self.le_poll_interval = QLineEdit()
 
         # Logger section
@@ -300,12 +356,45 @@ class MainWindow(QWidget):
             return
 
         self.log("Config saved to config.ini")
-        # reload config object and if polling running, restart poller
-        self.config = load_config()
-        if self.poll_thread and self.poll_thread.isRunning():
+        # poller yang berjalan hanya menerapkan bagian yang berubah
+        self._check_config(immediate=True)
+
+    def _check_config(self, immediate=False):
+        try:
+            if immediate:
+                self.watcher.check()
+            else:
+                self.watcher.poll()
+            self._config_error = None
+        except ConfigError as e:
+            # config baru ditolak; poller tetap memakai config lama.
+            # watcher mencoba lagi tiap detik, error yang sama cukup sekali
+            if immediate or str(e) != self._config_error:
+                self.log(f"Config error: {e}")
+                QMessageBox.critical(self, "Config error", str(e))
+            self._config_error = str(e)
+
+    def apply_config_change(self, cfg, diff):
+        """Dipanggil ConfigWatcher saat config.ini berubah (form atau editor lain)."""
+        self.log(f"Config changed: {diff}")
+        running = (self.poll_thread and self.poll_thread.isRunning()) or self.scheduler
+        changes = None
+        if running:
+            target = self.scheduler or self.poller or self.engine
+            if target is not None:
+                changes = apply_config(target, cfg, diff)
+        self.config = cfg
+        self._load_settings_to_form()
+        if not running:
+            return
+        if changes is None:
             self.log("Restarting poller with new config...")
             self.stop_polling()
             self.start_polling()
+        elif changes:
+            self.log("Applied: " + "; ".join(f"{n}: {', '.join(c)}" for n, c in changes.items()))
+        else:
+            self.log("No poller changes.")
 
     def reload_config(self):
         self.config = load_config()
@@ -313,50 +402,118 @@ class MainWindow(QWidget):
         self.log("Config reloaded from file.")
 
     def start_polling(self):
-        if self.poll_thread and self.poll_thread.isRunning():
+        if (self.poll_thread and self.poll_thread.isRunning()) or self.scheduler:
             self.log("Polling already running.")
             return
 
+        try:
+            self._start_polling()
+        except ConfigError as e:
+            # config salah ditolak sebelum thread poll jalan
+            self.poll_thread = None
+            self.poller = None
+            self.scheduler = None
+            self.engine = None
+            self.log(f"Config error: {e}")
+            QMessageBox.critical(self, "Config error", str(e))
+
+    def _start_polling(self):
         # create logger instances according to config
         cfg = self.config
         modcfg = cfg['Modbus']
-        logcfg = cfg['Logger']
-
-        loggers = []
-        if logcfg.get('enable_csv','false').lower() in ('1','true','yes'):
-            csv_path = logcfg.get('csv_file','logs/modbus_data.csv')
-            # ensure logs directory exists
-            d = os.path.dirname(csv_path)
-            if d and not os.path.exists(d):
-                os.makedirs(d, exist_ok=True)
-            loggers.append(CSVLogger(csv_path))
-        if logcfg.get('enable_mysql','false').lower() in ('1','true','yes'):
-            mysql_conf = cfg['MYSQL']
-            mysql_conf = {k: mysql_conf.get(k) for k in ('host','user','password','database','table')}
-            loggers.append(MySQLLogger(mysql_conf))
+        devices = load_devices(cfg)
+        if modcfg.get('engine', 'thread').lower() == 'async':
+            self._start_async_engine(cfg, devices)
+            return
+        if devices:
+            self._start_scheduler(cfg, devices)
+            return
+
+        # CSV / MySQL sesuai [Logger], dibungkus filter deadband bila aktif
+        loggers = build_loggers(cfg)
+        self.loggers = loggers
 
         # create poller
         # Convert configparser section to regular dict for modbus_worker expectation
         moddict = dict(modcfg)
-        print(moddict)
-        self.poller = ModbusPoller(moddict, logger_list=loggers)
+        self.poller = ModbusPoller(moddict, logger_list=loggers, points=load_points(cfg))
 
         # start thread
-        interval = float(moddict.get('poll_interval', 1.0))
+        interval = self.poller.plan.interval_s
         self.poll_thread = PollThread(self.poller, interval)
         self.poll_thread.logline.connect(self.on_logline)
         self.poll_thread.start()
         self.log("Polling started.")
 
+    def _start_async_engine(self, cfg, devices):
+        # import di sini: engine async butuh pymodbus >= 3
+        from async_worker import AsyncPollEngine
+        if devices:
+            loggers_for = lambda d: build_loggers(cfg, d)
+        else:
+            devices = [dict(cfg['Modbus'], name='device')]
+            loggers_for = lambda d: build_loggers(cfg)
+        engine = AsyncPollEngine(
+            devices,
+            points_for=lambda d: load_points(cfg, d.get('points', 'Points')),
+            loggers_for=loggers_for,
+        )
+        self.poller = None
+        self.engine = engine
+        self.poll_thread = AsyncEngineThread(engine)
+        self.poll_thread.logline.connect(self.on_logline)
+        self.poll_thread.start()
+        self.log(f"Async polling started: {len(devices)} devices.")
+
+    def _start_scheduler(self, cfg, devices):
+        def on_result(name, ts, entries):
+            values = "; ".join([f"{e['value']:.6g}" if e['value'] is not None else "-" for e in entries])
+            self.logline.emit(f"[{ts}] {name}: {values}")
+
+        def on_error(name, e):
+            self.logline.emit(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {name} error: {e}")
+
+        self.scheduler = PollScheduler(
+            devices,
+            points_for=lambda d: load_points(cfg, d.get('points', 'Points')),
+            loggers_for=lambda d: build_loggers(cfg, d),
+            on_result=on_result,
+            on_error=on_error,
+        )
+        self.scheduler.start()
+        self.log(f"Polling started: {len(devices)} devices on {len(self.scheduler.links)} links.")
+
     def stop_polling(self):
+        if self.scheduler:
+            self.scheduler.stop()
+            for name, st in self.scheduler.stats().items():
+                self.log(f"{name}: polls={st['polls']} errors={st['errors']}")
+            self.scheduler = None
+            self.log("Polling stopped.")
+            return
         if not self.poll_thread:
             self.log("Poller not running.")
             return
+        # sink bisa sudah diganti hot reload
+        loggers = self.poller.logger_list if self.poller else self.loggers
         try:
             self.poll_thread.stop()
         except Exception:
             pass
         self.poll_thread = None
+        self.engine = None
+        if self.poller:
+            st = self.poller.connection_stats()
+            self.log(f"Connection stats: connects={st['connects']} reuses={st['reuses']} "
+                     f"failures={st['failures']} drops={st['drops']}")
+            for lg in iter_loggers(loggers):
+                if hasattr(lg, 'stats'):
+                    self.log(f"{type(lg).__name__}: {lg.stats()}")
+            ts = self.poller.timing_stats()
+            if ts:
+                self.log(f"Timing: ticks={ts['ticks']} overruns={ts['overruns']} skipped={ts['skipped']} "
+                         f"lateness mean={ts['lateness']['mean_ms']:.1f}ms max={ts['lateness']['max_ms']:.1f}ms "
+                         f"jitter max={ts['jitter']['max_ms']:.1f}ms")
         self.log("Polling stopped.")
 
     def on_logline(self, text):
@@ -370,6 +527,8 @@ class MainWindow(QWidget):
         # stop thread if running
         if self.poll_thread and self.poll_thread.isRunning():
             self.poll_thread.stop()
+        if self.scheduler:
+            self.scheduler.stop()
         event.accept()
 
 
@@ -0,0 +1,236 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from timing import Histogram
+
+# tahap poll; sink dicatat sebagai 'sink:<kelas logger>'
+STAGES = ('connect', 'request', 'decode')
+# bucket lebih halus dari default agar decode (mikrodetik) tetap terlihat
+STAGE_BOUNDS_MS = (0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+
+class PollMetrics:
+    """
+    Waktu per tahap poll dan jumlah error per (tahap, jenis) untuk satu device.
+    Ditulis dari thread poller saja; dibaca endpoint HTTP / baris stats.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {s: Histogram(STAGE_BOUNDS_MS) for s in STAGES}
+        self.poll = Histogram(STAGE_BOUNDS_MS)
+        self.errors = {}
+
+    @property
+    def polls(self):
+        return self.poll.count
+
+    def observe(self, stage, seconds):
+        h = self.stages.get(stage)
+        if h is None:
+            h = self.stages[stage] = Histogram(STAGE_BOUNDS_MS)
+        h.add(seconds)
+
+    def error(self, stage, exc):
+        """exc: exception atau nama jenis error (mis. 'ExceptionResponse')."""
+        key = (stage, exc if isinstance(exc, str) else type(exc).__name__)
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def update_from(self, remote):
+        """
+        Ambil alih snapshot PollMetrics dari proses worker (daemon.py).
+        Tahap/error yang hanya dicatat proses ini (sink induk) tetap.
+        """
+        self.poll = remote.poll
+        self.stages.update(remote.stages)
+        self.errors.update(remote.errors)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(metric, labels, h):
+    out = []
+    cumulative = 0
+    for bound, n in zip(h.bounds_ms, h.counts):
+        cumulative += n
+        out.append(f'{metric}_bucket{{{labels},le="{bound / 1000.0:g}"}} {cumulative}')
+    out.append(f'{metric}_bucket{{{labels},le="+Inf"}} {h.count}')
+    out.append(f'{metric}_sum{{{labels}}} {h.total / 1000.0:.6f}')
+    out.append(f'{metric}_count{{{labels}}} {h.count}')
+    return out
+
+
+def _quantile_ms(bounds, counts, q):
+    """Batas atas bucket yang memuat kuantil q (perkiraan dari histogram)."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, n in zip(list(bounds) + [float('inf')], counts):
+        seen += n
+        if seen >= rank:
+            return bound
+    return float('inf')
+
+
+class MetricsRegistry:
+    """Kumpulan PollMetrics per device; format Prometheus dan baris stats CLI."""
+
+    def __init__(self):
+        self.devices = {}
+        self._lock = threading.Lock()
+        self._last = {}
+        self._last_time = time.monotonic()
+        self._server = None
+
+    def device(self, name):
+        with self._lock:
+            m = self.devices.get(name)
+            if m is None:
+                m = self.devices[name] = PollMetrics(name)
+            return m
+
+    def render(self):
+        """Teks eksposisi Prometheus (text format 0.0.4)."""
+        devices = list(self.devices.values())
+        lines = [
+            '# HELP modbus_poll_seconds Duration of a successful poll.',
+            '# TYPE modbus_poll_seconds histogram',
+        ]
+        for m in devices:
+            lines += _histogram_lines('modbus_poll_seconds', f'device="{_label(m.name)}"', m.poll)
+        lines += [
+            '# HELP modbus_poll_stage_seconds Duration of each poll stage (connect, request, decode, sink:<name>).',
+            '# TYPE modbus_poll_stage_seconds histogram',
+        ]
+        for m in devices:
+            for stage, h in list(m.stages.items()):
+                labels = f'device="{_label(m.name)}",stage="{_label(stage)}"'
+                lines += _histogram_lines('modbus_poll_stage_seconds', labels, h)
+        lines += [
+            '# HELP modbus_poll_errors_total Poll errors by stage and exception type.',
+            '# TYPE modbus_poll_errors_total counter',
+        ]
+        for m in devices:
+            for (stage, kind), n in list(m.errors.items()):
+                lines.append(f'modbus_poll_errors_total{{device="{_label(m.name)}",'
+                             f'stage="{_label(stage)}",type="{_label(kind)}"}} {n}')
+        return '\n'.join(lines) + '\n'
+
+    # --- baris stats periodik ---
+    def summary(self):
+        """Satu baris ringkas untuk selang sejak panggilan sebelumnya."""
+        now = time.monotonic()
+        elapsed = max(1e-9, now - self._last_time)
+        self._last_time = now
+        polls = 0
+        poll_counts = None
+        stage_delta = {}
+        error_delta = {}
+        for m in list(self.devices.values()):
+            prev = self._last.get(m.name, {})
+            cur = {'poll': (m.poll.count, m.poll.total, list(m.poll.counts))}
+            p_count, _, p_counts = prev.get('poll', (0, 0.0, [0] * len(m.poll.counts)))
+            if m.poll.count < p_count:
+                # snapshot worker daemon yang baru di-restart: counter mulai dari 0
+                prev = {}
+                p_count, p_counts = 0, [0] * len(m.poll.counts)
+            polls += m.poll.count - p_count
+            delta = [a - b for a, b in zip(m.poll.counts, p_counts)]
+            poll_counts = delta if poll_counts is None else [a + b for a, b in zip(poll_counts, delta)]
+            for stage, h in list(m.stages.items()):
+                cur[stage] = (h.count, h.total)
+                c0, t0 = prev.get(stage, (0, 0.0))
+                c, t = stage_delta.get(stage, (0, 0.0))
+                stage_delta[stage] = (c + h.count - c0, t + h.total - t0)
+            errors = dict(m.errors)
+            cur['errors'] = errors
+            for key, n in errors.items():
+                d = n - prev.get('errors', {}).get(key, 0)
+                if d:
+                    error_delta[key[1]] = error_delta.get(key[1], 0) + d
+            self._last[m.name] = cur
+
+        parts = [f'[stats {elapsed:.0f}s] polls={polls} ({polls / elapsed:.1f}/s)',
+                 f'errors={sum(error_delta.values())}']
+        if error_delta:
+            parts.append('{' + ', '.join(f'{k}:{v}' for k, v in sorted(error_delta.items())) + '}')
+        if poll_counts:
+            p50 = _quantile_ms(STAGE_BOUNDS_MS, poll_counts, 0.50)
+            p99 = _quantile_ms(STAGE_BOUNDS_MS, poll_counts, 0.99)
+            if p50 is not None:
+                parts.append(f'poll p50<={p50:g}ms p99<={p99:g}ms')
+        means = [f'{stage}={t / c:.2f}' for stage, (c, t) in stage_delta.items() if c]
+        if means:
+            parts.append('| ' + ' '.join(means) + ' ms')
+        return ' '.join(parts)
+
+    def start_reporter(self, interval_s, out=print, stop_event=None):
+        """Thread latar yang mencetak summary() tiap interval_s detik."""
+        stop_event = stop_event or threading.Event()
+
+        def loop():
+            while not stop_event.wait(interval_s):
+                out(self.summary())
+
+        self.summary()
+        threading.Thread(target=loop, name='metrics-reporter', daemon=True).start()
+        return stop_event
+
+    # --- endpoint HTTP ---
+    def serve(self, port, host='127.0.0.1'):
+        """Layani GET /metrics di host:port (thread latar); return server."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                # tidak mencetak log akses tiap scrape
+                pass
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        self._server = server
+        return server
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# satu registry per proses; poller mendaftar lewat registry.device(nama)
+registry = MetricsRegistry()
+
+
+def metrics_from_config(cfg):
+    """
+    Jalankan endpoint / baris stats sesuai section [Metrics] (opsional):
+      port = 9105           (0 = tanpa HTTP)
+      host = 127.0.0.1
+      stats_interval_s = 10 (0 = tanpa baris stats)
+    """
+    port = int(cfg.get('Metrics', 'port', fallback='0') or 0)
+    if port:
+        host = cfg.get('Metrics', 'host', fallback='127.0.0.1')
+        registry.serve(port, host)
+        print(f"Metrics on http://{host}:{port}/metrics")
+    interval = float(cfg.get('Metrics', 'stats_interval_s', fallback='0') or 0)
+    if interval > 0:
+        registry.start_reporter(interval)
+    return registry
@@ -9,25 +9,43 @@ except Exception:
         raise ImportError('pymodbus client not found; install pymodbus')
 
 
+def pymodbus_version():
+    """(major, minor) pymodbus terpasang; 0 untuk bagian yang bukan angka."""
+    from pymodbus import __version__
+    parts = __version__.split('.')
+    major = int(parts[0]) if parts and parts[0].isdigit() else 0
+    minor = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+    return major, minor
+
+
+def device_key(version=None):
+    """
+    Nama argumen unit ID untuk request pymodbus:
+    <3 pakai unit, 3.0–3.10 pakai slave, 3.11+ (termasuk 4.x) pakai device_id.
+    """
+    major, minor = version or pymodbus_version()
+    if major < 3:
+        return 'unit'
+    if major == 3 and minor < 11:
+        return 'slave'
+    return 'device_id'
+
+
 class ModbusClient:
     def __init__(self, mode='rtu', cfg=None):
         self.mode = mode.lower()
         self.cfg = cfg or {}
         self.client = None
 
-        # --- deteksi versi pymodbus ---
-        from pymodbus import __version__
-        parts = __version__.split('.')
-        self.v_major = int(parts[0]) if parts and parts[0].isdigit() else 0
-        self.v_minor = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        self.v_major, self.v_minor = pymodbus_version()
 
         # true jika sudah >= 3.x
         self.v3 = self.v_major >= 3
+        self.dev_key = device_key((self.v_major, self.v_minor))
 
     def open(self):
         if self.mode == 'rtu':
-            self.client = ModbusSerialClient(
-                method=self.cfg.get('method', 'rtu'),
+            kwargs = dict(
                 port=self.cfg.get('port', '/dev/ttyUSB0'),
                 baudrate=int(self.cfg.get('baudrate', 9600)),
                 bytesize=int(self.cfg.get('bytesize', 8)),
@@ -35,6 +53,10 @@ class ModbusClient:
                 stopbits=int(self.cfg.get('stopbits', 1)),
                 timeout=float(self.cfg.get('timeout', 1))
             )
+            # pymodbus 3.x tidak menerima method (framer default sudah RTU)
+            if not self.v3:
+                kwargs['method'] = self.cfg.get('method', 'rtu')
+            self.client = ModbusSerialClient(**kwargs)
         else:
             self.client = ModbusTcpClient(
                 host=self.cfg.get('host', '127.0.0.1'),
@@ -49,27 +71,29 @@ class ModbusClient:
                 self.client.close()
             except Exception:
                 pass
+            self.client = None
+
+    def is_open(self):
+        """True bila socket/port serial masih terbuka"""
+        if not self.client:
+            return False
+        try:
+            if hasattr(self.client, 'is_socket_open'):
+                return bool(self.client.is_socket_open())
+            return bool(getattr(self.client, 'connected', False))
+        except Exception:
+            return False
 
     # --- internal helper agar lintas versi ---
     def _call(self, func, address, count=None, unit=1, values=None):
         """Handle argumen unit/slave/device_id per versi"""
-        kwargs = {"address": address}
+        kwargs = {"address": address, self.dev_key: unit}
 
         if count is not None:
             kwargs["count"] = count
         if values is not None:
             kwargs["values" if isinstance(values, (list, tuple)) else "value"] = values
 
-        # versi 3.11+ pakai device_id
-        if self.v_major >= 3 and self.v_minor >= 11:
-            kwargs["device_id"] = unit
-        # versi 3.0–3.10 pakai slave
-        elif self.v_major >= 3:
-            kwargs["slave"] = unit
-        # versi lama (<3)
-        else:
-            kwargs["unit"] = unit
-
         return func(**kwargs)
 
     # === wrappers ===
@@ -1,90 +1,241 @@
-from datetime import datetime
 import time
-from modbus_client_v3 import ModbusClient
+from collections import deque
+from datetime import datetime
+from connection_manager import TRANSPORT_ERRORS, ConnectionManager
+from rtu_bus import get_bus, PRIORITY_NORMAL
+from pipelined_tcp import PipelinedTcpClient
+from timing import FixedRateTimer
+from poll_plan import compile_plan
+from metrics import registry
+
+# key yang menentukan koneksi link; perubahan key lain tidak perlu reconnect
+LINK_KEYS = ('type', 'port', 'baudrate', 'bytesize', 'parity', 'stopbits', 'timeout',
+             'host', 'tcp_port', 'pipeline_depth', 'pipeline_fallback_after',
+             'pipeline_retry_s', 'reconnect_backoff', 'reconnect_backoff_max', 'bus_priority')
+
+def make_connection(cfg):
+    """
+    Koneksi default untuk satu link: RTU lewat arbiter bus agar port bisa
+    dipakai bersama, TCP lewat ConnectionManager (pipelined bila
+    pipeline_depth > 1).
+    """
+    if cfg.get('type', 'rtu').lower() == 'rtu':
+        return get_bus(cfg).connection(int(cfg.get('bus_priority', PRIORITY_NORMAL)))
+    factory = None
+    if int(cfg.get('pipeline_depth', 1)) > 1:
+        # satu objek dipakai ulang agar hasil deteksi fallback tidak hilang
+        pipelined = PipelinedTcpClient.from_cfg(cfg)
+        factory = lambda c: pipelined
+    return ConnectionManager(
+        cfg,
+        backoff_initial=float(cfg.get('reconnect_backoff', 0.5)),
+        backoff_max=float(cfg.get('reconnect_backoff_max', 30.0)),
+        factory=factory,
+    )
+
 
 class ModbusPoller:
-    def __init__(self, cfg, logger_list=None):
+    def __init__(self, cfg, logger_list=None, points=None, conn=None, plan=None):
         self.cfg = cfg
         self.logger_list = logger_list or []
+        self.timer = None
+
+        # config divalidasi dan dikompilasi sekali di sini (ConfigError
+        # bila salah), bukan diperiksa ulang tiap poll
+        if plan is None:
+            where = f"[Device:{cfg['name']}]" if cfg.get('name') else '[Modbus]'
+            plan = compile_plan(cfg, points, where=where)
+        self.plan = plan
+        # koneksi dipakai ulang antar poll, bukan open/close tiap poll;
+        # beberapa poller di satu link (gateway/bus) bisa berbagi conn
+        self.conn = conn or make_connection(cfg)
+        self.unit_id = self.plan.unit_id
+        self.points = self.plan.points
+        self.blocks = self.plan.blocks
+        self.requests = self.plan.requests
+        # method baca terikat per client; diikat ulang bila client berganti
+        self._bound_client = None
+        self._readers = ()
+        # waktu per tahap dan error per jenis (metrics.py)
+        self.metrics = registry.device(cfg.get('name') or 'modbus')
+        # perubahan config (hot reload) dijalankan di thread poll, antar poll
+        self._pending = deque()
+
+    def _bind(self, mc):
+        if mc is not self._bound_client:
+            self._readers = tuple(getattr(mc, b.method) for b in self.blocks)
+            self._bound_client = mc
+        return self._readers
+
+    def _read_blocks(self, mc):
+        uid = self.unit_id
+        return (read(b.address, b.count, unit=uid)
+                for read, b in zip(self._bind(mc), self.blocks))
+
+    @staticmethod
+    def _block_regs(block, rr):
+        # exception response dari device: link tetap sehat, nilai None
+        if hasattr(rr, 'isError') and rr.isError():
+            return []
+        if block.function in ('coils', 'discrete'):
+            return getattr(rr, 'bits', [])
+        return getattr(rr, 'registers', [])
+
+    def submit(self, fn):
+        """Jadwalkan fn(poller) di thread poll sebelum poll berikutnya."""
+        self._pending.append(fn)
+
+    def reconfigure(self, cfg, plan, conn=None, loggers=None):
+        """
+        Terapkan config baru tanpa membuat poller baru. Harus dipanggil di
+        thread poll (lewat submit / LinkWorker.call). Yang diganti hanya:
+        plan bila point/unit ID/request berubah, interval/overrun di timer,
+        conn bila diberikan (conn lama ditutup pemanggil, bisa dipakai
+        bersama), logger bila diberikan: list atau callable() yang dibuat
+        setelah logger lama ditutup (buffer di-flush, bukan dibuang; file
+        yang sama tidak terbuka dua kali). Return daftar perubahan.
+        """
+        changes = []
+        old = self.plan
+        self.cfg = cfg
+        self.plan = plan
+        if (plan.unit_id, plan.points, plan.requests) != (old.unit_id, old.points, old.requests):
+            self.unit_id = plan.unit_id
+            self.points = plan.points
+            self.blocks = plan.blocks
+            self.requests = plan.requests
+            self._bound_client = None
+            self._readers = ()
+            changes.append('plan')
+        if self.timer is not None:
+            if plan.interval_s != old.interval_s:
+                self.timer.set_interval(max(0.05, plan.interval_s))
+                changes.append('interval')
+            overrun = cfg.get('overrun', 'late').lower()
+            if overrun != self.timer.overrun_policy:
+                self.timer.overrun_policy = overrun
+                changes.append('overrun')
+        if conn is not None and conn is not self.conn:
+            self.conn = conn
+            self._bound_client = None
+            self._readers = ()
+            changes.append('connection')
+        if loggers is not None:
+            self.close_loggers()
+            self.logger_list = list(loggers() if callable(loggers) else loggers)
+            changes.append('sinks')
+        return changes
 
     def run_once(self):
-        mc = ModbusClient(mode=self.cfg.get('type', 'rtu'), cfg=self.cfg)
-        ok = mc.open()
+        while self._pending:
+            self._pending.popleft()(self)
+        m = self.metrics
+        t0 = time.perf_counter()
+        try:
+            mc = self.conn.acquire()
+        except Exception as e:
+            m.error('connect', e)
+            raise
+        t1 = time.perf_counter()
+        m.observe('connect', t1 - t0)
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        results = []
-        if not ok:
-            raise ConnectionError('Cannot open modbus client')
+        entries = [{'sensor_name': name, 'value': None} for name in self.plan.columns]
 
+        request_s = decode_s = 0.0
         try:
-            func = self.cfg.get('function', 'holding').lower()
-            addr = int(self.cfg.get('register', 0))
-            qty = int(self.cfg.get('quantity', 2))
-            uid = int(self.cfg.get('unit_id', 1))
-
-            # baca sesuai function
-            if func in ('holding', 'read_holding_registers', 'read_holding'):
-                rr = mc.read_holding(addr, qty, unit=uid)
-                regs = getattr(rr, 'registers', [])
-            elif func in ('input', 'read_input_registers', 'input_register'):
-                rr = mc.read_input(addr, qty, unit=uid)
-                regs = getattr(rr, 'registers', [])
-            elif func in ('coils', 'read_coils'):
-                rr = mc.read_coils(addr, qty, unit=uid)
-                regs = getattr(rr, 'bits', [])
-            elif func in ('discrete', 'discrete_input', 'read_discrete_inputs'):
-                rr = mc.read_discrete(addr, qty, unit=uid)
-                regs = getattr(rr, 'bits', [])
+            if hasattr(mc, 'read_many'):
+                # client pipelined: semua blok dikirim sekaligus
+                responses = mc.read_many(self.requests)
             else:
-                regs = []
-
-            encoding = self.cfg.get('encoding', 'float32be').lower()
-            entries = []
-
-            if isinstance(regs, list) and len(regs) > 0:
-                if encoding.startswith('float32'):
-                    for i in range(0, len(regs), 2):
-                        try:
-                            if encoding == 'float32be':
-                                v = ModbusClient.decode_float32_from_regs(regs[i], regs[i+1], encoding='ABCD')
-                            elif encoding == 'float32le':
-                                v = ModbusClient.decode_float32_from_regs(regs[i], regs[i+1], encoding='DCBA')
-                            elif encoding == 'float32cdab':
-                                v = ModbusClient.decode_float32_from_regs(regs[i], regs[i+1], encoding='CDAB')
-                            elif encoding == 'float32badc':
-                                v = ModbusClient.decode_float32_from_regs(regs[i], regs[i+1], encoding='BADC')
-                            else:
-                                v = None
-                        except Exception:
-                            v = None
-                        entries.append({'value': v})
-
-                elif encoding == 'u16':
-                    for r in regs:
-                        try:
-                            v = ModbusClient.decode_u16(r)
-                        except Exception:
-                            v = None
-                        entries.append({'value': v})
-
-            # kirim ke semua logger
-            for logger in self.logger_list:
+                responses = self._read_blocks(mc)
+            t = t1
+            # respons generator dibaca saat iterasi: selang sampai badan loop = request
+            for block, rr in zip(self.blocks, responses):
+                t1 = time.perf_counter()
+                request_s += t1 - t
+                if hasattr(rr, 'isError') and rr.isError():
+                    m.error('request', 'ExceptionResponse')
+                regs = self._block_regs(block, rr)
+                # satu pass untuk seluruh blok
                 try:
-                    logger.log(timestamp, entries)
-                except Exception:
-                    pass
+                    values = block.decoder.decode(regs)
+                except Exception as e:
+                    m.error('decode', e)
+                    values = ()
+                for (idx, _, _), v in zip(block.points, values):
+                    entries[idx]['value'] = v
+                t = time.perf_counter()
+                decode_s += t - t1
+            # sisa iterasi terakhir ikut dihitung request
+            t1 = time.perf_counter()
+            request_s += t1 - t
+            t = t1
+        except Exception as e:
+            m.error('request', e)
+            if isinstance(e, TRANSPORT_ERRORS):
+                # link putus: buang koneksi, poll berikutnya reconnect; timeout
+                # satu device tidak memutus gateway TCP yang dipakai bersama
+                self.conn.invalidate()
+            raise
+        m.observe('request', request_s)
+        m.observe('decode', decode_s)
+
+        # kirim ke semua logger
+        for logger in self.logger_list:
+            stage = 'sink:' + type(logger).__name__
+            try:
+                logger.log(timestamp, entries)
+            except Exception as e:
+                m.error(stage, e)
+            t1 = time.perf_counter()
+            m.observe(stage, t1 - t)
+            t = t1
+
+        m.poll.add(t - t0)
+        return timestamp, entries
+
+    def close_loggers(self):
+        # antrian sink dikosongkan dulu, lalu file/koneksi ditutup (sekali)
+        loggers, self.logger_list = self.logger_list, []
+        for logger in loggers:
+            try:
+                logger.close()
+            except Exception as e:
+                print(f"Logger close error: {e}")
+
+    def close(self):
+        self._bound_client = None
+        self._readers = ()
+        self.conn.close()
+        self.close_loggers()
+
+    def connection_stats(self):
+        return self.conn.stats()
 
-            results = entries
-        finally:
-            mc.close()
+    def make_timer(self, interval_s):
+        return FixedRateTimer(
+            interval_s,
+            align=str(self.cfg.get('align', 'true')).lower() in ('1', 'true', 'yes'),
+            overrun=self.cfg.get('overrun', 'late').lower(),
+        )
 
-        return timestamp, results
+    def timing_stats(self):
+        return self.timer.stats() if self.timer else None
 
-    def run_loop(self, interval_s=1.0):
-        while True:
+    def run_loop(self, interval_s=1.0, stop_event=None):
+        # laju tetap: slot dihitung dari jam monotonic, bukan sleep setelah poll
+        self.timer = self.make_timer(interval_s)
+        last_error = None
+        while self.timer.wait(stop_event):
             try:
                 self.run_once()
+                last_error = None
             except KeyboardInterrupt:
                 break
-            except Exception:
-                pass
-            time.sleep(interval_s)
\ No newline at end of file
+            except Exception as e:
+                # error link dicetak sekali per perubahan pesan, bukan tiap poll
+                msg = f'{type(e).__name__}: {e}'
+                if msg != last_error:
+                    print(f'Poll error: {msg}')
+                    last_error = msg
+        self.close()
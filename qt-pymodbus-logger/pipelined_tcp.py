@@ -0,0 +1,205 @@
+import socket
+import struct
+import time
+
+FUNCTION_CODES = {'coils': 1, 'discrete': 2, 'holding': 3, 'input': 4}
+
+_MBAP = struct.Struct('>HHHB')      # transaction id, protocol id, length, unit id
+_READ_PDU = struct.Struct('>BHH')   # function code, address, count
+
+
+class PipelineResponse:
+    """Respon baca minimal yang meniru objek respon pymodbus."""
+
+    def __init__(self, function_code, registers=None, bits=None, exception_code=None):
+        self.function_code = function_code
+        self.registers = registers or []
+        self.bits = bits or []
+        self.exception_code = exception_code
+
+    def isError(self):
+        return self.exception_code is not None
+
+
+class PipelinedTcpClient:
+    """
+    Client Modbus TCP dengan beberapa transaksi sekaligus di jalur.
+    Hingga `depth` request dikirim tanpa menunggu, respon dicocokkan
+    lewat transaction ID. Bila device gagal melayani lebih dari satu
+    transaksi (timeout / ID tidak cocok) tetapi berhasil secara berurutan
+    fallback_after kali berturut-turut, client turun ke mode satu-per-satu;
+    pipelining dicoba lagi setelah retry_s detik (0 = tidak dicoba lagi).
+    Kegagalan sesekali (paket hilang, device sibuk) tidak mematikan pipelining.
+    """
+
+    def __init__(self, host, port=502, timeout=1.0, depth=4, fallback_after=3, retry_s=300.0):
+        self.host = host
+        self.port = int(port)
+        self.timeout = float(timeout)
+        self.depth = max(1, int(depth))
+        self.fallback_after = max(1, int(fallback_after))
+        self.retry_s = float(retry_s)
+        self.pipelining = self.depth > 1
+        self.sock = None
+        self._tid = 0
+        self._buf = b''
+        # exchange pipelined yang gagal berturut-turut; waktu coba ulang
+        self._failures = 0
+        self._retry_at = None
+
+        self.requests = 0
+        self.max_inflight = 0
+        self.pipeline_errors = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        return cls(
+            cfg.get('host', '127.0.0.1'),
+            cfg.get('tcp_port', 502),
+            timeout=float(cfg.get('timeout', 1)),
+            depth=int(cfg.get('pipeline_depth', 4)),
+            fallback_after=int(cfg.get('pipeline_fallback_after', 3)),
+            retry_s=float(cfg.get('pipeline_retry_s', 300)),
+        )
+
+    # --- koneksi (API sama dengan ModbusClient untuk ConnectionManager) ---
+    def open(self):
+        self.close()
+        try:
+            self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            self.sock = None
+            return False
+        self._buf = b''
+        return True
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def is_open(self):
+        return self.sock is not None
+
+    # --- framing ---
+    def _next_tid(self):
+        self._tid = (self._tid + 1) & 0xFFFF
+        return self._tid
+
+    def _send(self, tid, func, address, count, unit):
+        pdu = _READ_PDU.pack(FUNCTION_CODES[func], address, count)
+        self.sock.sendall(_MBAP.pack(tid, 0, len(pdu) + 1, unit) + pdu)
+        self.requests += 1
+
+    def _recv_exact(self, n):
+        while len(self._buf) < n:
+            chunk = self.sock.recv(max(4096, n - len(self._buf)))
+            if not chunk:
+                raise ConnectionError('Connection closed by device')
+            self._buf += chunk
+        data, self._buf = self._buf[:n], self._buf[n:]
+        return data
+
+    def _recv_frame(self):
+        tid, _, length, _ = _MBAP.unpack(self._recv_exact(_MBAP.size))
+        if length < 2:
+            raise ConnectionError('Invalid MBAP length')
+        return tid, self._recv_exact(length - 1)
+
+    @staticmethod
+    def _parse(func, count, pdu):
+        fc = pdu[0]
+        if fc & 0x80:
+            return PipelineResponse(fc, exception_code=pdu[1] if len(pdu) > 1 else 0)
+        data = pdu[2:2 + pdu[1]]
+        if func in ('coils', 'discrete'):
+            bits = [bool(data[i >> 3] >> (i & 7) & 1) for i in range(min(count, len(data) * 8))]
+            return PipelineResponse(fc, bits=bits)
+        return PipelineResponse(fc, registers=list(struct.unpack(f'>{len(data) // 2}H', data)))
+
+    # --- request ---
+    def _exchange(self, reqs, indices, depth, results):
+        inflight = {}
+        pos = 0
+        while pos < len(indices) or inflight:
+            while pos < len(indices) and len(inflight) < depth:
+                i = indices[pos]
+                func, address, count, unit = reqs[i]
+                tid = self._next_tid()
+                self._send(tid, func, address, count, unit)
+                inflight[tid] = i
+                pos += 1
+            if len(inflight) > self.max_inflight:
+                self.max_inflight = len(inflight)
+
+            tid, pdu = self._recv_frame()
+            i = inflight.pop(tid, None)
+            if i is None:
+                # respon basi dari transaksi lama, abaikan
+                continue
+            func, _, count, _ = reqs[i]
+            results[i] = self._parse(func, count, pdu)
+
+    def read_many(self, reqs):
+        """
+        reqs: list (function, address, count, unit) dengan function
+        holding/input/coils/discrete. Hasil urut sesuai reqs.
+        """
+        if self.sock is None:
+            raise ConnectionError('Not connected')
+        if self._retry_at is not None and time.monotonic() >= self._retry_at:
+            # masa tunggu habis: coba pipelining lagi; gagal sekali -> turun lagi
+            self._retry_at = None
+            self.pipelining = True
+            self._failures = self.fallback_after - 1
+        results = [None] * len(reqs)
+        depth = self.depth if self.pipelining else 1
+        try:
+            self._exchange(reqs, list(range(len(reqs))), depth, results)
+        except (OSError, ConnectionError):
+            if depth == 1:
+                raise
+            # coba ulang berurutan di koneksi baru; bila berhasil berkali-kali,
+            # device dianggap tidak mendukung pipelining (untuk sementara)
+            if not self.open():
+                raise
+            todo = [i for i, r in enumerate(results) if r is None]
+            self._exchange(reqs, todo, 1, results)
+            self.pipeline_errors += 1
+            self._failures += 1
+            if self._failures >= self.fallback_after:
+                self.pipelining = False
+                self.fallbacks += 1
+                if self.retry_s > 0:
+                    self._retry_at = time.monotonic() + self.retry_s
+        else:
+            if depth > 1:
+                self._failures = 0
+        return results
+
+    def read_holding(self, address, count, unit=1):
+        return self.read_many([('holding', address, count, unit)])[0]
+
+    def read_input(self, address, count, unit=1):
+        return self.read_many([('input', address, count, unit)])[0]
+
+    def read_coils(self, address, count, unit=1):
+        return self.read_many([('coils', address, count, unit)])[0]
+
+    def read_discrete(self, address, count, unit=1):
+        return self.read_many([('discrete', address, count, unit)])[0]
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'pipelining': self.pipelining,
+            'requests': self.requests,
+            'max_inflight': self.max_inflight,
+            'pipeline_errors': self.pipeline_errors,
+            'fallbacks': self.fallbacks,
+        }
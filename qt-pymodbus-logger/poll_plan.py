@@ -0,0 +1,125 @@
+from collections import namedtuple
+from config_manager import ConfigError
+from register_decoder import parse_encoding
+from register_map import (
+    FUNCTION_ALIASES, BIT_FUNCTIONS, legacy_points, plan_reads, point_width,
+)
+
+# rencana poll yang sudah divalidasi; tidak berubah selama poller hidup
+PollPlan = namedtuple('PollPlan', 'unit_id interval_s points blocks columns requests')
+
+
+class _Checker:
+    """Kumpulkan semua kesalahan config agar dilaporkan sekaligus."""
+
+    def __init__(self, cfg, where):
+        self.cfg = cfg
+        self.where = where
+        self.errors = []
+
+    def error(self, msg):
+        self.errors.append(msg)
+
+    def int(self, key, default, lo=None, hi=None):
+        raw = self.cfg.get(key, default)
+        try:
+            v = int(raw)
+        except (TypeError, ValueError):
+            self.error(f'{key} = {raw!r} is not an integer')
+            return int(default)
+        if (lo is not None and v < lo) or (hi is not None and v > hi):
+            self.error(f'{key} = {v} out of range [{lo}, {hi}]')
+        return v
+
+    def float(self, key, default, positive=True):
+        raw = self.cfg.get(key, default)
+        try:
+            v = float(raw)
+        except (TypeError, ValueError):
+            self.error(f'{key} = {raw!r} is not a number')
+            return float(default)
+        if positive and v <= 0:
+            self.error(f'{key} = {v} must be > 0')
+        return v
+
+    def choice(self, key, default, choices):
+        v = str(self.cfg.get(key, default)).strip()
+        if v.lower() not in [c.lower() for c in choices]:
+            self.error(f'{key} = {v!r} must be one of {", ".join(choices)}')
+        return v
+
+    def raise_if_errors(self):
+        if self.errors:
+            raise ConfigError(f'Invalid config {self.where}:\n  ' + '\n  '.join(self.errors))
+
+
+def validate_connection(cfg, where='[Modbus]'):
+    chk = _Checker(cfg, where)
+    mode = chk.choice('type', 'rtu', ('rtu', 'tcp')).lower()
+    if mode == 'rtu':
+        if not cfg.get('port', '/dev/ttyUSB0'):
+            chk.error('port is empty')
+        chk.int('baudrate', 9600, 1)
+        chk.int('bytesize', 8, 5, 8)
+        chk.choice('parity', 'N', ('N', 'E', 'O'))
+        chk.int('stopbits', 1, 1, 2)
+    elif mode == 'tcp':
+        if not cfg.get('host', '127.0.0.1'):
+            chk.error('host is empty')
+        chk.int('tcp_port', 502, 1, 65535)
+        chk.int('pipeline_depth', 1, 1, 64)
+        chk.int('pipeline_fallback_after', 3, 1)
+        chk.float('pipeline_retry_s', 300, positive=False)
+    chk.float('timeout', 1)
+    chk.float('reconnect_backoff', 0.5)
+    chk.float('reconnect_backoff_max', 30.0)
+    return chk
+
+
+def compile_plan(cfg, points=None, where='[Modbus]'):
+    """
+    Validasi config satu device dan susun PollPlan.
+    Raise ConfigError berisi semua kesalahan yang ditemukan.
+    """
+    chk = validate_connection(cfg, where)
+    unit_id = chk.int('unit_id', 1, 0, 247)
+    interval_s = chk.float('poll_interval', 1.0)
+    max_gap = chk.int('max_gap', 8, 0, 125)
+    max_gap_bits = chk.int('max_gap_bits', 128, 0, 2000)
+    chk.choice('overrun', 'late', ('late', 'skip'))
+
+    if not points:
+        func = cfg.get('function', 'holding').lower()
+        if func not in FUNCTION_ALIASES:
+            chk.error(f'function = {func!r} is not supported')
+        chk.int('register', 0, 0, 65535)
+        qty = chk.int('quantity', 2, 1, 2000)
+        if FUNCTION_ALIASES.get(func) not in BIT_FUNCTIONS:
+            enc = cfg.get('encoding', 'float32be')
+            try:
+                width = parse_encoding(enc).width
+                if qty < width:
+                    chk.error(f'quantity = {qty} is smaller than one {enc} value ({width} registers)')
+            except ValueError as e:
+                chk.error(str(e))
+        chk.raise_if_errors()
+        points = legacy_points(cfg)
+    else:
+        for p in points:
+            if p.address < 0 or p.address + point_width(p) > 65536:
+                chk.error(f'point {p.name}: address {p.address} out of range')
+        names = [p.name for p in points]
+        if len(set(names)) != len(names):
+            chk.error('duplicate point names')
+    chk.raise_if_errors()
+
+    points = tuple(points)
+    blocks = tuple(plan_reads(points, max_gap=max_gap, max_gap_bits=max_gap_bits))
+    return PollPlan(
+        unit_id=unit_id,
+        interval_s=interval_s,
+        points=points,
+        blocks=blocks,
+        columns=tuple(p.name for p in points),
+        requests=tuple((b.function, b.address, b.count, unit_id) for b in blocks),
+    )
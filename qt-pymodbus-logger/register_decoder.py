@@ -0,0 +1,167 @@
+"""
+Decoder register Modbus untuk satu blok sekaligus.
+
+Nama encoding: <tipe>[<urutan>], contoh float32badc, int32cdab, float64le,
+u16, float32[ABCD]. Tipe: (u)int16, (u)int32, (u)int64, float32, float64
+(singkatan u16/i16/u32/i32/u64/i64/f32/f64). Urutan: ABCD/be (default),
+DCBA/le, CDAB (word swap), BADC (byte swap).
+
+Satu blok di-decode dengan satu itemgetter + satu struct.pack + satu
+struct.unpack yang sudah dikompilasi, bukan struct.unpack per nilai.
+"""
+import re
+import struct
+from collections import namedtuple
+from functools import lru_cache
+from operator import itemgetter
+
+Encoding = namedtuple('Encoding', 'name code width wordswap byteswap')
+
+TYPES = {
+    'uint16': ('H', 1), 'int16': ('h', 1),
+    'uint32': ('I', 2), 'int32': ('i', 2), 'float32': ('f', 2),
+    'uint64': ('Q', 4), 'int64': ('q', 4), 'float64': ('d', 4),
+}
+TYPE_ALIASES = {
+    'u16': 'uint16', 'i16': 'int16', 'u32': 'uint32', 'i32': 'int32',
+    'u64': 'uint64', 'i64': 'int64', 'f32': 'float32', 'f64': 'float64',
+}
+# (wordswap, byteswap) relatif terhadap ABCD (big endian)
+ORDERS = {
+    '': (False, False), 'be': (False, False), 'abcd': (False, False),
+    'le': (True, True), 'dcba': (True, True),
+    'cdab': (True, False), 'badc': (False, True),
+}
+
+_NAME_RE = re.compile(r'^([a-z]+\d+)(be|le|abcd|dcba|cdab|badc)?$')
+
+
+@lru_cache(maxsize=None)
+def parse_encoding(name):
+    """'float32badc' -> Encoding(...). Raise ValueError bila tidak dikenal."""
+    key = name.strip().lower().replace('[', '').replace(']', '').replace('_', '')
+    m = _NAME_RE.match(key)
+    if not m:
+        raise ValueError(f'Unsupported encoding {name!r}')
+    base = TYPE_ALIASES.get(m.group(1), m.group(1))
+    if base not in TYPES:
+        raise ValueError(f'Unsupported encoding {name!r}')
+    code, width = TYPES[base]
+    wordswap, byteswap = ORDERS[m.group(2) or '']
+    return Encoding(key, code, width, wordswap and width > 1, byteswap)
+
+
+def _swap16(w):
+    return ((w & 0xFF) << 8) | (w >> 8)
+
+
+class BlockDecoder:
+    """
+    Decoder terkompilasi untuk satu blok register.
+    layout: list (offset, encoding, scale) relatif terhadap awal blok.
+    Untuk blok coil/discrete (bits=True) encoding diabaikan, hasil bool.
+    """
+
+    def __init__(self, layout, bits=False):
+        self.layout = list(layout)
+        self.bits = bits
+        self.size = len(self.layout)
+
+        if bits:
+            offsets = [off for off, _, _ in self.layout]
+            self.need = max(offsets) + 1 if offsets else 0
+            self._get = _getter(offsets)
+            return
+
+        word_map = []
+        swap_flags = []
+        codes = []
+        self.need = 0
+        for off, name, _ in self.layout:
+            enc = parse_encoding(name)
+            idx = list(range(off, off + enc.width))
+            if enc.wordswap:
+                idx.reverse()
+            word_map += idx
+            swap_flags += [enc.byteswap] * enc.width
+            codes.append(enc.code)
+            self.need = max(self.need, off + enc.width)
+
+        self._get = _getter(word_map)
+        n = len(word_map)
+        # byte swap semua word cukup dengan pack little endian
+        if swap_flags and all(swap_flags):
+            self._pack = struct.Struct(f'<{n}H').pack
+            self._swap_idx = ()
+        else:
+            self._pack = struct.Struct(f'>{n}H').pack
+            self._swap_idx = tuple(i for i, s in enumerate(swap_flags) if s)
+        self._unpack = struct.Struct('>' + ''.join(codes)).unpack
+        self._scales = tuple((i, float(s)) for i, (_, _, s) in enumerate(self.layout) if s != 1.0)
+        self._single = None
+
+    def decode(self, regs):
+        """List nilai sesuai urutan layout; None bila register kurang."""
+        if not self.size:
+            return []
+        if len(regs) < self.need:
+            return self._decode_partial(regs)
+        if self.bits:
+            return [bool(b) for b in self._get(regs)]
+
+        words = self._get(regs)
+        if self._swap_idx:
+            words = list(words)
+            for i in self._swap_idx:
+                words[i] = _swap16(words[i])
+        values = list(self._unpack(self._pack(*words)))
+        for i, s in self._scales:
+            values[i] = values[i] * s
+        return values
+
+    def _decode_partial(self, regs):
+        # respon lebih pendek dari rencana: decode per point yang masih utuh
+        if self._single is None:
+            self._single = [BlockDecoder([(0, name, scale)], self.bits)
+                            for _, name, scale in self.layout]
+        out = []
+        for (off, _, _), dec in zip(self.layout, self._single):
+            words = regs[off:off + dec.need]
+            out.append(dec.decode(words)[0] if len(words) == dec.need else None)
+        return out
+
+
+def _getter(indices):
+    if len(indices) == 1:
+        i = indices[0]
+        return lambda seq: (seq[i],)
+    if not indices:
+        return lambda seq: ()
+    return itemgetter(*indices)
+
+
+@lru_cache(maxsize=256)
+def _value_decoder(encoding, count, scale):
+    width = parse_encoding(encoding).width
+    return BlockDecoder([(i * width, encoding, scale) for i in range(count)])
+
+
+def decode_values(regs, encoding, scale=1.0):
+    """Decode register berurutan dengan satu tipe, contoh untuk tabel GUI."""
+    width = parse_encoding(encoding).width
+    return _value_decoder(encoding, len(regs) // width, scale).decode(regs)
+
+
+def encode_value(value, encoding):
+    """Kebalikan decode: nilai -> list register sesuai encoding."""
+    enc = parse_encoding(encoding)
+    if enc.code in 'fd':
+        raw = struct.pack('>' + enc.code, float(value))
+    else:
+        raw = struct.pack('>' + enc.code, int(value))
+    words = list(struct.unpack(f'>{enc.width}H', raw))
+    if enc.wordswap:
+        words.reverse()
+    if enc.byteswap:
+        words = [_swap16(w) for w in words]
+    return words
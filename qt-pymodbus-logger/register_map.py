@@ -0,0 +1,134 @@
+from collections import namedtuple
+from config_manager import ConfigError
+from register_decoder import BlockDecoder, parse_encoding
+
+# satu titik data bernama pada alamat tertentu
+Point = namedtuple('Point', 'name function address dtype scale')
+
+# satu request Modbus; points = tuple (index_output, offset, Point),
+# method = nama method baca di ModbusClient,
+# decoder = BlockDecoder terkompilasi untuk seluruh blok
+ReadBlock = namedtuple('ReadBlock', 'function method address count points decoder')
+
+FUNCTION_ALIASES = {
+    'holding': 'holding', 'read_holding_registers': 'holding', 'read_holding': 'holding',
+    'input': 'input', 'read_input_registers': 'input', 'input_register': 'input',
+    'coils': 'coils', 'read_coils': 'coils',
+    'discrete': 'discrete', 'discrete_input': 'discrete', 'read_discrete_inputs': 'discrete',
+}
+
+READ_METHODS = {
+    'holding': 'read_holding', 'input': 'read_input',
+    'coils': 'read_coils', 'discrete': 'read_discrete',
+}
+
+# batas protokol per request
+MAX_COUNT = {'holding': 125, 'input': 125, 'coils': 2000, 'discrete': 2000}
+BIT_FUNCTIONS = ('coils', 'discrete')
+
+
+def point_width(point):
+    """Jumlah register (atau bit) yang dipakai satu point."""
+    if point.dtype == 'bool':
+        return 1
+    return parse_encoding(point.dtype).width
+
+
+def parse_point(name, spec):
+    """
+    spec: "function, address, dtype[, scale]"
+    contoh: "holding, 100, float32badc, 0.1"
+    """
+    parts = [p.strip() for p in spec.split(',')]
+    if len(parts) < 2:
+        raise ValueError(f'Point {name}: expected "function, address, dtype[, scale]"')
+
+    func = FUNCTION_ALIASES.get(parts[0].lower())
+    if func is None:
+        raise ValueError(f'Point {name}: unknown function {parts[0]!r}')
+    address = int(parts[1])
+
+    if func in BIT_FUNCTIONS:
+        dtype = 'bool'
+    else:
+        dtype = parts[2].lower() if len(parts) > 2 and parts[2] else 'u16'
+        try:
+            parse_encoding(dtype)
+        except ValueError:
+            raise ValueError(f'Point {name}: unsupported dtype {dtype!r}')
+    scale = float(parts[3]) if len(parts) > 3 and parts[3] else 1.0
+    return Point(name, func, address, dtype, scale)
+
+
+def load_points(config, section='Points'):
+    """Baca semua point dari section config.ini, urutan sesuai file."""
+    if section not in config:
+        return []
+    try:
+        return [parse_point(name, spec) for name, spec in config[section].items()]
+    except ValueError as e:
+        raise ConfigError(f'[{section}] {e}')
+
+
+def legacy_points(cfg):
+    """
+    Point dari konfigurasi lama satu blok (register/quantity/encoding),
+    dinamai ch1..chN agar header CSV tetap sama.
+    """
+    func = FUNCTION_ALIASES.get(cfg.get('function', 'holding').lower())
+    if func is None:
+        raise ConfigError(f"Unsupported function {cfg.get('function')!r}")
+    addr = int(cfg.get('register', 0))
+    qty = int(cfg.get('quantity', 2))
+
+    if func in BIT_FUNCTIONS:
+        dtype = 'bool'
+    else:
+        dtype = cfg.get('encoding', 'float32be').lower()
+        try:
+            parse_encoding(dtype)
+        except ValueError:
+            raise ConfigError(f'Unsupported encoding {dtype!r}')
+    width = 1 if dtype == 'bool' else parse_encoding(dtype).width
+    return [Point(f'ch{i + 1}', func, addr + i * width, dtype, 1.0)
+            for i in range(qty // width)]
+
+
+def plan_reads(points, max_gap=8, max_gap_bits=128):
+    """
+    Susun request seminimal mungkin untuk daftar point.
+    Alamat yang berdekatan digabung bila celahnya <= max_gap
+    (lebih murah membaca register ekstra daripada satu round trip lagi),
+    dan blok dipecah pada batas 125 register / 2000 bit.
+    """
+    by_func = {}
+    for idx, p in enumerate(points):
+        by_func.setdefault(p.function, []).append((idx, p))
+
+    blocks = []
+    for func in sorted(by_func):
+        limit = MAX_COUNT[func]
+        gap = max_gap_bits if func in BIT_FUNCTIONS else max_gap
+        items = sorted(by_func[func], key=lambda ip: ip[1].address)
+
+        start = end = None
+        members = []
+        for idx, p in items:
+            p_end = p.address + point_width(p)
+            if start is not None and p.address - end <= gap and max(end, p_end) - start <= limit:
+                end = max(end, p_end)
+                members.append((idx, p))
+                continue
+            if members:
+                blocks.append(_make_block(func, start, end, members))
+            start, end, members = p.address, p_end, [(idx, p)]
+        if members:
+            blocks.append(_make_block(func, start, end, members))
+    return blocks
+
+
+def _make_block(func, start, end, members):
+    pts = tuple((idx, p.address - start, p) for idx, p in members)
+    decoder = BlockDecoder([(off, p.dtype, p.scale) for _, off, p in pts],
+                           bits=func in BIT_FUNCTIONS)
+    return ReadBlock(func, READ_METHODS[func], start, end - start, pts, decoder)
@@ -0,0 +1,303 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from connection_manager import TRANSPORT_ERRORS, ConnectionManager
+from modbus_client_v3 import ModbusClient
+
+PRIORITY_HIGH = 0      # contoh: GUI debug / perintah write manual
+PRIORITY_NORMAL = 5    # polling logger
+PRIORITY_LOW = 9       # backfill / scan
+
+_STOP = object()
+
+# setting serial port; berbeda -> port dibuka ulang (satu bus, satu setting)
+SERIAL_DEFAULTS = (('baudrate', 9600), ('bytesize', 8), ('parity', 'N'),
+                   ('stopbits', 1), ('timeout', 1))
+
+
+def serial_params(cfg):
+    """Setting serial cfg dalam bentuk yang bisa dibandingkan ('9600' == 9600)."""
+    return tuple(str(cfg.get(k, d)).strip().upper() for k, d in SERIAL_DEFAULTS)
+
+
+def silent_interval(baudrate, bytesize=8, parity='N', stopbits=1):
+    """
+    Jeda t3.5 antar frame RTU dalam detik.
+    Satu karakter = start + data + parity + stop bit; di atas 19200 baud
+    spesifikasi Modbus memakai nilai tetap 1.75 ms.
+    """
+    baudrate = int(baudrate)
+    if baudrate > 19200:
+        return 0.00175
+    bits = 1 + int(bytesize) + (0 if str(parity).upper() == 'N' else 1) + int(stopbits)
+    return 3.5 * bits / baudrate
+
+
+class RtuBusArbiter:
+    """
+    Pemilik tunggal satu port serial RS-485. Request dari banyak consumer
+    masuk ke antrian prioritas dan dikirim satu per satu oleh satu thread,
+    dengan jeda t3.5 yang dihitung dari baudrate di antara transaksi.
+    """
+
+    def __init__(self, cfg):
+        self.port = cfg.get('port', '/dev/ttyUSB0')
+        self._configure(cfg)
+        self.params = serial_params(cfg)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._last_end = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._users = 0
+
+        # statistik
+        self.transactions = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.idle_wait_s = 0.0
+        self.busy_s = 0.0
+        self._started = None
+
+    def _configure(self, cfg):
+        self.cfg = cfg
+        self.conn = ConnectionManager(
+            cfg,
+            backoff_initial=float(cfg.get('reconnect_backoff', 0.5)),
+            backoff_max=float(cfg.get('reconnect_backoff_max', 30.0)),
+        )
+        self.t35 = silent_interval(
+            cfg.get('baudrate', 9600), cfg.get('bytesize', 8),
+            cfg.get('parity', 'N'), cfg.get('stopbits', 1),
+        )
+
+    def _reopen(self, cfg):
+        # di thread bus, di antara dua transaksi
+        self.conn.close()
+        self._configure(cfg)
+
+    def reconfigure(self, cfg):
+        """
+        Setting serial berubah (baudrate, parity, ...): port ditutup dan
+        dibuka ulang dengan setting baru untuk semua consumer bus ini,
+        sebelum request yang masih antri. Return True bila ada perubahan.
+        """
+        params = serial_params(cfg)
+        with self._lock:
+            if params == self.params:
+                return False
+            self.params = params
+            running = self._thread is not None
+            if running:
+                self._queue.put((-1, next(self._seq), self._reopen, (cfg,), None, None))
+        if not running:
+            self._reopen(cfg)
+        return True
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._started = time.monotonic()
+                self._thread = threading.Thread(target=self._run, name=f'rtu-bus-{self.port}', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=5.0):
+        with self._lock:
+            t = self._thread
+            self._thread = None
+        if t is not None:
+            self._queue.put((-1, next(self._seq), _STOP, None, None, None))
+            t.join(timeout)
+
+    def submit(self, method, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """Antrikan panggilan ModbusClient.<method>; hasil berupa Future."""
+        fut = Future()
+        self._queue.put((priority, next(self._seq), method, args, kwargs, fut))
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return fut
+
+    def call(self, method, *args, priority=PRIORITY_NORMAL, **kwargs):
+        return self.submit(method, *args, priority=priority, **kwargs).result()
+
+    def _run(self):
+        while True:
+            _, _, method, args, kwargs, fut = self._queue.get()
+            if method is _STOP:
+                break
+            if fut is None:
+                # pekerjaan internal (reconfigure)
+                method(*args)
+                continue
+            if not fut.set_running_or_notify_cancel():
+                continue
+
+            # jaga jeda t3.5 sejak akhir transaksi sebelumnya
+            gap = self._last_end + self.t35 - time.monotonic()
+            if gap > 0:
+                time.sleep(gap)
+                self.idle_wait_s += gap
+
+            t0 = time.monotonic()
+            try:
+                mc = self.conn.acquire()
+                result = getattr(mc, method)(*args, **kwargs)
+            except Exception as e:
+                self.errors += 1
+                # port dibuka ulang hanya bila jalurnya rusak; timeout satu
+                # unit tidak mengganggu unit lain di bus
+                if isinstance(e, TRANSPORT_ERRORS):
+                    self.conn.invalidate()
+                fut.set_exception(e)
+            else:
+                self.transactions += 1
+                fut.set_result(result)
+            finally:
+                self._last_end = time.monotonic()
+                self.busy_s += self._last_end - t0
+
+        # request yang masih antri saat stop dibatalkan
+        while True:
+            try:
+                _, _, method, args, _, fut = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if fut is None:
+                # reconfigure tetap diterapkan agar start() berikutnya memakai setting baru
+                if method is not _STOP:
+                    method(*args)
+            elif fut.set_running_or_notify_cancel():
+                fut.set_exception(ConnectionError('RTU bus stopped'))
+        self.conn.close()
+
+    # --- consumer ---
+    def client(self, priority=PRIORITY_NORMAL):
+        return BusClient(self, priority)
+
+    def connection(self, priority=PRIORITY_NORMAL):
+        """Pengganti ConnectionManager untuk ModbusPoller."""
+        return BusConnection(self, priority)
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            'port': self.port,
+            't35_ms': self.t35 * 1000.0,
+            'transactions': self.transactions,
+            'errors': self.errors,
+            'tx_per_s': self.transactions / elapsed if elapsed else 0.0,
+            'busy_ratio': self.busy_s / elapsed if elapsed else 0.0,
+            'idle_wait_s': self.idle_wait_s,
+            'queue_depth': self._queue.qsize(),
+            'max_depth': self.max_depth,
+            'connection': self.conn.stats(),
+        }
+
+
+class BusClient:
+    """API sama dengan ModbusClient, tapi tiap request lewat arbiter."""
+
+    decode_float32_from_regs = staticmethod(ModbusClient.decode_float32_from_regs)
+    decode_u16 = staticmethod(ModbusClient.decode_u16)
+
+    def __init__(self, arbiter, priority=PRIORITY_NORMAL):
+        self.arbiter = arbiter
+        self.priority = priority
+
+    def open(self):
+        self.arbiter.start()
+        return True
+
+    def close(self):
+        pass
+
+    def is_open(self):
+        return True
+
+    def read_holding(self, address, count, unit=1):
+        return self.arbiter.call('read_holding', address, count, unit=unit, priority=self.priority)
+
+    def read_input(self, address, count, unit=1):
+        return self.arbiter.call('read_input', address, count, unit=unit, priority=self.priority)
+
+    def read_coils(self, address, count, unit=1):
+        return self.arbiter.call('read_coils', address, count, unit=unit, priority=self.priority)
+
+    def read_discrete(self, address, count, unit=1):
+        return self.arbiter.call('read_discrete', address, count, unit=unit, priority=self.priority)
+
+    def write_register(self, address, value, unit=1):
+        return self.arbiter.call('write_register', address, value, unit=unit, priority=self.priority)
+
+    def write_registers(self, address, values, unit=1):
+        return self.arbiter.call('write_registers', address, values, unit=unit, priority=self.priority)
+
+
+class BusConnection:
+    """
+    Adapter ConnectionManager -> arbiter. Reconnect diurus arbiter,
+    jadi invalidate() di sini tidak menutup port milik consumer lain.
+    """
+
+    def __init__(self, arbiter, priority=PRIORITY_NORMAL):
+        self.arbiter = arbiter
+        self._client = BusClient(arbiter, priority)
+        self._closed = False
+        _acquire_bus(arbiter)
+
+    def acquire(self):
+        self.arbiter.start()
+        return self._client
+
+    def invalidate(self):
+        pass
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            _release_bus(self.arbiter)
+
+    def stats(self):
+        return self.arbiter.conn.stats()
+
+
+# --- registry: satu arbiter per port serial dalam satu proses ---
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+def get_bus(cfg):
+    """
+    Arbiter untuk port serial di cfg; dibuat sekali, dipakai bersama.
+    Port hanya bisa dibuka sekali, jadi bila setting serial cfg berbeda
+    dengan bus yang sudah ada (mis. baudrate diganti saat hot reload
+    sementara consumer lain masih memakai bus) bus dibuka ulang dengan
+    setting baru, bukan arbiter lama yang dikembalikan apa adanya.
+    """
+    port = cfg.get('port', '/dev/ttyUSB0')
+    with _buses_lock:
+        bus = _buses.get(port)
+        if bus is None:
+            bus = RtuBusArbiter(cfg)
+            _buses[port] = bus
+        else:
+            bus.reconfigure(cfg)
+        return bus
+
+
+def _acquire_bus(bus):
+    with _buses_lock:
+        bus._users += 1
+
+
+def _release_bus(bus):
+    with _buses_lock:
+        bus._users -= 1
+        last = bus._users <= 0
+        if last and _buses.get(bus.port) is bus:
+            del _buses[bus.port]
+    if last:
+        bus.stop()
@@ -0,0 +1,332 @@
+import heapq
+import threading
+import time
+from collections import deque
+from modbus_worker import LINK_KEYS, ModbusPoller, make_connection
+from poll_plan import compile_plan
+
+# key device yang dibaca build_loggers (nama file / tabel per device)
+DEVICE_SINK_KEYS = ('csv_file', 'table')
+
+
+def link_key(cfg):
+    """Identitas link fisik: satu gateway TCP atau satu port serial."""
+    if cfg.get('type', 'rtu').lower() == 'tcp':
+        return ('tcp', cfg.get('host', '127.0.0.1'), int(cfg.get('tcp_port', 502)))
+    return ('rtu', cfg.get('port', '/dev/ttyUSB0'))
+
+
+class DeviceStats:
+    def __init__(self):
+        self.polls = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_poll = None
+
+
+def _plan_changes(old_plan, plan, old, cfg):
+    """Bagian yang akan diganti ModbusPoller.reconfigure (untuk log)."""
+    changes = []
+    if (plan.unit_id, plan.points, plan.requests) != (old_plan.unit_id, old_plan.points, old_plan.requests):
+        changes.append('plan')
+    if plan.interval_s != old_plan.interval_s:
+        changes.append('interval')
+    if old.get('overrun', 'late').lower() != cfg.get('overrun', 'late').lower():
+        changes.append('overrun')
+    return changes
+
+
+class LinkWorker(threading.Thread):
+    """
+    Satu thread per link fisik. Semua device (unit ID) di link ini
+    dijadwalkan lewat satu heap (due, seq, poller); device yang jatuh
+    tempo bersamaan dilayani bergiliran sesuai urutan seq.
+    Slot tiap device diatur FixedRateTimer milik poller (laju tetap).
+    Perubahan dari thread lain (hot reload) masuk lewat call() dan
+    dijalankan di thread ini di antara dua poll.
+    """
+
+    def __init__(self, key, conn, on_result=None, on_error=None):
+        super().__init__(name=f'link-{":".join(str(k) for k in key)}', daemon=True)
+        self.key = key
+        self.conn = conn
+        self.on_result = on_result
+        self.on_error = on_error
+        self.pollers = {}
+        self.stats = {}
+        self._heap = []
+        self._seq = 0
+        # seq entry heap yang berlaku per device; entry lain sudah basi
+        self._live = {}
+        self._calls = deque()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def add(self, name, poller, interval_s):
+        self.pollers[name] = poller
+        self.stats.setdefault(name, DeviceStats())
+        poller.timer = poller.make_timer(interval_s)
+        self._push(name, poller)
+
+    def remove(self, name, close=True):
+        """Lepas device dari link; return pollernya (logger ditutup bila close)."""
+        poller = self.pollers.pop(name, None)
+        self.stats.pop(name, None)
+        self._live.pop(name, None)
+        if poller is not None and close:
+            poller.close_loggers()
+        return poller
+
+    def reconnect(self, cfg):
+        """Parameter link berubah: koneksi lama ditutup, semua device pindah ke yang baru."""
+        # RTU: bus lama dilepas dulu agar port dibuka ulang dengan setting baru
+        self.conn.close()
+        self.conn = make_connection(cfg)
+        for poller in self.pollers.values():
+            poller.reconfigure(poller.cfg, poller.plan, conn=self.conn)
+
+    def call(self, fn):
+        """Jalankan fn(worker) di thread link sebelum poll berikutnya."""
+        self._calls.append(fn)
+        self._wake.set()
+
+    def _run_calls(self):
+        while self._calls:
+            self._calls.popleft()(self)
+
+    def _push(self, name, poller):
+        self._seq += 1
+        self._live[name] = self._seq
+        heapq.heappush(self._heap, (poller.timer.next_due, self._seq, name, poller))
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._run_calls()
+            if not self._heap:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            due, seq, name, poller = self._heap[0]
+            if self._live.get(name) != seq:
+                # device sudah dilepas / dijadwalkan ulang saat reload
+                heapq.heappop(self._heap)
+                continue
+            wait = due - time.monotonic()
+            if wait > 0:
+                # dibangunkan lebih awal oleh call() / stop()
+                if self._wake.wait(wait):
+                    self._wake.clear()
+                    continue
+            heapq.heappop(self._heap)
+            poller.timer.begin()
+
+            st = self.stats[name]
+            try:
+                ts, entries = poller.run_once()
+                st.polls += 1
+                st.last_poll = ts
+                if self.on_result:
+                    self.on_result(name, ts, entries)
+            except Exception as e:
+                st.errors += 1
+                st.last_error = f'{type(e).__name__}: {e}'
+                if self.on_error:
+                    self.on_error(name, e)
+
+            # jadwal berikutnya; kalau tertinggal jangan menumpuk poll
+            poller.timer.check_overrun()
+            self._push(name, poller)
+
+        # perubahan yang sudah dijadwalkan (mis. device pindah link) tetap jalan
+        self._run_calls()
+        self.conn.close()
+        for poller in self.pollers.values():
+            poller.close_loggers()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+
+class PollScheduler:
+    """
+    Polling banyak device dari satu proses.
+    devices: list dict config per device (lihat config_manager.load_devices),
+    masing-masing dengan key 'name' dan 'poll_interval'.
+    """
+
+    def __init__(self, devices, points_for=None, loggers_for=None,
+                 on_result=None, on_error=None):
+        self.links = {}
+        self.devices = {}
+        self.plans = {}
+        self.points_for = points_for
+        self.loggers_for = loggers_for
+        self.on_result = on_result
+        self.on_error = on_error
+        self._started = False
+        # semua device divalidasi dulu agar config salah tidak
+        # meninggalkan koneksi yang sudah terbuka
+        plans = self._compile(devices)
+        for d, plan in zip(devices, plans):
+            self._add(d, plan)
+
+    def _compile(self, devices):
+        points_for = self.points_for
+        return [
+            compile_plan(d, points_for(d) if points_for else None,
+                         where=f"[Device:{d['name']}]")
+            for d in devices
+        ]
+
+    def _worker_for(self, d):
+        key = link_key(d)
+        worker = self.links.get(key)
+        if worker is None:
+            # RTU: arbiter bus menjaga jeda t3.5 antar unit ID
+            conn = make_connection(d)
+            worker = LinkWorker(key, conn, self.on_result, self.on_error)
+            self.links[key] = worker
+            if self._started:
+                worker.start()
+        return worker
+
+    def _add(self, d, plan):
+        worker = self._worker_for(d)
+        poller = ModbusPoller(
+            d,
+            logger_list=self.loggers_for(d) if self.loggers_for else None,
+            conn=worker.conn,
+            plan=plan,
+        )
+        self.devices[d['name']] = d
+        self.plans[d['name']] = plan
+        if self._started:
+            worker.call(lambda w: w.add(d['name'], poller, max(0.05, plan.interval_s)))
+        else:
+            worker.add(d['name'], poller, max(0.05, plan.interval_s))
+
+    def reconfigure(self, devices, points_for=None, loggers_for=None, rebuild_sinks=False):
+        """
+        Hot reload: terapkan daftar device baru ke scheduler yang berjalan.
+        Device baru ditambahkan, yang hilang dilepas (logger ditutup),
+        yang berubah hanya diganti bagian yang berubah: plan / interval
+        (ModbusPoller.reconfigure), koneksi link bila parameter link berubah,
+        pindah link bila host/port berubah, sink bila rebuild_sinks atau
+        csv_file/table device berubah. Device lain, koneksi dan buffer sink
+        tidak disentuh. ConfigError sebelum ada yang diubah bila config salah.
+        points_for / loggers_for: fungsi yang membaca config baru; menggantikan
+        yang diberikan saat startup agar [Points] / sink ikut config baru.
+        Return {nama: [perubahan]}.
+        """
+        prev = (self.points_for, self.loggers_for)
+        if points_for is not None:
+            self.points_for = points_for
+        if loggers_for is not None:
+            self.loggers_for = loggers_for
+        try:
+            plans = dict(zip((d['name'] for d in devices), self._compile(devices)))
+        except Exception:
+            # config baru ditolak: fungsi lama tetap dipakai
+            self.points_for, self.loggers_for = prev
+            raise
+        new = {d['name']: d for d in devices}
+        changes = {}
+
+        for name in [n for n in self.devices if n not in new]:
+            worker = self.links[link_key(self.devices.pop(name))]
+            self.plans.pop(name, None)
+            worker.call(lambda w, n=name: w.remove(n))
+            changes[name] = ['removed']
+
+        reconnect = {}
+        for name, d in new.items():
+            old = self.devices.get(name)
+            if old is None:
+                self._add(d, plans[name])
+                changes[name] = ['added']
+                continue
+            self.devices[name] = d
+            plan = plans[name]
+            loggers = None
+            if self.loggers_for and (rebuild_sinks or any(
+                    old.get(k) != d.get(k) for k in DEVICE_SINK_KEYS)):
+                # dibuat di thread link setelah logger lama ditutup
+                loggers = lambda d=d, make=self.loggers_for: make(d)
+            worker = self.links[link_key(old)]
+            if link_key(d) != worker.key:
+                self._move(worker, self._worker_for(d), name, d, plan, loggers)
+                changes[name] = ['link']
+                continue
+            changed = _plan_changes(self.plans[name], plan, old, d)
+            if loggers is not None:
+                changed.append('sinks')
+            if any(old.get(k) != d.get(k) for k in LINK_KEYS):
+                reconnect.setdefault(worker.key, d)
+            if changed:
+                worker.call(lambda w, name=name, d=d, plan=plan, loggers=loggers:
+                            w.pollers[name].reconfigure(d, plan, loggers=loggers))
+            changes[name] = changed
+        self.plans.update(plans)
+
+        for key, d in reconnect.items():
+            self.links[key].call(lambda w, d=d: w.reconnect(d))
+            for name, dev in new.items():
+                if link_key(dev) == key and name in changes:
+                    changes[name].append('connection')
+
+        # link tanpa device lagi dihentikan (koneksi ditutup di thread link)
+        used = {link_key(d) for d in new.values()}
+        for key in [k for k in self.links if k not in used]:
+            self.links.pop(key).stop()
+        return {n: c for n, c in changes.items() if c}
+
+    @staticmethod
+    def _move(source, target, name, d, plan, loggers):
+        """Device pindah link: dilepas di thread link lama tanpa menutup logger."""
+        def attach(t, poller):
+            poller.reconfigure(d, plan, conn=t.conn, loggers=loggers)
+            t.add(name, poller, max(0.05, plan.interval_s))
+
+        def detach(w):
+            poller = w.remove(name, close=False)
+            if poller is not None:
+                target.call(lambda t: attach(t, poller))
+        source.call(detach)
+
+    def start(self):
+        self._started = True
+        for w in self.links.values():
+            w.start()
+
+    def stop(self, timeout=5.0):
+        for w in self.links.values():
+            w.stop()
+        for w in self.links.values():
+            if w.is_alive():
+                w.join(timeout)
+
+    def run_forever(self):
+        self.start()
+        try:
+            while any(w.is_alive() for w in self.links.values()):
+                time.sleep(0.5)
+        finally:
+            self.stop()
+
+    def stats(self):
+        out = {}
+        for w in list(self.links.values()):
+            conn = w.conn.stats()
+            for name, st in list(w.stats.items()):
+                poller = w.pollers.get(name)
+                out[name] = {
+                    'link': w.key,
+                    'polls': st.polls,
+                    'errors': st.errors,
+                    'last_error': st.last_error,
+                    'last_poll': st.last_poll,
+                    'connection': conn,
+                    'timing': poller.timing_stats() if poller else None,
+                }
+        return out
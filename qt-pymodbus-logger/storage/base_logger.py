@@ -8,3 +8,7 @@ class BaseLogger(ABC):
     @abstractmethod
     def create_table_if_not_exists(self):
         pass
+
+    def close(self):
+        """Lepas resource (file, koneksi, thread); default tidak ada."""
+        pass
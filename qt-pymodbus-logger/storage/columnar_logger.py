@@ -0,0 +1,237 @@
+import glob
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+from .base_logger import BaseLogger
+
+# Format segmen .col: satu file per hari (tanggal chunk pertama), isinya
+# deretan chunk yang berdiri sendiri:
+#   header  : magic, versi, jumlah channel, jumlah baris, t0_ms, t_last_ms, panjang nama
+#   names   : nama channel utf-8 dipisah '\x1f'
+#   deltas  : int32 x n_rows, selisih ms terhadap baris sebelumnya (baris 0 = 0)
+#   values  : float64 x n_rows per channel, kolom demi kolom (NaN = tidak ada nilai)
+# Semua little-endian; reader bisa melompati chunk di luar rentang waktu
+# hanya dari header.
+MAGIC = b'MBC1'
+VERSION = 1
+_HEADER = struct.Struct('<4sHHIqqI')
+_NAME_SEP = '\x1f'
+_NAN = float('nan')
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _to_ms(timestamp):
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp * 1000)
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp() * 1000)
+    return int(datetime.strptime(timestamp, TS_FORMAT).timestamp() * 1000)
+
+
+def _wall_clock(times_ms):
+    """
+    Epoch ms -> ms jam dinding lokal (naive), basis waktu yang sama dengan
+    string timestamp CSV (storage.csv_index). Offset diambil per ujung chunk;
+    bila berbeda (pergantian DST di tengah chunk) dihitung per baris.
+    """
+    import numpy as np
+    if not len(times_ms):
+        return times_ms
+    first = time.localtime(times_ms[0] / 1000.0).tm_gmtoff
+    last = time.localtime(times_ms[-1] / 1000.0).tm_gmtoff
+    if first == last:
+        return times_ms + first * 1000
+    offsets = [time.localtime(t / 1000.0).tm_gmtoff for t in times_ms.tolist()]
+    return times_ms + np.array(offsets, dtype=np.int64) * 1000
+
+
+def _as_float(v):
+    if v is None:
+        return _NAN
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+class ColumnarLogger(BaseLogger):
+    """
+    Penyimpanan biner kolumnar untuk histori panjang.
+    Baris dikumpulkan per chunk (chunk_rows baris atau chunk_s detik) lalu
+    ditulis sekali sebagai array; baca ulang lewat read_range() tanpa parsing teks.
+    """
+
+    def __init__(self, directory, name='modbus', chunk_rows=3600, chunk_s=300.0):
+        self.directory = directory
+        self.name = name
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.chunk_s = float(chunk_s)
+        os.makedirs(directory, exist_ok=True)
+
+        self._names = None
+        self._times = array('q')
+        self._cols = []
+        self._started = time.monotonic()
+        self._last_ts = None
+        self._last_ms = 0
+
+        self.rows = 0
+        self.chunks = 0
+        self.bytes_written = 0
+
+    def create_table_if_not_exists(self):
+        # noop: file dibuat saat chunk pertama ditulis
+        return
+
+    def segment_path(self, t_ms):
+        day = datetime.fromtimestamp(t_ms / 1000.0).strftime('%Y%m%d')
+        return os.path.join(self.directory, f'{self.name}_{day}.col')
+
+    def log(self, timestamp, data_list):
+        if not data_list:
+            return
+        names = tuple(d.get('sensor_name') or f'ch{i + 1}' for i, d in enumerate(data_list))
+        if names != self._names:
+            # susunan channel berubah: tutup chunk lama, mulai layout baru
+            self.flush()
+            self._names = names
+            self._cols = [array('d') for _ in names]
+
+        # timestamp string yang sama tidak di-parse ulang
+        if timestamp != self._last_ts:
+            self._last_ms = _to_ms(timestamp)
+            self._last_ts = timestamp
+            if self._times and abs(self._last_ms - self._times[-1]) > 0x7FFFFFFF:
+                # selisih tidak muat int32 (jeda > 24 hari): chunk baru
+                self.flush()
+        self._times.append(self._last_ms)
+        for col, d in zip(self._cols, data_list):
+            col.append(_as_float(d.get('value')))
+        self.rows += 1
+
+        if (len(self._times) >= self.chunk_rows
+                or time.monotonic() - self._started >= self.chunk_s):
+            self.flush()
+
+    def flush(self):
+        self._started = time.monotonic()
+        n = len(self._times)
+        if not n:
+            return
+        times = self._times
+        deltas = array('i', [0])
+        deltas.extend(times[i] - times[i - 1] for i in range(1, n))
+        names = _NAME_SEP.join(self._names).encode('utf-8')
+
+        parts = [_HEADER.pack(MAGIC, VERSION, len(self._names), n, times[0], times[-1], len(names)),
+                 names]
+        cols = self._cols
+        if sys.byteorder != 'little':
+            # host big-endian: simpan tetap little-endian
+            deltas.byteswap()
+            for c in cols:
+                c.byteswap()
+        parts.append(deltas.tobytes())
+        parts.extend(c.tobytes() for c in cols)
+
+        with open(self.segment_path(times[0]), 'ab') as f:
+            for p in parts:
+                f.write(p)
+        self.bytes_written += sum(len(p) for p in parts)
+        self.chunks += 1
+
+        self._times = array('q')
+        self._cols = [array('d') for _ in self._names]
+
+    def close(self):
+        self.flush()
+
+    def stats(self):
+        return {
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'bytes_written': self.bytes_written,
+            'bytes_per_row': self.bytes_written / (self.rows - len(self._times))
+                             if self.rows > len(self._times) else 0.0,
+        }
+
+
+def iter_chunks(path):
+    """Yield (names, t0_ms, t_last_ms, n_rows, offset_data) untuk tiap chunk di file."""
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        while True:
+            head = f.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                return
+            magic, version, nch, n, t0, t_last, names_len = _HEADER.unpack(head)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'{path}: bad chunk header at {f.tell() - _HEADER.size}')
+            names = f.read(names_len).decode('utf-8').split(_NAME_SEP)
+            offset = f.tell()
+            size = 4 * n + 8 * n * nch
+            if offset + size > file_size:
+                # chunk terakhir terpotong (proses mati saat menulis)
+                return
+            yield names, t0, t_last, n, offset
+            f.seek(offset + size)
+
+
+def read_range(directory, name, start, end, channels=None):
+    """
+    Baca data name di directory untuk rentang [start, end] (datetime,
+    string '%Y-%m-%d %H:%M:%S' atau epoch detik).
+    Hasil: (times, values) dengan times numpy datetime64[ms] jam dinding
+    lokal (sama dengan storage.csv_index.read_range) dan values
+    dict nama_channel -> numpy float64 (NaN bila channel tidak ada di chunk).
+    """
+    import numpy as np
+
+    start_ms, end_ms = _to_ms(start), _to_ms(end)
+    first = datetime.fromtimestamp(start_ms / 1000.0).date() - timedelta(days=1)
+    last = datetime.fromtimestamp(end_ms / 1000.0).date()
+    paths = []
+    for p in sorted(glob.glob(os.path.join(glob.escape(directory), f'{glob.escape(name)}_*.col'))):
+        day = os.path.basename(p)[len(name) + 1:-4]
+        try:
+            d = datetime.strptime(day, '%Y%m%d').date()
+        except ValueError:
+            continue
+        if first <= d <= last:
+            paths.append(p)
+
+    time_parts = []
+    value_parts = []     # list dict per chunk
+    for path in paths:
+        with open(path, 'rb') as f:
+            for names, t0, t_last, n, offset in iter_chunks(path):
+                if t_last < start_ms or t0 > end_ms:
+                    continue
+                f.seek(offset)
+                deltas = np.frombuffer(f.read(4 * n), dtype='<i4')
+                times = t0 + np.cumsum(deltas, dtype=np.int64)
+                mask = (times >= start_ms) & (times <= end_ms)
+                wanted = names if channels is None else [c for c in channels if c in names]
+                block = np.frombuffer(f.read(8 * n * len(names)), dtype='<f8').reshape(len(names), n)
+                time_parts.append(_wall_clock(times[mask]))
+                value_parts.append({c: block[names.index(c)][mask] for c in wanted})
+
+    if channels is None:
+        channels = []
+        for vp in value_parts:
+            channels.extend(c for c in vp if c not in channels)
+    total = sum(len(t) for t in time_parts)
+    values = {}
+    for c in channels:
+        out = np.full(total, np.nan)
+        pos = 0
+        for t, vp in zip(time_parts, value_parts):
+            if c in vp:
+                out[pos:pos + len(t)] = vp[c]
+            pos += len(t)
+        values[c] = out
+    times = np.concatenate(time_parts) if time_parts else np.empty(0, dtype=np.int64)
+    return times.astype('datetime64[ms]'), values
@@ -0,0 +1,253 @@
+import csv
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from .rotating_file import INDEX_SUFFIX, RotatingFile, open_segment
+
+# Sidecar <file>.csv.idx: deretan entry (timestamp ms, offset byte awal baris),
+# little-endian, satu entry kira-kira tiap every_bytes byte file CSV.
+# Index jarang (sparse): rentang waktu dicari dengan binary search di index,
+# lalu hanya byte di antara dua entry yang dibaca lewat mmap.
+# Timestamp di file diasumsikan naik (urutan tulis CSVLogger).
+_ENTRY = struct.Struct('<qQ')
+DEFAULT_EVERY_BYTES = 64 * 1024
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+TS_LEN = 19
+_SEGMENT_STAMP = re.compile(r'_(\d{8})(?:_(\d{2}))?(?:_\d{3})?\.')
+
+
+def _to_ms(timestamp):
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp * 1000)
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp() * 1000)
+    # TS_FORMAT, juga '2026-10-13' / '2026-10-13 10:00'
+    return int(datetime.fromisoformat(timestamp).timestamp() * 1000)
+
+
+def _key(timestamp):
+    # format TS_FORMAT bisa dibandingkan langsung sebagai string
+    return datetime.fromtimestamp(_to_ms(timestamp) / 1000.0).strftime(TS_FORMAT)
+
+
+def _line_ms(raw):
+    try:
+        return _to_ms(raw.decode('ascii'))
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+class CSVIndexWriter:
+    """Tambah entry index saat logging; dipakai CSVLogger (csv_index_kb > 0)."""
+
+    def __init__(self, csv_path, every_bytes=DEFAULT_EVERY_BYTES):
+        self.path = csv_path + INDEX_SUFFIX
+        self.every_bytes = max(1, int(every_bytes))
+        entries = load_index(csv_path)
+        self._last = entries[-1][1] if entries else None
+        self._f = open(self.path, 'ab')
+        self.entries = 0
+
+    def add(self, timestamp, offset):
+        """offset: posisi byte awal baris bertimestamp timestamp."""
+        if self._last is not None and offset - self._last < self.every_bytes:
+            return
+        try:
+            ms = _to_ms(timestamp)
+        except ValueError:
+            return
+        self._f.write(_ENTRY.pack(ms, offset))
+        # entry jarang; flush agar reader langsung melihatnya
+        self._f.flush()
+        self._last = offset
+        self.entries += 1
+
+    def close(self):
+        self._f.close()
+
+
+def load_index(csv_path):
+    """Entry index [(ms, offset), ...] urut; kosong bila sidecar belum ada."""
+    try:
+        with open(csv_path + INDEX_SUFFIX, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    # entry terakhir bisa terpotong bila proses mati saat menulis
+    data = data[:len(data) - len(data) % _ENTRY.size]
+    return sorted(_ENTRY.iter_unpack(data))
+
+
+def _header_end(mm):
+    # baris pertama header CSVLogger ('timestamp,...') dilewati
+    if mm[:9] != b'timestamp':
+        return 0
+    nl = mm.find(b'\n')
+    return nl + 1 if nl >= 0 else len(mm)
+
+
+def build_index(csv_path, every_bytes=DEFAULT_EVERY_BYTES):
+    """
+    Buat sidecar index, atau lanjutkan dari entry terakhir sampai akhir file
+    (file masih ditulis / index dari CSVLogger tertinggal). Hanya melompat
+    every_bytes demi every_bytes, tidak membaca tiap baris.
+    """
+    entries = load_index(csv_path)
+    size = os.path.getsize(csv_path)
+    if not size:
+        return entries
+    every_bytes = max(1, int(every_bytes))
+    new = []
+    with open(csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if entries:
+            nl = mm.find(b'\n', entries[-1][1] + every_bytes - 1)
+            pos = nl + 1 if nl >= 0 else size
+        else:
+            pos = _header_end(mm)
+        while pos < size:
+            if mm.find(b'\n', pos) < 0:
+                # baris terakhir belum lengkap
+                break
+            ms = _line_ms(mm[pos:pos + TS_LEN])
+            if ms is not None:
+                new.append((ms, pos))
+            nl = mm.find(b'\n', pos + every_bytes - 1)
+            if nl < 0:
+                break
+            pos = nl + 1
+    if new:
+        with open(csv_path + INDEX_SUFFIX, 'ab') as f:
+            f.write(b''.join(_ENTRY.pack(*e) for e in new))
+        entries = sorted(entries + new)
+    return entries
+
+
+def _floats(col):
+    import numpy as np
+    try:
+        return np.array(col).astype(np.float64)
+    except ValueError:
+        # nilai teks (mis. encoding string): NaN
+        out = np.full(len(col), np.nan)
+        for i, v in enumerate(col):
+            try:
+                out[i] = float(v)
+            except ValueError:
+                pass
+        return out
+
+
+def _to_arrays(names, rows, channels=None):
+    """
+    rows: list baris CSV (string) -> (times datetime64[ms], dict nama -> float64).
+    times = jam dinding lokal seperti tertulis di file (tanpa zona waktu).
+    """
+    import numpy as np
+    width = max((len(r) for r in rows), default=1) - 1
+    names = list(names or [])
+    names += [f'ch{i + 1}' for i in range(len(names), width)]
+    times = np.array([r[0] for r in rows], dtype='datetime64[ms]')
+    wanted = names if channels is None else [c for c in channels if c in names]
+    values = {}
+    for c in wanted:
+        i = names.index(c) + 1
+        values[c] = _floats([r[i] if i < len(r) and r[i] != '' else 'nan' for r in rows])
+    return times, values
+
+
+def read_slice(csv_path, start, end, channels=None, every_bytes=DEFAULT_EVERY_BYTES):
+    """
+    Baca baris satu file CSV (tidak terkompres) dengan timestamp dalam
+    [start, end] (datetime, string '%Y-%m-%d %H:%M:%S' atau epoch detik).
+    Index dibuat / dilanjutkan dulu bila perlu.
+    Hasil: (times, values) seperti columnar_logger.read_range().
+    """
+    entries = build_index(csv_path, every_bytes)
+    lo_key, hi_key = _key(start), _key(end)
+    stamps = [e[0] for e in entries]
+    with open(csv_path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return _to_arrays(None, [], channels)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = _header_end(mm)
+            names = next(csv.reader([mm[:header_end].decode('utf-8')]))[1:] if header_end else None
+            # entry terakhir sebelum start .. entry pertama sesudah end
+            i = bisect_left(stamps, _to_ms(start)) - 1
+            j = bisect_right(stamps, _to_ms(end))
+            lo = entries[i][1] if i >= 0 else header_end
+            hi = entries[j][1] if j < len(entries) else mm.rfind(b'\n', lo) + 1
+            block = mm[lo:hi].decode('utf-8') if hi > lo else ''
+    lines = [ln for ln in block.splitlines() if lo_key <= ln[:TS_LEN] <= hi_key]
+    return _to_arrays(names, list(csv.reader(lines)), channels)
+
+
+def _scan_segment(path, lo_key, hi_key):
+    """Segmen terkompres: tidak bisa mmap, dibaca berurutan."""
+    text, raw = open_segment(path)
+    with text, raw:
+        reader = csv.reader(text)
+        names = None
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            if row[0] == 'timestamp':
+                names = row[1:]
+            elif lo_key <= row[0][:TS_LEN] <= hi_key:
+                rows.append(row)
+            elif row[0][:TS_LEN] > hi_key:
+                break
+    return names, rows
+
+
+def _segment_overlaps(path, start_ms, end_ms):
+    m = _SEGMENT_STAMP.search(os.path.basename(path))
+    if not m:
+        return True
+    if m.group(2):
+        first = datetime.strptime(m.group(1) + m.group(2), '%Y%m%d%H')
+        last = first + timedelta(hours=1)
+    else:
+        first = datetime.strptime(m.group(1), '%Y%m%d')
+        last = first + timedelta(days=1)
+    return _to_ms(first) <= end_ms and _to_ms(last) > start_ms
+
+
+def read_range(csv_path, start, end, channels=None):
+    """
+    Seperti read_slice() tetapi untuk semua segmen csv_path (hasil rotasi,
+    termasuk .gz/.zst). Segmen dipilih dari tanggal/jam di namanya.
+    """
+    import numpy as np
+    start_ms, end_ms = _to_ms(start), _to_ms(end)
+    lo_key, hi_key = _key(start), _key(end)
+    parts = []
+    for path in RotatingFile(csv_path).segments():
+        if not _segment_overlaps(path, start_ms, end_ms):
+            continue
+        if path.endswith(('.gz', '.zst')):
+            names, rows = _scan_segment(path, lo_key, hi_key)
+            parts.append(_to_arrays(names, rows, channels))
+        else:
+            parts.append(read_slice(path, start, end, channels))
+
+    parts = [p for p in parts if len(p[0])]
+    if channels is None:
+        channels = []
+        for _, vp in parts:
+            channels.extend(c for c in vp if c not in channels)
+    total = sum(len(t) for t, _ in parts)
+    values = {}
+    for c in channels:
+        out = np.full(total, np.nan)
+        pos = 0
+        for t, vp in parts:
+            if c in vp:
+                out[pos:pos + len(t)] = vp[c]
+            pos += len(t)
+        values[c] = out
+    times = np.concatenate([t for t, _ in parts]) if parts else np.empty(0, dtype='datetime64[ms]')
+    return times, values
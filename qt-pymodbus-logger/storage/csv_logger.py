@@ -1,9 +1,54 @@
-import csv, os
+import csv, os, threading, time
 from .base_logger import BaseLogger
+from .rotating_file import RotatingFile
+from .csv_index import CSVIndexWriter
+
+_num = '{:.6g}'.format
+
+def format_value(v):
+    # None (gagal baca / ditahan deadband) ditulis kosong
+    if v is None:
+        return ''
+    if isinstance(v, (int, float)):
+        return _num(v)
+    return str(v)
 
 class CSVLogger(BaseLogger):
-    def __init__(self, path):
+    """
+    File dibuka sekali dan dipakai terus; status header dicek sekali saat
+    dibuka. Baris ditulis ke buffer dan di-flush tiap flush_rows baris atau
+    flush_interval_s detik (fsync opsional), bukan open/close tiap poll.
+    Batas flush_interval_s dijaga timer, jadi tetap berlaku walau poll
+    berikutnya tertunda (link putus / interval panjang).
+    Rotasi segmen (jam/hari/ukuran), kompresi dan retention lewat
+    RotatingFile; tiap segmen baru diawali header sendiri.
+    index_every_bytes > 0: sidecar <segmen>.idx (timestamp -> offset) ditulis
+    sambil logging untuk csv_index.read_slice() / read_range().
+    """
+
+    def __init__(self, path, flush_rows=100, flush_interval_s=1.0, fsync=False,
+                 rotate='none', max_bytes=0, compress='none', keep_days=0, keep_files=0,
+                 index_every_bytes=0):
         self.path = path
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval_s = float(flush_interval_s)
+        self.fsync = fsync
+        self._seg = RotatingFile(path, rotate, max_bytes, compress, keep_days, keep_files)
+        self.index_every_bytes = int(index_every_bytes)
+        self._index = None
+        # offset awal baris berikutnya, hanya diketahui tepat setelah flush
+        self._mark = None
+        self._f = None
+        self._w = None
+        self._has_header = False
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        # flush dari thread timer dan log() dari thread poll
+        self._lock = threading.RLock()
+        self._timer = None
+
+        self.rows = 0
+        self.flushes = 0
         self._ensure_dir()
 
     def _ensure_dir(self):
@@ -15,25 +60,105 @@ class CSVLogger(BaseLogger):
         # noop for CSV
         return
 
+    def _open(self, f):
+        self._f = f
+        # file kosong / baru → header belum ada
+        self._has_header = f.tell() > 0
+        self._w = csv.writer(f)
+        if self.index_every_bytes > 0:
+            if self._index is not None:
+                self._index.close()
+            self._index = CSVIndexWriter(self._seg.current, self.index_every_bytes)
+            self._mark = f.tell() if self._has_header else None
+
+    def _writer(self):
+        if self._f is None:
+            self._ensure_dir()
+            self._open(self._seg.open())
+        elif self._seg.due():
+            self._rotate()
+        return self._w
+
+    def _rotate(self):
+        self.flush()
+        # flush bisa sudah merotasi karena ukuran
+        if self._seg.due():
+            self._open(self._seg.rotate_now())
+
+    def _written(self, n=1):
+        self.rows += n
+        self._pending += n
+        now = time.monotonic()
+        if self._pending >= self.flush_rows or now - self._last_flush >= self.flush_interval_s:
+            self.flush()
+        elif self._timer is None and self.flush_interval_s > 0:
+            # baris tertahan di buffer: flush paling lambat flush_interval_s
+            self._timer = threading.Timer(
+                self.flush_interval_s - (now - self._last_flush), self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            if self._pending:
+                self.flush()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if self._f is None or not self._pending:
+                return
+            self._f.flush()
+            if self.fsync:
+                os.fsync(self._f.fileno())
+            self._pending = 0
+            self.flushes += 1
+            # ukuran hanya dicek saat flush agar append tetap murah
+            if self._seg.over_size():
+                self._open(self._seg.rotate_now())
+            elif self._index is not None:
+                # buffer kosong: tell() murah dan tepat di awal baris berikutnya
+                self._mark = self._f.tell()
+
+    def close(self):
+        with self._lock:
+            self._cancel_timer()
+            if self._f is not None:
+                self.flush()
+                self._seg.close()
+                self._f = None
+                self._w = None
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
     def log_old(self, timestamp, data_list):
+        with self._lock:
+            self._log_old(timestamp, data_list)
+
+    def _log_old(self, timestamp, data_list):
         # data_list: list of dicts {'sensor_code','sensor_name','value','encoding'}
         header = ['timestamp','sensor_code','sensor_name','value','encoding','quality','note']
-        write_header = not os.path.exists(self.path) or os.path.getsize(self.path)==0
-        with open(self.path, 'a', newline='') as f:
-            w = csv.writer(f)
-            if write_header:
-                w.writerow(header)
-            for d in data_list:
-                row = [
-                    timestamp,
-                    d.get('sensor_code',''),
-                    d.get('sensor_name',''),
-                    d.get('value', ''),
-                    d.get('encoding',''),
-                    d.get('quality','OK'),
-                    d.get('note','')
-                ]
-                w.writerow(row)
+        w = self._writer()
+        if not self._has_header:
+            w.writerow(header)
+            self._has_header = True
+        w.writerows([
+            timestamp,
+            d.get('sensor_code',''),
+            d.get('sensor_name',''),
+            d.get('value', ''),
+            d.get('encoding',''),
+            d.get('quality','OK'),
+            d.get('note','')
+        ] for d in data_list)
+        self._written(len(data_list))
 
     def log(self, timestamp, data_list):
         """
@@ -42,22 +167,25 @@ class CSVLogger(BaseLogger):
         """
         if not data_list:
             return
+        with self._lock:
+            self._log(timestamp, data_list)
 
-        # Path file CSV
-        filepath = self.path
-
-        # Ambil semua nilai sensor
-        values = [f"{d.get('value', ''):.6g}" if isinstance(d.get('value', 0), (int, float)) else str(d.get('value', ''))
-                for d in data_list]
-
+    def _log(self, timestamp, data_list):
+        w = self._writer()
         # Jika file kosong / belum ada → tulis header
-        write_header = not os.path.exists(filepath) or os.path.getsize(filepath) == 0
+        if not self._has_header:
+            headers = ["timestamp"] + [d.get('sensor_name') or f"ch{i+1}" for i, d in enumerate(data_list)]
+            w.writerow(headers)
+            self._has_header = True
+
+        if self._mark is not None:
+            self._index.add(timestamp, self._mark)
+            self._mark = None
 
-        with open(filepath, 'a', newline='') as f:
-            w = csv.writer(f)
-            if write_header:
-                headers = ["timestamp"] + [f"ch{i+1}" for i in range(len(values))]
-                w.writerow(headers)
+        # Tulis baris data
+        w.writerow([timestamp] + [format_value(d.get('value')) for d in data_list])
+        self._written()
 
-            # Tulis baris data
-            w.writerow([timestamp] + values)
\ No newline at end of file
+    def stats(self):
+        return {'rows': self.rows, 'flushes': self.flushes, 'pending': self._pending,
+                'segment': self._seg.current, 'rotations': self._seg.rotations}
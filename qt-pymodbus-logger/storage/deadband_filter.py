@@ -0,0 +1,147 @@
+import time
+from .base_logger import BaseLogger
+
+
+class ChannelRule:
+    def __init__(self, abs_db=0.0, pct_db=0.0, heartbeat_s=0.0, min_interval_s=0.0):
+        self.abs_db = float(abs_db)
+        self.pct_db = float(pct_db)
+        self.heartbeat_s = float(heartbeat_s)
+        self.min_interval_s = float(min_interval_s)
+
+
+class DeadbandFilter(BaseLogger):
+    """
+    Report-by-exception di depan logger lain.
+    Nilai channel hanya diteruskan bila berubah melebihi deadband
+    (absolut atau persen dari nilai terakhir yang dikirim), atau bila
+    channel sudah diam selama heartbeat_s. Dalam min_interval_s setelah
+    pengiriman terakhir perubahan ditahan dulu.
+
+    mode 'sparse': channel yang ditahan dikirim sebagai None, baris dibuang
+                   bila semua channel ditahan
+    mode 'row'   : bila ada satu channel lolos, seluruh baris dikirim
+    """
+
+    def __init__(self, loggers, rule=None, overrides=None, mode='sparse'):
+        self.loggers = list(loggers)
+        self.rule = rule or ChannelRule()
+        self.overrides = overrides or {}
+        self.mode = mode
+        # state per channel: nama -> [nilai_terakhir, waktu_kirim_terakhir]
+        self._last = {}
+
+        self.rows_in = 0
+        self.rows_out = 0
+        self.values_in = 0
+        self.values_out = 0
+        self.suppressed = {}
+
+    def create_table_if_not_exists(self):
+        for logger in self.loggers:
+            logger.create_table_if_not_exists()
+
+    def _passes(self, name, value, now):
+        rule = self.overrides.get(name, self.rule)
+        last = self._last.get(name)
+        if last is None:
+            return True
+        last_value, last_sent = last
+        elapsed = now - last_sent
+
+        if rule.min_interval_s and elapsed < rule.min_interval_s:
+            return False
+        if rule.heartbeat_s and elapsed >= rule.heartbeat_s:
+            return True
+        if value is None or last_value is None:
+            return (value is None) != (last_value is None)
+        if isinstance(value, bool) or isinstance(last_value, bool):
+            return value != last_value
+
+        threshold = max(rule.abs_db, abs(last_value) * rule.pct_db / 100.0)
+        diff = abs(value - last_value)
+        if threshold == 0:
+            return diff != 0
+        return diff > threshold
+
+    def filter(self, data_list, now=None):
+        """Hasil filter untuk satu baris; None bila tidak ada yang perlu dikirim."""
+        now = time.monotonic() if now is None else now
+        self.rows_in += 1
+        self.values_in += len(data_list)
+
+        out = []
+        sent = 0
+        for i, d in enumerate(data_list):
+            name = d.get('sensor_name') or f'ch{i + 1}'
+            value = d.get('value')
+            if self._passes(name, value, now):
+                self._last[name] = [value, now]
+                out.append(d)
+                sent += 1
+            else:
+                self.suppressed[name] = self.suppressed.get(name, 0) + 1
+                out.append(dict(d, value=None, suppressed=True))
+
+        if sent == 0:
+            return None
+        self.rows_out += 1
+        if self.mode == 'row':
+            self.values_out += len(data_list)
+            return data_list
+        self.values_out += sent
+        return out
+
+    def log(self, timestamp, data_list):
+        if not data_list:
+            return
+        out = self.filter(data_list)
+        if out is None:
+            return
+        for logger in self.loggers:
+            try:
+                logger.log(timestamp, out)
+            except Exception as e:
+                print(f"Deadband sink error: {e}")
+
+    def close(self):
+        for logger in self.loggers:
+            logger.close()
+
+    def stats(self):
+        return {
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'rows_dropped': self.rows_in - self.rows_out,
+            'values_in': self.values_in,
+            'values_out': self.values_out,
+            'suppressed': dict(self.suppressed),
+        }
+
+
+def deadband_from_config(config, loggers):
+    """
+    Bungkus loggers dengan DeadbandFilter bila enable_deadband = true di [Logger]:
+    deadband_abs, deadband_pct, heartbeat_s, min_interval_s, deadband_mode.
+    Semua 0 berarti hanya nilai yang berubah yang dikirim.
+    Override per channel di section [Deadband]:
+        nama_channel = abs[, pct[, heartbeat_s[, min_interval_s]]]
+    """
+    lg = config['Logger'] if 'Logger' in config else {}
+    if lg.get('enable_deadband', 'false').lower() not in ('1', 'true', 'yes') or not loggers:
+        return loggers
+    rule = ChannelRule(
+        lg.get('deadband_abs', 0) or 0,
+        lg.get('deadband_pct', 0) or 0,
+        lg.get('heartbeat_s', 0) or 0,
+        lg.get('min_interval_s', 0) or 0,
+    )
+    overrides = {}
+    if 'Deadband' in config:
+        for name, spec in config['Deadband'].items():
+            parts = [p.strip() for p in spec.split(',')]
+            vals = [float(p) if p else 0.0 for p in parts]
+            # field yang tidak diisi ikut aturan global
+            defaults = [rule.abs_db, rule.pct_db, rule.heartbeat_s, rule.min_interval_s]
+            overrides[name] = ChannelRule(*(vals + defaults[len(vals):])[:4])
+    return [DeadbandFilter(loggers, rule, overrides, lg.get('deadband_mode', 'sparse').lower())]
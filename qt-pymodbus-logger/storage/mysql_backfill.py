@@ -0,0 +1,216 @@
+import csv
+import os
+import tempfile
+import time
+import pymysql
+from .mysql_logger import NarrowMySQLLogger
+from .rotating_file import open_segment
+
+# kode error bila LOAD DATA LOCAL ditolak klien / server
+LOCAL_INFILE_ERRORS = (1148, 2068, 3948)
+
+
+def iter_csv_chunks(path, chunk_rows):
+    """
+    Baca file CSVLogger (timestamp, v1, v2, ...) per chunk_rows baris.
+    Yield (names, rows, posisi byte di file mentah); nilai tetap string
+    apa adanya ('' = kosong), jadi tidak ada parsing float.
+    """
+    text, raw = open_segment(path)
+    with text, raw:
+        names = None
+        rows = []
+        for row in csv.reader(text):
+            if not row or not row[0]:
+                continue
+            if row[0] == 'timestamp':
+                # header (juga di awal segmen yang digabung)
+                if rows:
+                    yield names, rows, raw.tell()
+                    rows = []
+                names = row[1:]
+                continue
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                yield names, rows, raw.tell()
+                rows = []
+        if rows:
+            yield names, rows, raw.tell()
+
+
+def _dedupe(rows):
+    # timestamp sama di dalam chunk: baris terakhir yang dipakai
+    unique = {}
+    for r in rows:
+        unique[r[0]] = r
+    return list(unique.values())
+
+
+class MySQLBackfill:
+    """
+    Isi tabel MySQLLogger / NarrowMySQLLogger dari segmen CSV yang sudah ada
+    (mis. setelah jaringan putus berhari-hari).
+    Tiap chunk ditulis ke file sementara lalu LOAD DATA LOCAL INFILE; bila
+    klien/server tidak mengizinkan, otomatis pindah ke INSERT multi-baris.
+    Baris dengan timestamp yang sudah ada di tabel dilewati:
+      wide  : chunk dimuat ke tabel TEMPORARY lalu INSERT ... SELECT ... WHERE NOT EXISTS
+              (index idx_timestamp ditambahkan bila belum ada)
+      narrow: INSERT IGNORE memakai PRIMARY KEY (timestamp, channel_id)
+    Logger sebaiknya dibuat dengan cfg local_infile = true.
+    """
+
+    def __init__(self, logger, chunk_rows=50000, load_data=True, progress=print):
+        self.logger = logger
+        self.narrow = isinstance(logger, NarrowMySQLLogger)
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.load_data = load_data
+        self.progress = progress
+        self._indexed = False
+
+        # statistik
+        self.files = 0
+        self.rows_read = 0
+        self.written = 0
+        self.duplicates = 0
+        self.elapsed_s = 0.0
+
+    # --- LOAD DATA / INSERT ---
+    def _load_file(self, cur, path, table, columns):
+        cur.execute(
+            f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE `{table}` "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(columns)})", (path,))
+        return cur.rowcount
+
+    def _fill(self, cur, table, columns, rows):
+        """Tulis rows ke table: LOAD DATA bila bisa, selain itu INSERT IGNORE multi-baris."""
+        if self.load_data:
+            fd, path = tempfile.mkstemp(suffix='.csv', prefix='backfill_')
+            try:
+                with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+                    w = csv.writer(f, lineterminator='\n')
+                    w.writerows([r'\N' if v == '' or v is None else v for v in r] for r in rows)
+                return self._load_file(cur, path, table, columns)
+            finally:
+                os.remove(path)
+        sql = (f"INSERT IGNORE INTO `{table}` ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        cur.executemany(sql, [[None if v == '' else v for v in r] for r in rows])
+        return cur.rowcount
+
+    def _run(self, fn):
+        try:
+            return self.logger._run(fn)
+        except pymysql.err.MySQLError as e:
+            if not self.load_data or not e.args or e.args[0] not in LOCAL_INFILE_ERRORS:
+                raise
+            self.progress(f"LOAD DATA LOCAL INFILE not allowed ({e.args[1]}), "
+                          f"using multi-row INSERT")
+            self.load_data = False
+            return self.logger._run(fn)
+
+    # --- skema wide ---
+    def _ensure_timestamp_index(self):
+        table = self.logger.table
+
+        def check(cur):
+            cur.execute(f"SHOW INDEX FROM `{table}` WHERE Column_name = 'timestamp'")
+            if cur.fetchall():
+                return
+            self.progress(f"Adding index idx_timestamp on `{table}` (used for dedupe)")
+            cur.execute(f"ALTER TABLE `{table}` ADD INDEX idx_timestamp (timestamp)")
+        self.logger._run(check)
+        self._indexed = True
+
+    def _load_wide(self, rows):
+        lg = self.logger
+        width = max(len(r) for r in rows)
+        if not lg.max_channels:
+            lg.create_table_if_not_exists()
+        lg.ensure_columns(width - 1)
+        if not self._indexed:
+            self._ensure_timestamp_index()
+
+        columns = ['timestamp'] + [f'ch{i + 1}' for i in range(width - 1)]
+        rows = [r if len(r) == width else r + [''] * (width - len(r)) for r in rows]
+        stage = f'{lg.table}_backfill'
+        cols = ', '.join(columns)
+
+        def load(cur):
+            # tabel TEMPORARY hanya milik koneksi ini; dibuat ulang tiap chunk
+            # karena jumlah kolom bisa berbeda antar segmen
+            cur.execute(f"DROP TEMPORARY TABLE IF EXISTS `{stage}`")
+            cur.execute(f"CREATE TEMPORARY TABLE `{stage}` (timestamp DATETIME NOT NULL PRIMARY KEY, "
+                        + ', '.join(f'{c} DOUBLE' for c in columns[1:]) + ")")
+            self._fill(cur, stage, columns, rows)
+            cur.execute(f"INSERT INTO `{lg.table}` ({cols}) SELECT {cols} FROM `{stage}` s "
+                        f"WHERE NOT EXISTS (SELECT 1 FROM `{lg.table}` t WHERE t.timestamp = s.timestamp)")
+            written = cur.rowcount
+            cur.execute(f"DROP TEMPORARY TABLE IF EXISTS `{stage}`")
+            return written
+        return len(rows), self._run(load)
+
+    # --- skema narrow ---
+    def _load_narrow(self, names, rows):
+        lg = self.logger
+        if not lg._ready:
+            lg.create_table_if_not_exists()
+        width = max(len(r) for r in rows) - 1
+        names = list(names or [])
+        names += [f'ch{i + 1}' for i in range(len(names), width)]
+        lg.ensure_partitions(max(r[0] for r in rows)[:7])
+        ids = lg.register_channels(names[:width])
+        ch = [ids[n] for n in names[:width]]
+
+        points = [(r[0], ch[i], v) for r in rows for i, v in enumerate(r[1:]) if v != '']
+        if not points:
+            return 0, 0
+        return len(points), self._run(
+            lambda cur: self._fill(cur, lg.table, ['timestamp', 'channel_id', 'value'], points))
+
+    # --- utama ---
+    def load(self, path):
+        """Muat satu segmen; return (baris dibaca, baris tertulis)."""
+        size = os.path.getsize(path) or 1
+        read = written = 0
+        t0 = time.monotonic()
+        for names, rows, pos in iter_csv_chunks(path, self.chunk_rows):
+            unique = _dedupe(rows)
+            if self.narrow:
+                total, n = self._load_narrow(names, unique)
+            else:
+                total, n = self._load_wide(unique)
+            read += len(rows)
+            written += n
+            self.rows_read += len(rows)
+            self.written += n
+            # narrow: duplikat dihitung per nilai (timestamp, channel)
+            self.duplicates += len(rows) - len(unique) + total - n
+            elapsed = time.monotonic() - t0
+            self.progress(f"  {os.path.basename(path)} {min(100.0, 100.0 * pos / size):5.1f}% "
+                          f"read={read} written={written} "
+                          f"({read / elapsed if elapsed > 0 else 0:.0f} rows/s)")
+        self.files += 1
+        self.elapsed_s += time.monotonic() - t0
+        return read, written
+
+    def run(self, paths):
+        paths = sorted(paths)
+        for i, path in enumerate(paths, 1):
+            self.progress(f"[{i}/{len(paths)}] {path}")
+            try:
+                self.load(path)
+            except (OSError, EOFError, csv.Error, RuntimeError) as e:
+                # file rusak / terpotong: lanjut ke segmen berikutnya
+                self.progress(f"  skipped: {e}")
+        return self.stats()
+
+    def stats(self):
+        return {
+            'files': self.files,
+            'rows_read': self.rows_read,
+            'written': self.written,
+            'duplicates': self.duplicates,
+            'rows_per_s': self.rows_read / self.elapsed_s if self.elapsed_s else 0.0,
+            'mode': 'load_data' if self.load_data else 'insert',
+        }
@@ -1,11 +1,53 @@
+import time
+from datetime import date
 import pymysql
 from .base_logger import BaseLogger
 
+# kode error yang berarti koneksi putus dan layak dicoba ulang setelah reconnect:
+# server shutdown, koneksi di-kill / timeout, gone away, lost connection, dsb.
+RECONNECT_CODES = (1053, 1927, 2002, 2003, 2006, 2013, 2014, 2045, 2048, 2055, 4031)
+
+
+def connection_lost(e):
+    # InterfaceError: pymysql memakai koneksi yang sudah tertutup.
+    # OperationalError lain (lock wait timeout, deadlock, LOCAL INFILE
+    # ditolak, ...) bukan masalah koneksi: reconnect tidak menolong
+    if isinstance(e, pymysql.err.InterfaceError):
+        return True
+    return (isinstance(e, pymysql.err.OperationalError)
+            and bool(e.args) and e.args[0] in RECONNECT_CODES)
+
 class MySQLLogger(BaseLogger):
+    """
+    Logger MySQL dengan satu koneksi persisten dan buffer baris.
+    Baris dikumpulkan lalu ditulis dengan executemany (pymysql menyusunnya
+    menjadi INSERT multi-baris) dalam satu transaksi setiap batch_size
+    baris atau setiap flush_interval_s detik, mana yang lebih dulu.
+    Bila koneksi putus, logger connect ulang dan mencoba sekali lagi;
+    bila tetap gagal baris disimpan di buffer (maks max_buffer baris).
+    """
+
     def __init__(self, cfg):
         self.cfg = cfg
         self.table = cfg.get('table', 'sensor_data')
+        self.batch_size = max(1, int(cfg.get('batch_size') or 100))
+        self.flush_interval_s = float(cfg.get('flush_interval_s') or 1.0)
+        self.max_buffer = max(self.batch_size, int(cfg.get('max_buffer') or 100000))
+        self.retry_s = float(cfg.get('retry_s') or 5.0)
         self.max_channels = 0
+        self._conn = None
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._retry_at = 0.0
+
+        # statistik
+        self.rows_written = 0
+        self.flushes = 0
+        self.reconnects = 0
+        self.errors = 0
+        self.dropped = 0
+        self.flush_s = 0.0
+
         try:
             self.create_table_if_not_exists()
         except Exception as e:
@@ -17,36 +59,70 @@ class MySQLLogger(BaseLogger):
             user=self.cfg.get('user', 'root'),
             password=self.cfg.get('password', ''),
             database=self.cfg.get('database', 'modbus'),
-            autocommit=True
+            connect_timeout=float(self.cfg.get('connect_timeout') or 5),
+            # LOAD DATA LOCAL INFILE (backfill); server tetap harus mengizinkan
+            local_infile=str(self.cfg.get('local_infile', 'false')).lower() in ('1', 'true', 'yes'),
+            autocommit=False
         )
 
+    # --- Koneksi persisten ---
+    def _connection(self):
+        if self._conn is None or not self._conn.open:
+            self._drop()
+            self._conn = self.connect()
+        return self._conn
+
+    def _drop(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _run(self, fn):
+        """Jalankan fn(cursor) dalam satu transaksi; reconnect sekali bila putus."""
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                with conn.cursor() as cur:
+                    result = fn(cur)
+                conn.commit()
+                return result
+            except Exception as e:
+                if connection_lost(e):
+                    self._drop()
+                    if attempt == 2:
+                        raise
+                    self.reconnects += 1
+                    continue
+                try:
+                    conn.rollback()
+                except Exception:
+                    self._drop()
+                raise
+
     # --- Table creation ---
     def create_table_if_not_exists(self):
         """
         Membuat tabel dasar dengan timestamp dan minimal 1 kolom sensor.
         Kolom akan bertambah otomatis bila sensor > jumlah kolom.
         """
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(f"""
+        self._run(lambda cur: cur.execute(f"""
             CREATE TABLE IF NOT EXISTS `{self.table}` (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 timestamp DATETIME NOT NULL,
                 ch1 DOUBLE
             ) ENGINE=InnoDB;
-        """)
-        conn.commit()
-        conn.close()
+        """))
         self.max_channels = self.get_current_channel_count()
 
     # --- Channel checker ---
     def get_current_channel_count(self):
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(f"SHOW COLUMNS FROM `{self.table}` LIKE 'ch%';")
-        cols = cur.fetchall()
-        conn.close()
-        return len(cols)
+        def count(cur):
+            cur.execute(f"SHOW COLUMNS FROM `{self.table}` LIKE 'ch%';")
+            return len(cur.fetchall())
+        return self._run(count)
 
     def ensure_columns(self, required_count):
         """
@@ -56,17 +132,24 @@ class MySQLLogger(BaseLogger):
         if required_count <= self.max_channels:
             return
 
-        conn = self.connect()
-        cur = conn.cursor()
-        for i in range(self.max_channels + 1, required_count + 1):
-            alter_sql = f"ALTER TABLE `{self.table}` ADD COLUMN ch{i} DOUBLE;"
-            print(f"[MySQLLogger] Adding column ch{i}")
-            cur.execute(alter_sql)
-        conn.commit()
-        conn.close()
+        def add(cur):
+            for i in range(self.max_channels + 1, required_count + 1):
+                print(f"[MySQLLogger] Adding column ch{i}")
+                cur.execute(f"ALTER TABLE `{self.table}` ADD COLUMN ch{i} DOUBLE;")
+        self._run(add)
         self.max_channels = required_count
 
     # --- Data insert ---
+    @staticmethod
+    def _values(data_list):
+        # ambil nilai float saja
+        if data_list and isinstance(data_list[0], dict):
+            return [d.get('value', None) for d in data_list]
+        return list(data_list)
+
+    def _row(self, timestamp, data_list):
+        return [timestamp] + self._values(data_list)
+
     def log(self, timestamp, data_list):
         """
         data_list: [{'value': 12.3}, {'value': 45.6}, ...] atau [12.3, 45.6, ...]
@@ -74,25 +157,233 @@ class MySQLLogger(BaseLogger):
         if not data_list:
             return
 
-        # ambil nilai float saja
-        if isinstance(data_list[0], dict):
-            values = [d.get('value', None) for d in data_list]
-        else:
-            values = list(data_list)
+        self._buffer.append(self._row(timestamp, data_list))
+        if len(self._buffer) > self.max_buffer:
+            # MySQL lama tidak tersedia: buang baris tertua
+            excess = len(self._buffer) - self.max_buffer
+            del self._buffer[:excess]
+            self.dropped += excess
 
-        num_channels = len(values)
+        now = time.monotonic()
+        if now < self._retry_at:
+            # server sedang tidak tersedia, jangan connect ulang tiap poll
+            return
+        if (len(self._buffer) >= self.batch_size
+                or now - self._last_flush >= self.flush_interval_s):
+            self.flush()
+
+    def _insert(self, rows):
+        """rows: list [timestamp, v1, v2, ...]; satu transaksi, raise bila gagal."""
+        num_channels = max(len(r) for r in rows) - 1
+        if not self.max_channels:
+            # server belum tersedia saat init: buat tabel sekarang
+            self.create_table_if_not_exists()
         # pastikan jumlah kolom cukup
         self.ensure_columns(num_channels)
-
         cols = ", ".join([f"ch{i+1}" for i in range(num_channels)])
         placeholders = ", ".join(["%s"] * (num_channels + 1))  # +1 untuk timestamp
         sql = f"INSERT INTO `{self.table}` (timestamp, {cols}) VALUES ({placeholders})"
+        width = num_channels + 1
+        params = [r if len(r) == width else r + [None] * (width - len(r)) for r in rows]
+        self._run(lambda cur: cur.executemany(sql, params))
+
+    def insert_rows(self, rows):
+        """
+        Tulis banyak baris (timestamp, data_list) sekaligus tanpa buffer;
+        dipakai replikator store-and-forward. Raise bila gagal.
+        """
+        if not rows:
+            return
+        self._insert([self._row(ts, dl) for ts, dl in rows])
+        self.rows_written += len(rows)
+        self.flushes += 1
 
+    def flush(self):
+        """Tulis isi buffer dalam satu transaksi."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        rows = self._buffer
+        t0 = time.monotonic()
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute(sql, [timestamp] + values)
-            conn.commit()
-            conn.close()
+            self._insert(rows)
         except Exception as e:
-            print(f"MySQL log error: {e}")
\ No newline at end of file
+            # baris tetap di buffer, dicoba lagi pada flush berikutnya
+            self.errors += 1
+            self._retry_at = time.monotonic() + self.retry_s
+            print(f"MySQL log error: {e}")
+            return
+        self._retry_at = 0.0
+        self._buffer = []
+        self.rows_written += len(rows)
+        self.flushes += 1
+        self.flush_s += time.monotonic() - t0
+
+    def close(self):
+        self.flush()
+        self._drop()
+
+    def stats(self):
+        return {
+            'rows_written': self.rows_written,
+            'buffered': len(self._buffer),
+            'flushes': self.flushes,
+            'rows_per_flush': self.rows_written / self.flushes if self.flushes else 0.0,
+            'flush_ms_mean': self.flush_s * 1000.0 / self.flushes if self.flushes else 0.0,
+            'reconnects': self.reconnects,
+            'errors': self.errors,
+            'dropped': self.dropped,
+        }
+
+
+def _month_add(year, month, k):
+    m = year * 12 + (month - 1) + k
+    return m // 12, m % 12 + 1
+
+
+class NarrowMySQLLogger(MySQLLogger):
+    """
+    Skema sempit (timestamp, channel_id, value) untuk histori panjang:
+    - PRIMARY KEY (timestamp, channel_id) ter-cluster, index (channel_id, timestamp)
+    - nama channel di tabel <table>_channels, tidak ada ALTER saat channel bertambah
+    - partisi RANGE per bulan (pYYYYMM + pmax), dibuat otomatis partitions_ahead
+      bulan ke depan; retention_months > 0 menghapus bulan lama dengan DROP PARTITION
+    Nilai None tidak disimpan (cocok dengan filter deadband).
+    """
+
+    def __init__(self, cfg):
+        self.partitions_ahead = int(cfg.get('partitions_ahead') or 2)
+        self.retention_months = int(cfg.get('retention_months') or 0)
+        self.channel_ids = {}
+        self._ready = False
+        self._managed_until = None
+        self._managed_on = None
+        super().__init__(cfg)
+
+    @staticmethod
+    def _partition(year, month):
+        ny, nm = _month_add(year, month, 1)
+        return f"PARTITION p{year:04d}{month:02d} VALUES LESS THAN (TO_DAYS('{ny:04d}-{nm:02d}-01'))"
+
+    def create_table_if_not_exists(self):
+        today = date.today()
+        self._run(lambda cur: cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{self.table}_channels` (
+                channel_id SMALLINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(128) NOT NULL UNIQUE
+            ) ENGINE=InnoDB;
+        """))
+        self._run(lambda cur: cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{self.table}` (
+                timestamp DATETIME NOT NULL,
+                channel_id SMALLINT UNSIGNED NOT NULL,
+                value DOUBLE,
+                PRIMARY KEY (timestamp, channel_id),
+                KEY idx_channel_time (channel_id, timestamp)
+            ) ENGINE=InnoDB
+            PARTITION BY RANGE (TO_DAYS(timestamp)) (
+                {self._partition(today.year, today.month)},
+                PARTITION pmax VALUES LESS THAN MAXVALUE
+            );
+        """))
+
+        def load(cur):
+            cur.execute(f"SELECT name, channel_id FROM `{self.table}_channels`")
+            return dict(cur.fetchall())
+        self.channel_ids = self._run(load)
+        self._ready = True
+        self.manage_partitions()
+
+    # --- Partisi ---
+    def partitions(self):
+        """Nama partisi yang ada, urut."""
+        def query(cur):
+            cur.execute(
+                "SELECT PARTITION_NAME FROM INFORMATION_SCHEMA.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+                "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION",
+                (self.table,))
+            return [r[0] for r in cur.fetchall()]
+        return self._run(query)
+
+    def manage_partitions(self, upto=None):
+        """
+        Pastikan partisi bulanan ada sampai bulan ini + partitions_ahead (atau
+        sampai bulan upto=(tahun, bulan) bila lebih jauh), lalu hapus partisi
+        yang lebih tua dari retention_months.
+        """
+        today = date.today()
+        last = _month_add(today.year, today.month, self.partitions_ahead)
+        if upto and upto > last:
+            # jam device yang ngawur jangan sampai membuat ratusan partisi;
+            # lebih dari setahun ke depan cukup masuk pmax
+            last = min(upto, _month_add(today.year, today.month, 12))
+        existing = self.partitions()
+        months = sorted((int(p[1:5]), int(p[5:7])) for p in existing if p != 'pmax')
+
+        new = []
+        y, m = _month_add(*months[-1], 1) if months else (today.year, today.month)
+        while (y, m) <= last:
+            new.append(self._partition(y, m))
+            y, m = _month_add(y, m, 1)
+        if new:
+            # pmax masih kosong (semua bulan sudah punya partisi): reorganize murah
+            sql = (f"ALTER TABLE `{self.table}` REORGANIZE PARTITION pmax INTO ("
+                   + ", ".join(new) + ", PARTITION pmax VALUES LESS THAN MAXVALUE)")
+            self._run(lambda cur: cur.execute(sql))
+
+        if self.retention_months > 0:
+            cutoff = _month_add(today.year, today.month, -self.retention_months)
+            # partisi pertama juga menampung data lebih lama, ikut dihapus bila lewat batas
+            old = [f'p{y:04d}{m:02d}' for y, m in months if (y, m) < cutoff]
+            if old and len(old) < len(months):
+                sql = f"ALTER TABLE `{self.table}` DROP PARTITION " + ", ".join(old)
+                self._run(lambda cur: cur.execute(sql))
+                print(f"[MySQLLogger] Dropped partitions {', '.join(old)}")
+        self._managed_until = last
+        self._managed_on = today
+
+    def ensure_partitions(self, latest):
+        """latest: timestamp terbaru yang akan ditulis ('YYYY-MM...')."""
+        upto = (int(latest[:4]), int(latest[5:7]))
+        if (self._managed_until is None or self._managed_on != date.today()
+                or upto > self._managed_until):
+            self.manage_partitions(upto)
+
+    # --- Data insert ---
+    def _row(self, timestamp, data_list):
+        if data_list and isinstance(data_list[0], dict):
+            pairs = [(d.get('sensor_name') or f'ch{i + 1}', d.get('value'))
+                     for i, d in enumerate(data_list)]
+        else:
+            pairs = [(f'ch{i + 1}', v) for i, v in enumerate(data_list)]
+        return (timestamp, [(n, v) for n, v in pairs if v is not None])
+
+    def _channel_id(self, cur, name):
+        cur.execute(f"INSERT IGNORE INTO `{self.table}_channels` (name) VALUES (%s)", (name,))
+        cur.execute(f"SELECT channel_id FROM `{self.table}_channels` WHERE name = %s", (name,))
+        return cur.fetchone()[0]
+
+    def register_channels(self, names):
+        """Pastikan semua nama punya channel_id; kembalikan dict nama -> id."""
+        missing = {n for n in names if n not in self.channel_ids}
+        if missing:
+            def register(cur):
+                return {n: self._channel_id(cur, n) for n in sorted(missing)}
+            self.channel_ids.update(self._run(register))
+        return self.channel_ids
+
+    def _insert(self, rows):
+        if not self._ready:
+            # server belum tersedia saat init: buat tabel sekarang
+            self.create_table_if_not_exists()
+
+        self.ensure_partitions(max(str(ts)[:7] for ts, _ in rows))
+
+        ids = self.register_channels({n for _, pairs in rows for n, _ in pairs})
+        params = [(ts, ids[n], v) for ts, pairs in rows for n, v in pairs]
+        if not params:
+            return
+        sql = (f"INSERT INTO `{self.table}` (timestamp, channel_id, value) VALUES (%s, %s, %s) "
+               f"ON DUPLICATE KEY UPDATE value = VALUES(value)")
+        self._run(lambda cur: cur.executemany(sql, params))
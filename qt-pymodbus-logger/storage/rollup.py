@@ -0,0 +1,190 @@
+import json
+import os
+from datetime import datetime, timedelta
+from .base_logger import BaseLogger
+
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+STATS = ('min', 'max', 'mean', 'count', 'last')
+
+
+def window_label(seconds):
+    seconds = int(seconds)
+    if seconds % 3600 == 0:
+        return f'{seconds // 3600}h'
+    if seconds % 60 == 0:
+        return f'{seconds // 60}m'
+    return f'{seconds}s'
+
+
+def _to_datetime(timestamp):
+    if isinstance(timestamp, datetime):
+        return timestamp
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp)
+    return datetime.strptime(timestamp, TS_FORMAT)
+
+
+class _Window:
+    """Agregat berjalan satu ukuran window: O(1) per nilai."""
+
+    def __init__(self, seconds, sinks):
+        if 86400 % seconds:
+            raise ValueError(f'rollup window {seconds}s must divide a day')
+        self.seconds = seconds
+        self.sinks = sinks
+        self.start = None
+        # nama -> [count, sum, min, max, last]
+        self.acc = {}
+        self.order = []
+        self._known = set()
+        self.emitted = 0
+
+    def bucket(self, dt):
+        midnight = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        secs = (dt - midnight).seconds
+        return midnight + timedelta(seconds=secs - secs % self.seconds)
+
+    def add(self, name, value):
+        a = self.acc.get(name)
+        if a is None:
+            self.acc[name] = [1, value, value, value, value]
+            if name not in self._known:
+                self._known.add(name)
+                self.order.append(name)
+            return
+        a[0] += 1
+        a[1] += value
+        if value < a[2]:
+            a[2] = value
+        if value > a[3]:
+            a[3] = value
+        a[4] = value
+
+    def rows(self):
+        # urutan channel tetap antar window agar kolom CSV / tabel lebar tidak bergeser
+        out = []
+        for name in self.order:
+            a = self.acc.get(name)
+            if a is None:
+                vals = (None,) * len(STATS)
+            else:
+                count, total, lo, hi, last = a
+                vals = (lo, hi, total / count, count, last)
+            for stat, v in zip(STATS, vals):
+                out.append({'sensor_name': f'{name}_{stat}', 'value': v})
+        return out
+
+    def emit(self):
+        if self.start is None or not self.acc:
+            return
+        timestamp = self.start.strftime(TS_FORMAT)
+        rows = self.rows()
+        for sink in self.sinks:
+            try:
+                sink.log(timestamp, rows)
+            except Exception as e:
+                print(f"Rollup {window_label(self.seconds)} sink error: {e}")
+        self.emitted += 1
+        self.acc = {}
+
+
+class RollupAggregator(BaseLogger):
+    """
+    Agregasi streaming hasil poll ke window tetap (mis. 1 menit, 15 menit, 1 jam).
+    Per channel disimpan min/max/sum/count/last saja, jadi biaya per nilai O(1).
+    Window yang sudah tertutup dikirim ke sink BaseLogger miliknya sebagai satu
+    baris bertimestamp awal window dengan kolom <channel>_min/_max/_mean/_count/_last.
+    Nilai None (gagal baca) tidak dihitung.
+
+    Window yang belum selesai saat close() tidak dikirim (baris setengah window
+    akan terduplikasi / menimpa baris lengkap setelah restart). Bila state_path
+    diisi, akumulatornya disimpan ke file JSON itu dan dilanjutkan saat
+    aggregator dibuat lagi (restart / hot reload); tanpa state_path dibuang.
+
+    windows: dict detik -> list sink
+    """
+
+    def __init__(self, windows, state_path=None):
+        self.windows = [_Window(int(s), list(sinks)) for s, sinks in sorted(windows.items())]
+        self.loggers = [sink for w in self.windows for sink in w.sinks]
+        self.state_path = state_path
+        self.samples = 0
+        self.late = 0
+        self._restore()
+
+    def _restore(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            for w in self.windows:
+                st = state.get(str(w.seconds))
+                if st:
+                    w.start = datetime.strptime(st['start'], TS_FORMAT)
+                    w.acc = {name: list(a) for name, a in st['acc'].items()}
+                    w.order = list(st['order'])
+                    w._known = set(w.order)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Rollup state {self.state_path} ignored: {e}")
+        os.remove(self.state_path)
+
+    def _save(self):
+        state = {
+            str(w.seconds): {'start': w.start.strftime(TS_FORMAT), 'acc': w.acc, 'order': w.order}
+            for w in self.windows if w.start is not None and w.acc
+        }
+        if not state:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def create_table_if_not_exists(self):
+        for logger in self.loggers:
+            logger.create_table_if_not_exists()
+
+    def log(self, timestamp, data_list):
+        if not data_list:
+            return
+        dt = _to_datetime(timestamp)
+        values = []
+        for i, d in enumerate(data_list):
+            v = d.get('value')
+            if v is None or isinstance(v, str):
+                continue
+            values.append((d.get('sensor_name') or f'ch{i + 1}', float(v)))
+        self.samples += 1
+
+        for w in self.windows:
+            start = w.bucket(dt)
+            if w.start is None:
+                w.start = start
+            elif start > w.start:
+                w.emit()
+                w.start = start
+            elif start < w.start:
+                # sampel dari window yang sudah ditutup: abaikan
+                self.late += 1
+                continue
+            for name, v in values:
+                w.add(name, v)
+
+    def close(self):
+        # window yang sedang berjalan tidak dikirim; dilanjutkan dari state_path
+        if self.state_path:
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Rollup state {self.state_path} not saved: {e}")
+        for logger in self.loggers:
+            logger.close()
+
+    def stats(self):
+        return {
+            'samples': self.samples,
+            'late': self.late,
+            'emitted': {window_label(w.seconds): w.emitted for w in self.windows},
+        }
@@ -0,0 +1,274 @@
+import glob
+import gzip
+import io
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ROTATE_MODES = ('none', 'hourly', 'daily')
+COMPRESS_MODES = ('none', 'gzip', 'zstd')
+_STAMP = {'hourly': '%Y%m%d_%H', 'daily': '%Y%m%d'}
+# sidecar index timestamp -> offset (csv_index.py); ikut dihapus bersama segmennya
+INDEX_SUFFIX = '.idx'
+
+
+def _remove_sidecar(path):
+    try:
+        os.remove(path + INDEX_SUFFIX)
+    except OSError:
+        pass
+
+
+def _compress_file(src, method):
+    """Kompres src ke src.gz / src.zst lalu hapus src."""
+    if method == 'zstd' and zstandard is None:
+        method = 'gzip'
+    dst = src + ('.zst' if method == 'zstd' else '.gz')
+    tmp = dst + '.tmp'
+    with open(src, 'rb') as fi:
+        if method == 'zstd':
+            with open(tmp, 'wb') as fo:
+                zstandard.ZstdCompressor(level=3).copy_stream(fi, fo)
+        else:
+            with gzip.open(tmp, 'wb', compresslevel=6) as fo:
+                shutil.copyfileobj(fi, fo, 1 << 20)
+    os.replace(tmp, dst)
+    os.remove(src)
+    # offset index tidak berlaku untuk file terkompres
+    _remove_sidecar(src)
+    return dst
+
+
+def open_segment(path):
+    """Buka segmen CSV (polos, .gz atau .zst); kembalikan (teks, file mentah)."""
+    raw = open(path, 'rb')
+    if path.endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=raw)
+    elif path.endswith('.zst'):
+        if zstandard is None:
+            raw.close()
+            raise RuntimeError(f'{path}: zstandard not installed')
+        stream = zstandard.ZstdDecompressor().stream_reader(raw)
+    else:
+        stream = raw
+    return io.TextIOWrapper(stream, encoding='utf-8', newline=''), raw
+
+
+class SegmentCompressor(threading.Thread):
+    """Satu thread latar untuk kompresi segmen dan retention."""
+
+    def __init__(self):
+        super().__init__(name='segment-compressor', daemon=True)
+        self.jobs = queue.Queue()
+        self.compressed = 0
+        self.deleted = 0
+        self.errors = 0
+
+    def run(self):
+        while True:
+            path, method, retention = self.jobs.get()
+            try:
+                if path and method != 'none' and os.path.exists(path):
+                    _compress_file(path, method)
+                    self.compressed += 1
+                if retention:
+                    self.deleted += retention()
+            except Exception as e:
+                self.errors += 1
+                print(f"Segment compress error {path}: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def submit(self, path, method, retention=None):
+        self.jobs.put((path, method, retention))
+
+    def wait(self):
+        """Tunggu semua pekerjaan selesai (dipakai saat shutdown)."""
+        self.jobs.join()
+
+
+_compressor = None
+_compressor_lock = threading.Lock()
+
+
+def get_compressor():
+    global _compressor
+    with _compressor_lock:
+        if _compressor is None:
+            _compressor = SegmentCompressor()
+            _compressor.start()
+        return _compressor
+
+
+class RotatingFile:
+    """
+    File teks append-only yang dipecah menjadi segmen:
+      rotate   : none | hourly | daily  (batas jam dinding lokal)
+      max_bytes: pecah juga bila segmen melebihi ukuran ini (0 = tidak)
+    Nama segmen dapat ditebak:
+      <root>_<YYYYmmdd[_HH]>[_NNN]<ext>   contoh modbus_data_20261018_14_001.csv
+    Tanpa rotasi dan tanpa max_bytes nama file tetap <path> seperti dulu.
+    Segmen yang ditutup dikompres (gzip / zstd) di thread latar, lalu
+    segmen lama dihapus menurut keep_days (umur) dan keep_files (jumlah).
+    """
+
+    def __init__(self, path, rotate='none', max_bytes=0, compress='none',
+                 keep_days=0, keep_files=0):
+        if rotate not in ROTATE_MODES:
+            raise ValueError(f'rotate must be one of {", ".join(ROTATE_MODES)}')
+        if compress not in COMPRESS_MODES:
+            raise ValueError(f'compress must be one of {", ".join(COMPRESS_MODES)}')
+        if compress == 'zstd' and zstandard is None:
+            print("zstandard not installed, compressing segments with gzip")
+        self.path = path
+        self.rotate = rotate
+        self.max_bytes = int(max_bytes)
+        self.compress = compress
+        self.keep_days = float(keep_days)
+        self.keep_files = int(keep_files)
+        self.root, self.ext = os.path.splitext(path)
+        self.ext = self.ext or '.csv'
+        self.segmented = rotate != 'none' or self.max_bytes > 0
+        self._pattern = re.compile(
+            re.escape(os.path.basename(self.root))
+            + r'(_\d{8}(_\d{2})?)?(_\d{3})?' + re.escape(self.ext) + r'(\.gz|\.zst)?$')
+
+        self.f = None
+        self.current = None
+        self._stamp = None
+        self._index = 0
+        self._next_boundary = float('inf')
+        self._started = False
+        self.rotations = 0
+
+    # --- penamaan ---
+    def _stamp_for(self, now):
+        fmt = _STAMP.get(self.rotate)
+        return time.strftime(fmt, time.localtime(now)) if fmt else ''
+
+    def _boundary_after(self, now):
+        lt = time.localtime(now)
+        if self.rotate == 'hourly':
+            start = time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday, lt.tm_hour, 0, 0, 0, 0, -1))
+            return start + 3600
+        if self.rotate == 'daily':
+            # hari berikutnya lewat mktime agar pergantian DST tetap benar
+            return time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        return float('inf')
+
+    def segment_name(self, stamp, index):
+        if not self.segmented:
+            return self.path
+        name = self.root + (f'_{stamp}' if stamp else '') + (f'_{index:03d}' if index else '')
+        return name + self.ext
+
+    def _taken(self, name):
+        return any(os.path.exists(name + s) for s in ('', '.gz', '.zst'))
+
+    def _last_index(self, stamp):
+        prefix = os.path.basename(self.root) + (f'_{stamp}' if stamp else '')
+        last = 0
+        for p in self.segments():
+            name = os.path.basename(p)
+            name = name[:name.index(self.ext, len(prefix))] if name.startswith(prefix) else ''
+            rest = name[len(prefix):]
+            if len(rest) == 4 and rest[0] == '_' and rest[1:].isdigit():
+                last = max(last, int(rest[1:]))
+        return last
+
+    def segments(self):
+        """Semua segmen milik file ini (termasuk yang terkompres), urut nama."""
+        d = os.path.dirname(self.path) or '.'
+        names = [p for p in glob.glob(os.path.join(glob.escape(d), '*'))
+                 if self._pattern.match(os.path.basename(p))]
+        return sorted(names)
+
+    # --- buka / tutup ---
+    def open(self, now=None):
+        """Buka segmen aktif untuk waktu now; kembalikan file object."""
+        now = time.time() if now is None else now
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        stamp = self._stamp_for(now)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            # lanjutkan segmen terakhir periode ini bila ada (restart);
+            # bila sudah terkompres, mulai segmen baru sesudahnya
+            idx = self._last_index(stamp)
+            name = self.segment_name(stamp, idx)
+            if self.segmented and self._taken(name) and not os.path.exists(name):
+                idx += 1
+            self._index = idx
+        self.current = self.segment_name(stamp, self._index)
+        self.f = open(self.current, 'a', newline='', buffering=1 << 16)
+        self._next_boundary = self._boundary_after(now)
+        if self.segmented and not self._started:
+            self._started = True
+            self._queue_leftovers()
+        return self.f
+
+    def _queue_leftovers(self):
+        # segmen lama yang belum dikompres (mis. proses sebelumnya mati)
+        if self.compress == 'none' and not (self.keep_days or self.keep_files):
+            return
+        for p in self.segments():
+            if p != self.current and p.endswith(self.ext):
+                get_compressor().submit(p, self.compress, self._apply_retention)
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    # --- rotasi ---
+    def due(self, now=None):
+        """True bila batas waktu segmen sudah lewat (murah, tanpa syscall)."""
+        return (time.time() if now is None else now) >= self._next_boundary
+
+    def over_size(self):
+        """Panggil setelah flush: tell() pada file teks ikut mem-flush buffer."""
+        return self.max_bytes > 0 and self.f is not None and self.f.tell() >= self.max_bytes
+
+    def rotate_now(self, now=None):
+        """Tutup segmen aktif, antrikan kompresi, buka segmen berikutnya."""
+        now = time.time() if now is None else now
+        closed = self.current
+        self.close()
+        if self._stamp_for(now) == self._stamp:
+            self._index += 1
+        self.rotations += 1
+        if self.compress != 'none' or self.keep_days or self.keep_files:
+            get_compressor().submit(closed, self.compress, self._apply_retention)
+        return self.open(now)
+
+    def _apply_retention(self):
+        segs = [p for p in self.segments() if p != self.current]
+        doomed = set()
+        if self.keep_files and len(segs) > self.keep_files:
+            doomed.update(segs[:len(segs) - self.keep_files])
+        if self.keep_days:
+            cutoff = time.time() - self.keep_days * 86400
+            for p in segs:
+                try:
+                    if os.path.getmtime(p) < cutoff:
+                        doomed.add(p)
+                except OSError:
+                    pass
+        deleted = 0
+        for p in doomed:
+            try:
+                os.remove(p)
+                deleted += 1
+            except OSError:
+                pass
+            _remove_sidecar(p)
+        return deleted
@@ -0,0 +1,223 @@
+import json
+import os
+import queue
+import threading
+import time
+from timing import Histogram
+from .base_logger import BaseLogger
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'spill')
+
+_STOP = object()
+
+
+class SinkWriter:
+    """
+    Satu thread penulis untuk satu sink. Baris masuk ke antrian terbatas;
+    bila penuh, perilaku mengikuti overflow:
+      block       : poll menunggu sampai ada tempat (tidak ada data hilang)
+      drop_oldest : baris tertua di antrian dibuang
+      spill       : baris ditulis ke file JSON-lines di spill_dir dan
+                    diputar ulang oleh writer setelah antrian kosong
+    Urutan baris tetap terjaga: selama masih ada spill, baris baru ikut
+    ke spill sampai file itu diputar ulang.
+    """
+
+    def __init__(self, sink, name, maxsize=1000, overflow='block', spill_dir=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'sink_overflow must be one of {", ".join(OVERFLOW_POLICIES)}')
+        self.sink = sink
+        self.name = name
+        self.overflow = overflow
+        self.queue = queue.Queue(maxsize=max(1, int(maxsize)))
+        self.spill_path = None
+        if overflow == 'spill':
+            spill_dir = spill_dir or 'logs/spill'
+            os.makedirs(spill_dir, exist_ok=True)
+            self.spill_path = os.path.join(spill_dir, f'{name}.spill.jsonl')
+        self._spill_lock = threading.Lock()
+        # sisa spill dari run sebelumnya diputar ulang lebih dulu
+        self._spilling = bool(self.spill_path) and (
+            os.path.exists(self.spill_path) or os.path.exists(self.spill_path + '.replay'))
+        self._thread = threading.Thread(target=self._run, name=f'sink-{name}', daemon=True)
+
+        # statistik
+        self.enqueued = 0
+        self.written = 0
+        self.errors = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.max_depth = 0
+        self.latency = Histogram()
+        self.last_error = None
+
+    def start(self):
+        self._thread.start()
+
+    # --- sisi poll ---
+    def put(self, timestamp, data_list):
+        item = (time.monotonic(), timestamp, data_list)
+        self.enqueued += 1
+        if self._spilling:
+            self._spill(item)
+            return
+        if self.overflow == 'block':
+            self.queue.put(item)
+        elif self.overflow == 'drop_oldest':
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self._spill(item)
+                return
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _spill(self, item):
+        _, timestamp, data_list = item
+        with self._spill_lock:
+            self._spilling = True
+            with open(self.spill_path, 'a') as f:
+                f.write(json.dumps([timestamp, data_list]) + '\n')
+        self.spilled += 1
+
+    # --- sisi writer ---
+    def _write(self, enqueued_at, timestamp, data_list):
+        try:
+            self.sink.log(timestamp, data_list)
+            self.written += 1
+        except Exception as e:
+            self.errors += 1
+            self.last_error = f'{type(e).__name__}: {e}'
+        if enqueued_at is not None:
+            self.latency.add(time.monotonic() - enqueued_at)
+
+    def _replay_spill(self):
+        replay = self.spill_path + '.replay'
+        with self._spill_lock:
+            # .replay yang tertinggal (proses berhenti di tengah replay)
+            # diputar dulu; spill baru menyusul di panggilan berikutnya
+            if not os.path.exists(replay):
+                if os.path.exists(self.spill_path):
+                    os.replace(self.spill_path, replay)
+                self._spilling = False
+                if not os.path.exists(replay):
+                    return
+        with open(replay) as f:
+            for line in f:
+                try:
+                    timestamp, data_list = json.loads(line)
+                except ValueError:
+                    continue
+                self._write(None, timestamp, data_list)
+                self.replayed += 1
+        os.remove(replay)
+
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._spilling:
+                    self._replay_spill()
+                continue
+            if item is _STOP:
+                break
+            self._write(*item)
+            if self._spilling and self.queue.empty():
+                self._replay_spill()
+        while self._spilling:
+            self._replay_spill()
+
+    def stop(self, timeout=10.0):
+        """Kirim sisa antrian ke sink lalu hentikan thread."""
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+        try:
+            self.sink.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        return {
+            'overflow': self.overflow,
+            'depth': self.queue.qsize(),
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'replayed': self.replayed,
+            'latency': self.latency.as_dict(),
+            'last_error': self.last_error,
+        }
+
+
+class SinkDispatcher(BaseLogger):
+    """
+    Fan-out asinkron: log() hanya memasukkan baris ke antrian tiap sink,
+    penulisan dilakukan thread per sink. Sink lambat (mis. MySQL timeout)
+    tidak lagi menahan jadwal poll.
+    """
+
+    def __init__(self, loggers, maxsize=1000, overflow='block', spill_dir=None, prefix=''):
+        self.loggers = list(loggers)
+        self.writers = []
+        names = {}
+        for logger in self.loggers:
+            base = type(logger).__name__
+            names[base] = names.get(base, 0) + 1
+            name = base if names[base] == 1 else f'{base}{names[base]}'
+            # prefix (nama device) agar file spill antar device tidak bentrok
+            name = f'{prefix}-{name}' if prefix else name
+            self.writers.append(SinkWriter(logger, name, maxsize, overflow, spill_dir))
+        for w in self.writers:
+            w.start()
+
+    def create_table_if_not_exists(self):
+        for logger in self.loggers:
+            logger.create_table_if_not_exists()
+
+    def log(self, timestamp, data_list):
+        if not data_list:
+            return
+        for w in self.writers:
+            w.put(timestamp, data_list)
+
+    def close(self):
+        for w in self.writers:
+            w.stop()
+
+    def stats(self):
+        return {w.name: w.stats() for w in self.writers}
+
+
+def dispatcher_from_config(config, loggers, device=None):
+    """
+    Bungkus loggers dengan SinkDispatcher bila async_sinks = true di [Logger]:
+    sink_queue_size, sink_overflow (block | drop_oldest | spill), sink_spill_dir.
+    """
+    lg = config['Logger'] if 'Logger' in config else {}
+    if lg.get('async_sinks', 'false').lower() not in ('1', 'true', 'yes') or not loggers:
+        return loggers
+    return [SinkDispatcher(
+        loggers,
+        maxsize=int(lg.get('sink_queue_size', 1000)),
+        overflow=lg.get('sink_overflow', 'block').lower(),
+        spill_dir=lg.get('sink_spill_dir', 'logs/spill'),
+        prefix=device['name'] if device else '',
+    )]
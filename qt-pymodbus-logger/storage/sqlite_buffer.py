@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from .base_logger import BaseLogger
+
+
+class StoreAndForwardLogger(BaseLogger):
+    """
+    Buffer lokal SQLite (WAL) di depan sink jarak jauh (mis. MySQLLogger).
+    log() hanya INSERT lokal sehingga selalu cepat dan tahan restart;
+    thread replikator mengirim backlog ke target per batch besar dan
+    mencatat high-water mark (id terakhir yang sudah terkirim) di tabel meta.
+    Baris yang sudah terkirim dihapus dari buffer.
+
+    Target sebaiknya punya insert_rows([(timestamp, data_list), ...]) yang
+    raise bila gagal; target lain dipanggil log() per baris.
+    """
+
+    def __init__(self, db_path, target, batch_rows=5000, retry_s=5.0, idle_s=1.0):
+        self.db_path = db_path
+        self.target = target
+        self.loggers = [target]
+        self.batch_rows = max(1, int(batch_rows))
+        self.retry_s = float(retry_s)
+        self.idle_s = float(idle_s)
+        d = os.path.dirname(db_path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = self._connect()
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS buffer (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('hwm', 0);
+        """)
+        self.hwm = self._db.execute("SELECT value FROM meta WHERE key = 'hwm'").fetchone()[0]
+        self._last_id = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM buffer").fetchone()[0]
+        self._last_id = max(self._last_id, self.hwm)
+
+        # statistik
+        self.buffered = 0
+        self.forwarded = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_forward = None
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._replicate, name='store-forward', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: commit tanpa fsync, tetap konsisten bila proses mati
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def create_table_if_not_exists(self):
+        self.target.create_table_if_not_exists()
+
+    def log(self, timestamp, data_list):
+        if not data_list:
+            return
+        data = json.dumps([[d.get('sensor_name'), d.get('value')] for d in data_list])
+        with self._lock:
+            cur = self._db.execute("INSERT INTO buffer (timestamp, data) VALUES (?, ?)",
+                                   (str(timestamp), data))
+            self._last_id = cur.lastrowid
+        self.buffered += 1
+
+    # --- replikator ---
+    def _fetch(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, timestamp, data FROM buffer WHERE id > ? ORDER BY id LIMIT ?",
+                (self.hwm, self.batch_rows)).fetchall()
+
+    def _send(self, rows):
+        batch = [(ts, [{'sensor_name': n, 'value': v} for n, v in json.loads(data)])
+                 for _, ts, data in rows]
+        if hasattr(self.target, 'insert_rows'):
+            self.target.insert_rows(batch)
+        else:
+            for ts, data_list in batch:
+                self.target.log(ts, data_list)
+
+    def _advance(self, hwm):
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("UPDATE meta SET value = ? WHERE key = 'hwm'", (hwm,))
+            self._db.execute("DELETE FROM buffer WHERE id <= ?", (hwm,))
+            self._db.execute("COMMIT")
+        self.hwm = hwm
+
+    def _replicate(self):
+        while not self._stop_event.is_set():
+            rows = self._fetch()
+            if not rows:
+                self._stop_event.wait(self.idle_s)
+                continue
+            try:
+                self._send(rows)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f'{type(e).__name__}: {e}'
+                # target tidak tersedia: backlog tetap aman di SQLite
+                self._stop_event.wait(self.retry_s)
+                continue
+            self._advance(rows[-1][0])
+            self.forwarded += len(rows)
+            self.batches += 1
+            self.last_forward = time.time()
+            if len(rows) < self.batch_rows:
+                # backlog habis: kumpulkan baris dulu agar batch tetap besar
+                self._stop_event.wait(self.idle_s)
+
+    def backlog(self):
+        return max(0, self._last_id - self.hwm)
+
+    def close(self, timeout=10.0):
+        self._stop_event.set()
+        self._thread.join(timeout)
+        with self._lock:
+            self._db.close()
+        self.target.close()
+
+    def stats(self):
+        return {
+            'backlog': self.backlog(),
+            'hwm': self.hwm,
+            'buffered': self.buffered,
+            'forwarded': self.forwarded,
+            'batches': self.batches,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
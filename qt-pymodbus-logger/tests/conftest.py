@@ -0,0 +1,7 @@
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# modul aplikasi diimpor langsung (seperti main_cli.py dijalankan dari folder ini)
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, 'benchmarks'))
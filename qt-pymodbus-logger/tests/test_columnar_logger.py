@@ -0,0 +1,86 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from storage.columnar_logger import ColumnarLogger, iter_chunks, read_range
+
+T0 = datetime(2026, 10, 13, 23, 59, 50)
+
+
+def stamp(i):
+    return (T0 + timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def row(i, names=('a', 'b')):
+    return [{'sensor_name': n, 'value': i * (k + 1)} for k, n in enumerate(names)]
+
+
+def as_str(times):
+    return [str(t).replace('T', ' ')[:19] for t in times]
+
+
+def test_round_trip_with_wall_clock_times(tmp_path):
+    lg = ColumnarLogger(str(tmp_path), 'dev', chunk_rows=4, chunk_s=3600)
+    for i in range(10):
+        lg.log(stamp(i), row(i))
+    lg.close()
+    assert lg.stats()['chunks'] == 3
+    times, values = read_range(str(tmp_path), 'dev', stamp(0), stamp(9))
+    # times sama dengan string timestamp yang ditulis
+    assert as_str(times) == [stamp(i) for i in range(10)]
+    assert values['a'].tolist() == list(range(10))
+    assert values['b'].tolist() == [2 * i for i in range(10)]
+
+
+def test_chunk_crossing_midnight_stays_in_first_day_file(tmp_path):
+    lg = ColumnarLogger(str(tmp_path), 'dev', chunk_rows=30, chunk_s=3600)
+    for i in range(40):
+        lg.log(stamp(i), row(i))
+    lg.close()
+    # chunk 1 (23:59:50 .. 00:00:19) di file tanggal 13, chunk 2 di file tanggal 14
+    assert sorted(os.listdir(tmp_path)) == ['dev_20261013.col', 'dev_20261014.col']
+    assert [n for *_, n, _ in iter_chunks(str(tmp_path / 'dev_20261013.col'))] == [30]
+
+    # rentang yang hanya mencakup tanggal 14 tetap membaca file tanggal 13
+    times, values = read_range(str(tmp_path), 'dev', '2026-10-14 00:00:00', stamp(35))
+    assert as_str(times) == [stamp(i) for i in range(10, 36)]
+    assert values['a'].tolist() == list(range(10, 36))
+
+
+def test_channels_none_values_and_layout_change(tmp_path):
+    lg = ColumnarLogger(str(tmp_path), 'dev', chunk_rows=100, chunk_s=3600)
+    lg.log(stamp(0), [{'sensor_name': 'a', 'value': None}, {'sensor_name': 'b', 'value': 'x'}])
+    lg.log(stamp(1), row(1))
+    # channel bertambah: chunk baru dengan layout baru
+    lg.log(stamp(2), row(2, ('a', 'b', 'c')))
+    lg.close()
+    assert lg.stats()['chunks'] == 2
+    times, values = read_range(str(tmp_path), 'dev', stamp(0), stamp(2))
+    assert list(values) == ['a', 'b', 'c']
+    assert np.isnan(values['a'][0]) and np.isnan(values['b'][0])
+    assert values['a'][1:].tolist() == [1, 2]
+    assert np.isnan(values['c'][:2]).all() and values['c'][2] == 6
+
+    times, values = read_range(str(tmp_path), 'dev', stamp(1), stamp(2), channels=['c'])
+    assert len(times) == 2 and list(values) == ['c']
+
+
+def test_truncated_last_chunk_is_ignored(tmp_path):
+    lg = ColumnarLogger(str(tmp_path), 'dev', chunk_rows=5, chunk_s=3600)
+    for i in range(10):
+        lg.log(stamp(i), row(i))
+    lg.close()
+    path = str(tmp_path / 'dev_20261013.col')
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 3)
+    times, values = read_range(str(tmp_path), 'dev', stamp(0), stamp(9))
+    assert values['a'].tolist() == list(range(5))
+
+
+def test_range_outside_data_is_empty(tmp_path):
+    lg = ColumnarLogger(str(tmp_path), 'dev')
+    lg.log(stamp(0), row(0))
+    lg.close()
+    times, values = read_range(str(tmp_path), 'dev', '2026-10-15 00:00:00', '2026-10-15 01:00:00')
+    assert len(times) == 0 and values == {}
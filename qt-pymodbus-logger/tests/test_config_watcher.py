@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from config_manager import ConfigError, ConfigWatcher
+
+
+def write(path, interval, bump=0):
+    path.write_text(f'[Modbus]\npoll_interval = {interval}\n')
+    # mtime berbeda walau ditulis dalam satu tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000))
+
+
+def test_rejected_config_is_retried(tmp_path):
+    path = tmp_path / 'config.ini'
+    write(path, 1)
+    calls = []
+
+    def on_change(new, diff):
+        calls.append(new['Modbus']['poll_interval'])
+        if len(calls) == 1:
+            raise ConfigError('sink not ready')
+
+    watcher = ConfigWatcher(on_change, str(path))
+    write(path, 2, bump=1)
+    with pytest.raises(ConfigError):
+        watcher.check()
+    assert watcher.config['Modbus']['poll_interval'] == '1'
+
+    # file tidak berubah lagi, tetap dicoba ulang
+    assert watcher.check()
+    assert calls == ['2', '2']
+    assert watcher.config['Modbus']['poll_interval'] == '2'
+    assert watcher.check() is None
+
+
+def test_poll_waits_for_file_to_settle(tmp_path):
+    path = tmp_path / 'config.ini'
+    write(path, 1)
+    calls = []
+    watcher = ConfigWatcher(lambda new, diff: calls.append(str(diff)), str(path))
+    write(path, 2, bump=1)
+    assert watcher.poll() is None
+    assert watcher.poll()
+    assert len(calls) == 1
+
+    # isi sama (hanya mtime berubah): tidak ada diff, tidak dipanggil lagi
+    write(path, 2, bump=2)
+    watcher.check()
+    assert watcher.check() is None
+    assert len(calls) == 1
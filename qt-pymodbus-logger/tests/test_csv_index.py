@@ -0,0 +1,120 @@
+import gzip
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from storage.csv_index import build_index, load_index, read_range, read_slice
+from storage.rotating_file import INDEX_SUFFIX
+
+T0 = datetime(2026, 10, 13, 23, 0, 0)
+
+
+def stamp(i):
+    return (T0 + timedelta(seconds=10 * i)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def csv_text(header, first, last):
+    lines = [','.join(['timestamp'] + header)]
+    for i in range(first, last):
+        lines.append(','.join([stamp(i)] + [str(i * (k + 1)) for k in range(len(header))]))
+    return '\n'.join(lines) + '\n'
+
+
+def write_plain(path, header, first, last):
+    with open(path, 'w', newline='') as f:
+        f.write(csv_text(header, first, last))
+
+
+def write_gzip(path, header, first, last):
+    with gzip.open(path, 'wt', newline='') as f:
+        f.write(csv_text(header, first, last))
+
+
+def as_str(times):
+    return [str(t).replace('T', ' ')[:19] for t in times]
+
+
+def test_read_slice_matches_full_scan(tmp_path):
+    path = str(tmp_path / 'd.csv')
+    write_plain(path, ['a', 'b'], 0, 500)
+    for lo, hi in [(0, 499), (1, 1), (137, 301), (498, 600), (-5, 3)]:
+        times, values = read_slice(path, stamp(lo), stamp(hi), every_bytes=128)
+        want = list(range(max(lo, 0), min(hi, 499) + 1))
+        assert as_str(times) == [stamp(i) for i in want]
+        assert values['a'].tolist() == want
+        assert values['b'].tolist() == [2 * i for i in want]
+    # index jarang: satu entry tiap ~128 byte, bukan tiap baris
+    assert 10 < len(load_index(path)) < 500 // 2
+
+
+def test_read_slice_outside_file_and_channel_filter(tmp_path):
+    path = str(tmp_path / 'd.csv')
+    write_plain(path, ['a', 'b'], 0, 50)
+    times, values = read_slice(path, '2026-10-12', '2026-10-13 22:00', every_bytes=64)
+    assert len(times) == 0
+    times, values = read_slice(path, stamp(10), stamp(12), channels=['b', 'x'], every_bytes=64)
+    assert list(values) == ['b']
+    assert values['b'].tolist() == [20, 22, 24]
+
+
+def test_build_index_resumes_after_append(tmp_path):
+    path = str(tmp_path / 'd.csv')
+    write_plain(path, ['a'], 0, 100)
+    first = build_index(path, every_bytes=100)
+    with open(path, 'a') as f:
+        f.write(csv_text(['a'], 100, 200).split('\n', 1)[1])
+    resumed = build_index(path, every_bytes=100)
+    assert resumed[:len(first)] == first
+    assert len(resumed) > len(first)
+    with open(path, 'rb') as f:
+        data = f.read()
+    for _, offset in resumed:
+        assert offset == 0 or data[offset - 1:offset] == b'\n'
+    times, values = read_slice(path, stamp(95), stamp(105), every_bytes=100)
+    assert values['a'].tolist() == list(range(95, 106))
+
+
+def test_read_range_across_rotated_and_compressed_segments(tmp_path):
+    # 23:00 tanggal 13 s/d lewat tengah malam: rotasi per jam,
+    # dua segmen lama sudah terkompres, segmen aktif masih polos
+    root = str(tmp_path / 'd')
+    write_gzip(root + '_20261013_23.csv.gz', ['a'], 0, 200)
+    write_gzip(root + '_20261013_23_001.csv.gz', ['a', 'b'], 200, 360)
+    write_plain(root + '_20261014_00.csv', ['a', 'b'], 360, 500)
+    # segmen di luar rentang tidak dibuka sama sekali
+    with open(root + '_20261012_10.csv.gz', 'wb') as f:
+        f.write(b'not gzip')
+
+    times, values = read_range(root + '.csv', stamp(150), stamp(420))
+    want = list(range(150, 421))
+    assert as_str(times) == [stamp(i) for i in want]
+    assert values['a'].tolist() == want
+    # kolom b belum ada di segmen pertama
+    b = values['b']
+    assert np.isnan(b[:50]).all()
+    assert b[50:].tolist() == [2 * i for i in range(200, 421)]
+    # segmen polos mendapat index, segmen terkompres tidak
+    assert os.path.exists(root + '_20261014_00.csv' + INDEX_SUFFIX)
+    assert not os.path.exists(root + '_20261013_23.csv.gz' + INDEX_SUFFIX)
+
+
+def test_read_range_single_day_segment(tmp_path):
+    root = str(tmp_path / 'd')
+    write_gzip(root + '_20261013.csv.gz', ['a'], 0, 360)
+    write_plain(root + '_20261014.csv', ['a'], 360, 400)
+    times, values = read_range(root + '.csv', stamp(355), stamp(365), channels=['a'])
+    assert values['a'].tolist() == list(range(355, 366))
+    times, values = read_range(root + '.csv', '2026-10-15', '2026-10-16')
+    assert len(times) == 0 and values == {}
+
+
+def test_read_range_zstd_segment(tmp_path):
+    zstandard = pytest.importorskip('zstandard')
+    root = str(tmp_path / 'd')
+    with open(root + '_20261013_23.csv.zst', 'wb') as f:
+        f.write(zstandard.ZstdCompressor().compress(csv_text(['a'], 0, 100).encode()))
+    write_plain(root + '_20261013_23_001.csv', ['a'], 100, 150)
+    times, values = read_range(root + '.csv', stamp(90), stamp(110))
+    assert values['a'].tolist() == list(range(90, 111))
@@ -0,0 +1,104 @@
+import configparser
+
+from storage.deadband_filter import ChannelRule, DeadbandFilter, deadband_from_config
+
+
+class Sink:
+    def __init__(self):
+        self.rows = []
+
+    def log(self, timestamp, data_list):
+        self.rows.append((timestamp, data_list))
+
+    def close(self):
+        pass
+
+
+def row(**values):
+    return [{'sensor_name': k, 'value': v} for k, v in values.items()]
+
+
+def values(out):
+    return None if out is None else [d['value'] for d in out]
+
+
+def test_abs_deadband():
+    f = DeadbandFilter([], ChannelRule(abs_db=0.5))
+    assert values(f.filter(row(a=10.0), now=0)) == [10.0]
+    assert f.filter(row(a=10.4), now=1) is None
+    # dibanding nilai terakhir yang dikirim, bukan yang terakhir dibaca
+    assert f.filter(row(a=10.5), now=2) is None
+    assert values(f.filter(row(a=10.6), now=3)) == [10.6]
+    assert f.stats()['suppressed'] == {'a': 2}
+
+
+def test_pct_deadband_and_zero_means_any_change():
+    f = DeadbandFilter([], ChannelRule(pct_db=10))
+    f.filter(row(a=100.0, b=0.0), now=0)
+    assert values(f.filter(row(a=109.0, b=0.0), now=1)) is None
+    assert values(f.filter(row(a=111.0, b=0.0), now=2)) == [111.0, None]
+    # threshold 0 (nilai terakhir 0): perubahan sekecil apa pun lolos
+    assert values(f.filter(row(a=111.0, b=0.001), now=3)) == [None, 0.001]
+
+
+def test_heartbeat_resends_unchanged_value():
+    f = DeadbandFilter([], ChannelRule(abs_db=1, heartbeat_s=60))
+    f.filter(row(a=5.0), now=0)
+    assert f.filter(row(a=5.0), now=59) is None
+    assert values(f.filter(row(a=5.0), now=60)) == [5.0]
+    # heartbeat dihitung ulang dari pengiriman terakhir
+    assert f.filter(row(a=5.0), now=100) is None
+
+
+def test_min_interval_holds_changes():
+    f = DeadbandFilter([], ChannelRule(min_interval_s=10))
+    f.filter(row(a=1.0), now=0)
+    assert f.filter(row(a=2.0), now=5) is None
+    assert values(f.filter(row(a=3.0), now=10)) == [3.0]
+
+
+def test_none_and_bool_transitions():
+    f = DeadbandFilter([], ChannelRule(abs_db=100))
+    f.filter(row(a=1.0, b=False), now=0)
+    assert values(f.filter(row(a=None, b=True), now=1)) == [None, True]
+    assert f.filter(row(a=None, b=True), now=2) is None
+    assert values(f.filter(row(a=1.0, b=True), now=3)) == [1.0, None]
+
+
+def test_sparse_marks_suppressed_and_row_mode_sends_all():
+    sparse = DeadbandFilter([], ChannelRule(abs_db=1))
+    sparse.filter(row(a=1.0, b=1.0), now=0)
+    out = sparse.filter(row(a=5.0, b=1.5), now=1)
+    assert out[1] == {'sensor_name': 'b', 'value': None, 'suppressed': True}
+
+    full = DeadbandFilter([], ChannelRule(abs_db=1), mode='row')
+    full.filter(row(a=1.0, b=1.0), now=0)
+    assert values(full.filter(row(a=5.0, b=1.5), now=1)) == [5.0, 1.5]
+    assert full.stats()['values_out'] == 4
+
+
+def test_log_forwards_only_passing_rows():
+    sink = Sink()
+    f = DeadbandFilter([sink], ChannelRule(abs_db=1))
+    for ts, v in enumerate([1.0, 1.2, 3.0]):
+        f.log(ts, row(a=v))
+    assert [ts for ts, _ in sink.rows] == [0, 2]
+    assert f.stats()['rows_dropped'] == 1
+
+
+def test_from_config_overrides_fill_missing_fields():
+    cfg = configparser.ConfigParser()
+    cfg.read_dict({
+        'Logger': {'enable_deadband': 'true', 'deadband_abs': '0.5', 'heartbeat_s': '30'},
+        'Deadband': {'flow': '2', 'temp': ',5'},
+    })
+    sink = Sink()
+    [f] = deadband_from_config(cfg, [sink])
+    assert f.loggers == [sink]
+    assert (f.rule.abs_db, f.rule.heartbeat_s) == (0.5, 30)
+    flow, temp = f.overrides['flow'], f.overrides['temp']
+    assert (flow.abs_db, flow.pct_db, flow.heartbeat_s) == (2, 0, 30)
+    assert (temp.abs_db, temp.pct_db, temp.heartbeat_s) == (0, 5, 30)
+
+    cfg['Logger']['enable_deadband'] = 'false'
+    assert deadband_from_config(cfg, [sink]) == [sink]
@@ -0,0 +1,15 @@
+import pytest
+
+from modbus_client_v3 import device_key
+
+
+@pytest.mark.parametrize('version, key', [
+    ((2, 5), 'unit'),
+    ((3, 0), 'slave'),
+    ((3, 10), 'slave'),
+    ((3, 11), 'device_id'),
+    ((4, 0), 'device_id'),
+    ((4, 2), 'device_id'),
+])
+def test_device_key_per_pymodbus_version(version, key):
+    assert device_key(version) == key
@@ -0,0 +1,119 @@
+import asyncio
+import configparser
+import csv
+import threading
+import time
+
+import pytest
+
+import simulator
+from config_manager import diff_config, load_devices
+from logger_setup import apply_config, build_loggers
+from register_map import load_points
+from scheduler import PollScheduler
+
+
+@pytest.fixture
+def sim_port():
+    proc, endpoints = simulator.start(tcp=1)
+    yield endpoints['tcp'][0]
+    proc.terminate()
+    proc.wait(10)
+
+
+def make_config(port, csv_file, points):
+    cfg = configparser.ConfigParser()
+    cfg['Modbus'] = {'type': 'tcp', 'host': '127.0.0.1', 'tcp_port': str(port),
+                     'timeout': '0.5', 'poll_interval': '0.1'}
+    cfg['Logger'] = {'enable_csv': 'true', 'csv_file': str(csv_file), 'csv_flush_rows': '1'}
+    cfg['Points'] = points
+    cfg['Device:d1'] = {'unit_id': '1'}
+    return cfg
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_multi_device_reload_uses_new_points_and_csv_file(sim_port, tmp_path):
+    old = make_config(sim_port, tmp_path / 'old.csv', {'a': 'holding, 10, u16'})
+    sched = PollScheduler(
+        load_devices(old),
+        points_for=lambda d: load_points(old, d.get('points', 'Points')),
+        loggers_for=lambda d: build_loggers(old, d),
+    )
+    sched.start()
+    try:
+        time.sleep(0.5)
+        new = make_config(sim_port, tmp_path / 'new.csv',
+                          {'a': 'holding, 10, u16', 'b': 'holding, 11, u16'})
+        changes = apply_config(sched, new, diff_config(old, new))
+        assert set(changes['d1']) >= {'plan', 'sinks'}
+        time.sleep(0.8)
+    finally:
+        sched.stop()
+
+    old_rows = read_rows(tmp_path / 'old_d1.csv')
+    new_rows = read_rows(tmp_path / 'new_d1.csv')
+    assert old_rows[0][1:] == ['a']
+    # titik baru ikut dipoll dan baris masuk ke csv_file baru
+    assert new_rows[0][1:] == ['a', 'b']
+    assert len(new_rows) > 2
+    # simulator: holding register di alamat i berisi i
+    assert [float(v) for v in new_rows[-1][1:]] == [10.0, 11.0]
+
+
+def test_async_engine_reload_applies_in_place(sim_port, tmp_path):
+    from async_worker import AsyncPollEngine
+
+    old = make_config(sim_port, tmp_path / 'old.csv', {'a': 'holding, 10, u16'})
+    old['Modbus']['engine'] = 'async'
+    engine = AsyncPollEngine(
+        load_devices(old),
+        points_for=lambda d: load_points(old, d.get('points', 'Points')),
+        loggers_for=lambda d: build_loggers(old, d),
+    )
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_until_complete, args=(engine.run(),))
+    thread.start()
+    try:
+        time.sleep(0.5)
+        conn = engine.pollers[0].conn
+        new = make_config(sim_port, tmp_path / 'new.csv',
+                          {'a': 'holding, 10, u16', 'b': 'holding, 11, u16'})
+        new['Modbus']['engine'] = 'async'
+        new['Device:d2'] = {'unit_id': '2'}
+        changes = apply_config(engine, new, diff_config(old, new))
+        assert set(changes['d1']) == {'plan', 'sinks'}
+        assert changes['d2'] == ['added']
+        # koneksi link yang sama tetap dipakai
+        assert [p.conn for p in engine.pollers] == [conn, conn]
+        time.sleep(0.8)
+
+        # d2 dilepas, d1 tetap jalan
+        newer = make_config(sim_port, tmp_path / 'new.csv',
+                            {'a': 'holding, 10, u16', 'b': 'holding, 11, u16'})
+        newer['Modbus']['engine'] = 'async'
+        assert apply_config(engine, newer, diff_config(new, newer)) == {'d2': ['removed']}
+        assert [p.name for p in engine.pollers] == ['d1']
+    finally:
+        loop.call_soon_threadsafe(engine.stop)
+        thread.join(10)
+        loop.close()
+
+    assert read_rows(tmp_path / 'old_d1.csv')[0][1:] == ['a']
+    new_rows = read_rows(tmp_path / 'new_d1.csv')
+    assert new_rows[0][1:] == ['a', 'b']
+    assert [float(v) for v in new_rows[-1][1:]] == [10.0, 11.0]
+    assert len(read_rows(tmp_path / 'new_d2.csv')) > 2
+    assert engine.stats['d1']['errors'] == 0
+
+
+def test_apply_config_engine_switch_needs_restart(sim_port, tmp_path):
+    old = make_config(sim_port, tmp_path / 'old.csv', {'a': 'holding, 10, u16'})
+    sched = PollScheduler(load_devices(old),
+                          points_for=lambda d: load_points(old, d.get('points', 'Points')))
+    new = make_config(sim_port, tmp_path / 'old.csv', {'a': 'holding, 10, u16'})
+    new['Modbus']['engine'] = 'async'
+    assert apply_config(sched, new, diff_config(old, new)) is None
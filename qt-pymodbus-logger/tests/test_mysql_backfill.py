@@ -0,0 +1,150 @@
+import csv
+
+import pymysql
+import pytest
+
+from storage.mysql_backfill import MySQLBackfill, _dedupe, iter_csv_chunks
+from storage.mysql_logger import NarrowMySQLLogger
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _ignore_insert(self, points):
+        table = self.conn.table
+        n = 0
+        for ts, ch, value in points:
+            if (ts, ch) not in table:
+                table[(ts, ch)] = value
+                n += 1
+        self.rowcount = n
+
+    def execute(self, sql, args=None):
+        self.conn.sql.append(sql.split()[0] + ' ' + sql.split()[1])
+        if sql.startswith('LOAD DATA'):
+            if self.conn.load_error:
+                raise pymysql.err.OperationalError(self.conn.load_error, 'not allowed')
+            with open(args[0], newline='') as f:
+                self._ignore_insert([(ts, int(ch), None if v == r'\N' else float(v))
+                                     for ts, ch, v in csv.reader(f)])
+
+    def executemany(self, sql, params):
+        self.conn.sql.append('INSERT IGNORE')
+        self._ignore_insert([(ts, int(ch), None if v is None else float(v)) for ts, ch, v in params])
+
+
+class FakeConnection:
+    open = True
+
+    def __init__(self, load_error=None):
+        self.load_error = load_error
+        self.table = {}
+        self.sql = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeNarrow(NarrowMySQLLogger):
+    # skema / partisi / channel tidak diuji di sini
+    def __init__(self, conn):
+        self.conn = conn
+        super().__init__({'table': 't'})
+
+    def connect(self):
+        return self.conn
+
+    def create_table_if_not_exists(self):
+        self._ready = True
+
+    def ensure_partitions(self, latest):
+        pass
+
+    def register_channels(self, names):
+        self.channel_ids.update({n: i + 1 for i, n in enumerate(sorted(names))
+                                 if n not in self.channel_ids})
+        return self.channel_ids
+
+
+def write_csv(path):
+    with open(path, 'w') as f:
+        f.write('timestamp,a,b\n'
+                '2026-10-13 10:00:00,1,2\n'
+                '2026-10-13 10:00:01,3,\n'
+                '2026-10-13 10:00:00,5,6\n'
+                # header lagi: segmen yang digabung
+                'timestamp,a,b\n'
+                '2026-10-13 10:00:02,7,8\n')
+    return str(path)
+
+
+def test_dedupe_keeps_last_row_per_timestamp():
+    rows = [['t1', '1'], ['t2', '2'], ['t1', '3'], ['t3', '4'], ['t2', '5']]
+    assert _dedupe(rows) == [['t1', '3'], ['t2', '5'], ['t3', '4']]
+
+
+def test_iter_csv_chunks_splits_on_header_and_size(tmp_path):
+    path = write_csv(tmp_path / 'd.csv')
+    chunks = [(names, [r[0][-2:] for r in rows]) for names, rows, _ in iter_csv_chunks(path, 2)]
+    assert chunks == [(['a', 'b'], ['00', '01']), (['a', 'b'], ['00']), (['a', 'b'], ['02'])]
+
+
+def test_load_data_skips_duplicates_and_empty_values(tmp_path):
+    path = write_csv(tmp_path / 'd.csv')
+    conn = FakeConnection()
+    bf = MySQLBackfill(FakeNarrow(conn), chunk_rows=10, progress=lambda msg: None)
+    assert bf.load(path) == (4, 5)
+    assert conn.table == {
+        ('2026-10-13 10:00:00', 1): 5.0, ('2026-10-13 10:00:00', 2): 6.0,
+        ('2026-10-13 10:00:01', 1): 3.0,
+        ('2026-10-13 10:00:02', 1): 7.0, ('2026-10-13 10:00:02', 2): 8.0,
+    }
+    assert bf.stats()['duplicates'] == 1
+    assert 'INSERT IGNORE' not in conn.sql
+
+    # dimuat ulang: semua sudah ada di tabel
+    assert bf.load(path) == (4, 0)
+    assert bf.stats()['mode'] == 'load_data'
+
+
+@pytest.mark.parametrize('errno', [1148, 3948])
+def test_falls_back_to_insert_ignore_when_local_infile_refused(tmp_path, errno):
+    path = write_csv(tmp_path / 'd.csv')
+    conn = FakeConnection(load_error=errno)
+    messages = []
+    bf = MySQLBackfill(FakeNarrow(conn), chunk_rows=10, progress=messages.append)
+    assert bf.load(path) == (4, 5)
+    assert bf.stats()['mode'] == 'insert'
+    assert any('LOAD DATA LOCAL INFILE not allowed' in m for m in messages)
+    assert conn.table[('2026-10-13 10:00:00', 1)] == 5.0
+    # chunk berikutnya langsung INSERT, LOAD DATA tidak dicoba lagi
+    loads = conn.sql.count('LOAD DATA')
+    assert bf.load(path) == (4, 0)
+    assert conn.sql.count('LOAD DATA') == loads
+    # baris kembar di dalam chunk + semua nilai yang sudah ada
+    assert bf.stats()['duplicates'] == 1 + (1 + 5)
+
+
+def test_other_errors_are_not_treated_as_local_infile(tmp_path):
+    path = write_csv(tmp_path / 'd.csv')
+    bf = MySQLBackfill(FakeNarrow(FakeConnection(load_error=1045)), progress=lambda msg: None)
+    with pytest.raises(pymysql.err.OperationalError):
+        bf.load(path)
+    assert bf.load_data
@@ -0,0 +1,107 @@
+import pymysql
+import pytest
+
+from storage.mysql_logger import MySQLLogger, connection_lost
+
+OperationalError = pymysql.err.OperationalError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        if self.conn.faults:
+            raise self.conn.faults.pop(0)
+        self.conn.executed.append(sql)
+
+    def executemany(self, sql, params):
+        self.execute(sql)
+        self.conn.rows.extend(params)
+
+    def fetchall(self):
+        return [('ch1',)]
+
+
+class FakeConnection:
+    def __init__(self, faults):
+        self.faults = faults
+        self.executed = []
+        self.rows = []
+        self.open = True
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.open = False
+
+
+class FakeLogger(MySQLLogger):
+    def __init__(self):
+        # error yang akan dilempar, dibagi ke semua koneksi lewat list yang sama
+        self.faults = []
+        self.conns = []
+        super().__init__({'batch_size': 2})
+
+    def connect(self):
+        self.conns.append(FakeConnection(self.faults))
+        return self.conns[-1]
+
+
+@pytest.mark.parametrize('error, lost', [
+    (OperationalError(2006, 'MySQL server has gone away'), True),
+    (OperationalError(2013, 'Lost connection to MySQL server during query'), True),
+    (OperationalError(2055, 'Lost connection to MySQL server at reading'), True),
+    (pymysql.err.InterfaceError(0, ''), True),
+    (OperationalError(1205, 'Lock wait timeout exceeded'), False),
+    (OperationalError(1213, 'Deadlock found'), False),
+    (OperationalError(1148, 'The used command is not allowed'), False),
+    (OperationalError(), False),
+    (pymysql.err.ProgrammingError(1146, "Table doesn't exist"), False),
+])
+def test_connection_lost_checks_error_code(error, lost):
+    assert connection_lost(error) is lost
+
+
+def test_reconnects_once_when_connection_drops():
+    lg = FakeLogger()
+    lg.faults.append(OperationalError(2013, 'Lost connection'))
+    lg.log('2026-10-13 10:00:00', [1.0])
+    lg.log('2026-10-13 10:00:01', [2.0])
+    assert lg.reconnects == 1
+    assert len(lg.conns) == 2 and not lg.conns[0].open
+    assert lg.conns[1].rows == [['2026-10-13 10:00:00', 1.0], ['2026-10-13 10:00:01', 2.0]]
+    assert lg.stats()['buffered'] == 0
+
+
+def test_gives_up_after_second_drop_and_keeps_rows():
+    lg = FakeLogger()
+    lg.faults.extend([OperationalError(2006, 'gone away'), OperationalError(2006, 'gone away')])
+    lg.log('2026-10-13 10:00:00', [1.0])
+    lg.log('2026-10-13 10:00:01', [2.0])
+    assert (lg.reconnects, lg.errors) == (1, 1)
+    assert lg.stats()['buffered'] == 2
+
+
+def test_other_operational_errors_roll_back_without_reconnect():
+    lg = FakeLogger()
+    lg.faults.append(OperationalError(1205, 'Lock wait timeout exceeded'))
+    with pytest.raises(OperationalError):
+        lg._run(lambda cur: cur.execute('UPDATE t SET x = 1'))
+    assert lg.reconnects == 0
+    assert len(lg.conns) == 1 and lg.conns[0].open
+    assert lg.conns[0].rollbacks == 1
@@ -0,0 +1,53 @@
+import pipelined_tcp
+from pipelined_tcp import PipelineResponse, PipelinedTcpClient
+
+REQS = [('holding', 0, 2, 1), ('holding', 10, 2, 1)]
+
+
+class FlakyPipeline(PipelinedTcpClient):
+    """Exchange pipelined gagal selama fail_pipelined True; berurutan selalu berhasil."""
+
+    def __init__(self, **kwargs):
+        super().__init__('127.0.0.1', depth=4, **kwargs)
+        self.sock = object()
+        self.fail_pipelined = True
+
+    def open(self):
+        return True
+
+    def _exchange(self, reqs, indices, depth, results):
+        if depth > 1 and self.fail_pipelined:
+            raise TimeoutError('second frame not answered')
+        for i in indices:
+            results[i] = PipelineResponse(3, registers=[i])
+
+
+def test_single_failure_does_not_disable_pipelining():
+    c = FlakyPipeline(fallback_after=3)
+    c.read_many(REQS)
+    c.fail_pipelined = False
+    c.read_many(REQS)
+    c.fail_pipelined = True
+    c.read_many(REQS)
+    c.read_many(REQS)
+    # kegagalan tidak berturut-turut 3x: tetap pipelined
+    assert c.pipelining and c.fallbacks == 0 and c.pipeline_errors == 3
+
+
+def test_fallback_latches_after_consecutive_failures_then_retries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pipelined_tcp.time, 'monotonic', lambda: now[0])
+    c = FlakyPipeline(fallback_after=2, retry_s=60)
+    for _ in range(2):
+        assert [r.registers for r in c.read_many(REQS)] == [[0], [1]]
+    assert not c.pipelining and c.fallbacks == 1
+
+    # masa tunggu habis, device masih gagal: satu kegagalan langsung turun lagi
+    now[0] += 61
+    c.read_many(REQS)
+    assert not c.pipelining and c.fallbacks == 2
+
+    now[0] += 61
+    c.fail_pipelined = False
+    c.read_many(REQS)
+    assert c.pipelining and c.fallbacks == 2
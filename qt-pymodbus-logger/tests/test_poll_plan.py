@@ -0,0 +1,90 @@
+import pytest
+
+from config_manager import ConfigError
+from poll_plan import compile_plan
+from register_map import MAX_COUNT, Point, legacy_points, parse_point, plan_reads, point_width
+
+
+def pt(name, function, address, dtype='u16'):
+    return Point(name, function, address, 'bool' if function in ('coils', 'discrete') else dtype, 1.0)
+
+
+def spans(blocks):
+    return [(b.function, b.address, b.count) for b in blocks]
+
+
+def assert_points_inside(blocks):
+    for b in blocks:
+        for _, off, p in b.points:
+            assert 0 <= off and off + point_width(p) <= b.count <= MAX_COUNT[b.function]
+
+
+def test_gap_within_max_gap_merges():
+    points = [pt('a', 'holding', 0), pt('b', 'holding', 9), pt('c', 'holding', 20)]
+    # celah 0->9 = 8 register kosong (end 1, gap 8) digabung; 10->20 tidak
+    assert spans(plan_reads(points, max_gap=8)) == [('holding', 0, 10), ('holding', 20, 1)]
+    assert spans(plan_reads(points, max_gap=7)) == [('holding', 0, 1), ('holding', 9, 1), ('holding', 20, 1)]
+
+
+def test_block_never_exceeds_protocol_limit():
+    regs = [pt(f'r{i}', 'holding', i * 2, 'float32') for i in range(200)]
+    bits = [pt(f'c{i}', 'coils', i) for i in range(4500)]
+    blocks = plan_reads(regs + bits, max_gap=125, max_gap_bits=2000)
+    assert all(b.count <= MAX_COUNT[b.function] for b in blocks)
+    assert sum(len(b.points) for b in blocks) == 4700
+    assert [b.count for b in blocks if b.function == 'coils'] == [2000, 2000, 500]
+    assert_points_inside(blocks)
+
+
+def test_coils_never_merged_with_registers():
+    points = [pt('h', 'holding', 0), pt('i', 'input', 1), pt('c', 'coils', 2), pt('d', 'discrete', 3)]
+    blocks = plan_reads(points, max_gap=100, max_gap_bits=100)
+    assert sorted(spans(blocks)) == [('coils', 2, 1), ('discrete', 3, 1), ('holding', 0, 1), ('input', 1, 1)]
+    for b in blocks:
+        assert {p.function for _, _, p in b.points} == {b.function}
+
+
+def test_point_crossing_block_boundary_starts_new_block():
+    points = [pt('a', 'holding', 0), pt('b', 'holding', 124, 'float32')]
+    blocks = plan_reads(points, max_gap=125)
+    # 0..126 = 126 register > 125: b tidak dipotong, pindah ke blok baru
+    assert spans(blocks) == [('holding', 0, 1), ('holding', 124, 2)]
+    assert_points_inside(blocks)
+
+
+def test_output_index_follows_config_order():
+    points = [pt('z', 'holding', 50), pt('a', 'holding', 10), pt('c', 'coils', 0)]
+    blocks = plan_reads(points)
+    index = {p.name: idx for b in blocks for idx, _, p in b.points}
+    assert index == {'z': 0, 'a': 1, 'c': 2}
+
+
+def test_block_decodes_members_at_their_offsets():
+    points = [parse_point('v', 'holding, 10, float32'), parse_point('e', 'holding, 13, u16, 0.1')]
+    (block,) = plan_reads(points)
+    regs = [0x3F80, 0x0000, 0, 250]
+    assert (block.address, block.count) == (10, 4)
+    assert block.decoder.decode(regs) == pytest.approx([1.0, 25.0])
+
+
+def test_legacy_points_reproduce_ch_layout():
+    cfg = {'function': 'holding', 'register': '1', 'quantity': '8', 'encoding': 'float32badc'}
+    assert legacy_points(cfg) == [Point(f'ch{i + 1}', 'holding', 1 + 2 * i, 'float32badc', 1.0)
+                                  for i in range(4)]
+    bits = legacy_points({'function': 'coils', 'register': '5', 'quantity': '3'})
+    assert [(p.name, p.address, p.dtype) for p in bits] == [('ch1', 5, 'bool'), ('ch2', 6, 'bool'), ('ch3', 7, 'bool')]
+
+    plan = compile_plan(dict(cfg, type='tcp'))
+    assert plan.columns == ('ch1', 'ch2', 'ch3', 'ch4')
+    assert plan.requests == (('holding', 1, 8, 1),)
+
+
+@pytest.mark.parametrize('spec', ['holding', 'bogus, 1', 'holding, 1, float16'])
+def test_parse_point_rejects_bad_spec(spec):
+    with pytest.raises(ValueError):
+        parse_point('p', spec)
+
+
+def test_compile_plan_reports_config_errors():
+    with pytest.raises(ConfigError):
+        compile_plan({'type': 'tcp', 'quantity': '1', 'encoding': 'float32'})
@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+from storage import columnar_logger, csv_index
+from storage.columnar_logger import ColumnarLogger
+from storage.csv_logger import CSVLogger
+
+
+@pytest.fixture
+def jakarta_tz(monkeypatch):
+    monkeypatch.setenv('TZ', 'Asia/Jakarta')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_csv_and_columnar_readers_share_wall_clock(jakarta_tz, tmp_path):
+    rows = [('2026-10-13 10:05:00', 1.0), ('2026-10-13 10:05:01', 2.0)]
+    csv_logger = CSVLogger(str(tmp_path / 'data.csv'))
+    col_logger = ColumnarLogger(str(tmp_path / 'col'), name='data')
+    for ts, v in rows:
+        entries = [{'sensor_name': 'a', 'value': v}]
+        csv_logger.log(ts, entries)
+        col_logger.log(ts, entries)
+    csv_logger.close()
+    col_logger.close()
+
+    start, end = '2026-10-13 10:00:00', '2026-10-13 10:10:00'
+    csv_times, csv_values = csv_index.read_range(str(tmp_path / 'data.csv'), start, end)
+    col_times, col_values = columnar_logger.read_range(str(tmp_path / 'col'), 'data', start, end)
+
+    # jam dinding yang tertulis di CSV, bukan UTC (03:05 di Asia/Jakarta)
+    assert [str(t) for t in col_times] == ['2026-10-13T10:05:00.000', '2026-10-13T10:05:01.000']
+    assert list(col_times) == list(csv_times)
+    assert list(col_values['a']) == list(csv_values['a']) == [1.0, 2.0]
@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+from register_decoder import BlockDecoder, TYPES, decode_values, encode_value, parse_encoding
+
+ORDERS = ('', 'be', 'le', 'abcd', 'dcba', 'cdab', 'badc')
+SAMPLES = {
+    'uint16': [0, 1, 0xABCD, 0xFFFF], 'int16': [-32768, -1, 0, 1234],
+    'uint32': [0, 0x12345678, 0xFFFFFFFF], 'int32': [-2 ** 31, -5, 70000],
+    'uint64': [0, 0x0102030405060708, 2 ** 64 - 1], 'int64': [-2 ** 63, -7, 2 ** 40],
+    'float32': [0.0, 1.0, -2.5, 1234.5], 'float64': [0.0, math.pi, -1e300],
+}
+
+
+@pytest.mark.parametrize('base', sorted(TYPES))
+@pytest.mark.parametrize('order', ORDERS)
+def test_round_trip_every_type_and_order(base, order):
+    enc = base + order
+    values = SAMPLES[base]
+    regs = [w for v in values for w in encode_value(v, enc)]
+    assert len(regs) == len(values) * parse_encoding(enc).width
+    assert decode_values(regs, enc) == values
+
+
+@pytest.mark.parametrize('enc, regs', [
+    ('float32', [0x3F80, 0x0000]),
+    ('float32abcd', [0x3F80, 0x0000]),
+    ('float32cdab', [0x0000, 0x3F80]),
+    ('float32badc', [0x803F, 0x0000]),
+    ('float32dcba', [0x0000, 0x803F]),
+    ('float32le', [0x0000, 0x803F]),
+    ('float32[CDAB]', [0x0000, 0x3F80]),
+])
+def test_word_and_byte_order_layout(enc, regs):
+    assert encode_value(1.0, enc) == regs
+    assert decode_values(regs, enc) == [1.0]
+
+
+def test_int16_byte_swap_only():
+    # register tunggal: word swap tidak berlaku, byte swap berlaku
+    assert encode_value(0x1234, 'u16cdab') == [0x1234]
+    assert encode_value(0x1234, 'u16badc') == [0x3412]
+
+
+def test_scale():
+    assert decode_values([100, 250], 'u16', 0.1) == pytest.approx([10.0, 25.0])
+    assert decode_values(encode_value(-3, 'int32cdab'), 'int32cdab', 2.0) == [-6.0]
+
+
+def test_mixed_block_layout_with_gaps():
+    regs = [0] * 10
+    regs[0:2] = encode_value(1.5, 'float32badc')
+    regs[3] = 0x8000
+    regs[4:6] = encode_value(70000, 'u32cdab')
+    regs[6:10] = encode_value(-9, 'i64le')
+    dec = BlockDecoder([(0, 'float32badc', 1.0), (3, 'int16', 1.0),
+                        (4, 'u32cdab', 0.5), (6, 'i64le', 1.0)])
+    assert dec.decode(regs) == [1.5, -32768, 35000.0, -9]
+
+
+def test_short_response_decodes_complete_points_only():
+    dec = BlockDecoder([(0, 'u16', 1.0), (1, 'float32', 1.0)])
+    assert dec.decode([7, 0x3F80]) == [7, None]
+
+
+def test_bits_block():
+    dec = BlockDecoder([(0, None, 1.0), (3, None, 1.0)], bits=True)
+    assert dec.decode([1, 0, 0, 0]) == [True, False]
+
+
+@pytest.mark.parametrize('name', ['float16', 'int32xy', 'bogus'])
+def test_unknown_encoding(name):
+    with pytest.raises(ValueError):
+        parse_encoding(name)
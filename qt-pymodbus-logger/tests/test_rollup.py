@@ -0,0 +1,55 @@
+from storage.rollup import RollupAggregator
+
+
+class ListSink:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def log(self, timestamp, data_list):
+        self.rows.append((timestamp, {d['sensor_name']: d['value'] for d in data_list}))
+
+    def close(self):
+        pass
+
+
+def feed(agg, samples):
+    for ts, v in samples:
+        agg.log(ts, [{'sensor_name': 'a', 'value': v}])
+
+
+def test_window_open_at_close_is_continued_not_duplicated(tmp_path):
+    rows = []
+    state = str(tmp_path / 'data_rollup.json')
+    agg = RollupAggregator({60: [ListSink(rows)]}, state_path=state)
+    feed(agg, [('2026-10-13 10:00:05', 4.0), ('2026-10-13 10:00:10', 1.0)])
+    agg.close()
+    # window setengah jalan tidak ditulis
+    assert rows == []
+
+    agg = RollupAggregator({60: [ListSink(rows)]}, state_path=state)
+    feed(agg, [('2026-10-13 10:00:40', 7.0), ('2026-10-13 10:01:00', 2.0)])
+    agg.close()
+
+    assert rows == [('2026-10-13 10:00:00',
+                     {'a_min': 1.0, 'a_max': 7.0, 'a_mean': 4.0, 'a_count': 3, 'a_last': 7.0})]
+
+
+def test_restored_window_is_emitted_when_next_sample_is_later(tmp_path):
+    rows = []
+    state = str(tmp_path / 'data_rollup.json')
+    agg = RollupAggregator({60: [ListSink(rows)]}, state_path=state)
+    feed(agg, [('2026-10-13 10:00:05', 4.0)])
+    agg.close()
+
+    agg = RollupAggregator({60: [ListSink(rows)]}, state_path=state)
+    feed(agg, [('2026-10-13 10:05:00', 9.0)])
+    assert [r[0] for r in rows] == ['2026-10-13 10:00:00']
+    assert rows[0][1]['a_count'] == 1
+
+
+def test_partial_window_dropped_without_state_path():
+    rows = []
+    agg = RollupAggregator({60: [ListSink(rows)]})
+    feed(agg, [('2026-10-13 10:00:05', 4.0)])
+    agg.close()
+    assert rows == []
@@ -0,0 +1,95 @@
+import threading
+
+import rtu_bus
+from rtu_bus import get_bus, serial_params, silent_interval
+
+
+class FakeClient:
+    def __init__(self, cfg):
+        self.cfg = cfg
+
+    def read_holding(self, address, count, unit=1):
+        return self.cfg['baudrate']
+
+
+class FakeConnection:
+    """Pengganti ConnectionManager: mencatat setting saat 'port dibuka'."""
+    opened = []
+
+    def __init__(self, cfg, **kwargs):
+        self.cfg = cfg
+        self.closed = False
+
+    def acquire(self):
+        FakeConnection.opened.append(self.cfg['baudrate'])
+        return FakeClient(self.cfg)
+
+    def invalidate(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def stats(self):
+        return {}
+
+
+def cfg(port, **kw):
+    return dict({'port': port, 'baudrate': '9600', 'parity': 'N', 'stopbits': '1'}, **kw)
+
+
+def test_serial_params_normalised():
+    assert serial_params({'baudrate': 9600, 'parity': 'n'}) == serial_params({'baudrate': '9600'})
+    assert serial_params({'baudrate': '19200'}) != serial_params({'baudrate': '9600'})
+
+
+def test_get_bus_shares_one_arbiter_per_port(monkeypatch):
+    monkeypatch.setattr(rtu_bus, 'ConnectionManager', FakeConnection)
+    a = get_bus(cfg('/dev/test-share')).connection()
+    b = get_bus(cfg('/dev/test-share', unit_id='2')).connection()
+    try:
+        assert a.arbiter is b.arbiter
+        assert a.arbiter.reconfigure(cfg('/dev/test-share')) is False
+    finally:
+        a.close()
+        b.close()
+    assert '/dev/test-share' not in rtu_bus._buses
+
+
+def test_changed_settings_reopen_shared_bus(monkeypatch):
+    monkeypatch.setattr(rtu_bus, 'ConnectionManager', FakeConnection)
+    FakeConnection.opened = []
+    held = get_bus(cfg('/dev/test-reopen')).connection()
+    bus = held.arbiter
+    try:
+        assert held.acquire().read_holding(0, 1) == '9600'
+        old_conn = bus.conn
+        # consumer lain masih memegang bus; hot reload minta baudrate baru
+        reloaded = get_bus(cfg('/dev/test-reopen', baudrate='19200', parity='E')).connection()
+        assert reloaded.arbiter is bus
+        assert reloaded.acquire().read_holding(0, 1) == '19200'
+        assert old_conn.closed
+        assert bus.t35 == silent_interval(19200, 8, 'E', 1)
+        # consumer lama ikut setting baru (satu bus, satu baudrate)
+        assert held.acquire().read_holding(0, 1) == '19200'
+        assert FakeConnection.opened == ['9600', '19200', '19200']
+        reloaded.close()
+    finally:
+        held.close()
+    assert not bus._thread
+
+
+def test_reconfigure_runs_before_queued_requests(monkeypatch):
+    monkeypatch.setattr(rtu_bus, 'ConnectionManager', FakeConnection)
+    bus = rtu_bus.RtuBusArbiter(cfg('/dev/test-order'))
+    gate = threading.Event()
+    bus.start()
+    try:
+        # thread bus ditahan, request berikut masih di antrian
+        bus._queue.put((-2, -1, gate.wait, (5,), None, None))
+        queued = bus.submit('read_holding', 0, 1)
+        bus.reconfigure(cfg('/dev/test-order', baudrate='38400'))
+        gate.set()
+        assert queued.result(5) == '38400'
+    finally:
+        bus.stop()
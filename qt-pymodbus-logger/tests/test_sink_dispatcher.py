@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+
+import pytest
+
+from storage.sink_dispatcher import SinkWriter
+
+
+class GatedSink:
+    """Sink yang tertahan sampai gate dibuka (mis. MySQL timeout)."""
+
+    def __init__(self):
+        self.rows = []
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+        self.closed = False
+
+    def log(self, timestamp, data_list):
+        self.entered.set()
+        self.gate.wait(5)
+        self.rows.append(timestamp)
+
+    def close(self):
+        self.closed = True
+
+
+def wait_for(cond, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cond()
+
+
+def stalled(tmp_path, overflow, maxsize=2):
+    sink = GatedSink()
+    w = SinkWriter(sink, 'dev-CSVLogger', maxsize, overflow, str(tmp_path))
+    w.start()
+    w.put(0, [{'value': 0}])
+    # baris pertama sudah diambil writer dan tertahan di sink
+    assert sink.entered.wait(5)
+    return sink, w
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        SinkWriter(GatedSink(), 'x', overflow='ignore')
+
+
+def test_block_waits_for_space_and_keeps_every_row(tmp_path):
+    sink, w = stalled(tmp_path, 'block')
+    w.put(1, [])
+    w.put(2, [])
+    t = threading.Thread(target=w.put, args=(3, []))
+    t.start()
+    t.join(0.2)
+    assert t.is_alive()
+    sink.gate.set()
+    t.join(5)
+    w.stop()
+    assert sink.rows == [0, 1, 2, 3]
+    assert w.stats()['dropped'] == 0
+    assert sink.closed
+
+
+def test_drop_oldest_keeps_newest_rows(tmp_path):
+    sink, w = stalled(tmp_path, 'drop_oldest')
+    for ts in range(1, 6):
+        w.put(ts, [])
+    assert w.stats()['dropped'] == 3
+    sink.gate.set()
+    w.stop()
+    assert sink.rows == [0, 4, 5]
+
+
+def test_spill_replays_in_order_after_sink_recovers(tmp_path):
+    sink, w = stalled(tmp_path, 'spill')
+    for ts in range(1, 10):
+        w.put(ts, [{'value': ts}])
+    st = w.stats()
+    assert (st['spilled'], st['depth']) == (7, 2)
+    with open(w.spill_path) as f:
+        assert [json.loads(line)[0] for line in f] == list(range(3, 10))
+
+    sink.gate.set()
+    wait_for(lambda: w.stats()['replayed'] == 7)
+    # spill sudah habis: baris baru kembali lewat antrian
+    w.put(10, [])
+    w.stop()
+    assert sink.rows == list(range(11))
+    assert not (tmp_path / 'dev-CSVLogger.spill.jsonl').exists()
+    assert not (tmp_path / 'dev-CSVLogger.spill.jsonl.replay').exists()
+
+
+def test_spill_left_by_previous_run_goes_first(tmp_path):
+    with open(tmp_path / 'dev-CSVLogger.spill.jsonl', 'w') as f:
+        for ts in (1, 2):
+            f.write(json.dumps([ts, []]) + '\n')
+    sink = GatedSink()
+    sink.gate.set()
+    w = SinkWriter(sink, 'dev-CSVLogger', 10, 'spill', str(tmp_path))
+    w.start()
+    w.put(3, [])
+    w.stop()
+    assert sink.rows == [1, 2, 3]
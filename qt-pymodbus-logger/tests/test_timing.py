@@ -0,0 +1,88 @@
+import pytest
+
+from timing import FixedRateTimer
+
+
+class FakeClock:
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class FakeEvent:
+    """stop_event palsu: wait(d) memajukan jam palsu, tidak tidur sungguhan."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.waits = []
+
+    def wait(self, d):
+        self.waits.append(round(d, 6))
+        self.clock.t += d
+        return False
+
+    def is_set(self):
+        return False
+
+
+@pytest.mark.parametrize('overrun', ['late', 'skip'])
+def test_first_wait_is_not_an_overrun(overrun):
+    clock = FakeClock()
+    timer = FixedRateTimer(1.0, align=False, overrun=overrun, clock=clock)
+    ev = FakeEvent(clock)
+    # connect / setup sebelum loop poll
+    clock.t = 5.0
+    assert timer.wait(ev)
+    assert (timer.overruns, timer.skipped, ev.waits) == (0, 0, [])
+    assert timer.lateness.max == 0.0
+    # slot berikutnya dihitung dari poll pertama
+    assert timer.next_due == 6.0
+
+
+def run(overrun):
+    clock = FakeClock()
+    timer = FixedRateTimer(1.0, align=False, overrun=overrun, clock=clock)
+    ev = FakeEvent(clock)
+    starts = []
+    for poll_s in (0.3, 2.5, 0.2, 0.2):
+        assert timer.wait(ev)
+        starts.append(round(clock.t, 6))
+        clock.t += poll_s
+    return timer, starts
+
+
+def test_late_policy_runs_once_immediately_then_keeps_grid():
+    timer, starts = run('late')
+    # poll 1.0 .. 3.5 melewati slot 2 dan 3: jalan sekali segera, lalu kembali ke kisi
+    assert starts == [0.0, 1.0, 3.5, 4.0]
+    assert (timer.overruns, timer.skipped) == (1, 1)
+    assert timer.lateness.max == pytest.approx(500.0)
+
+
+def test_skip_policy_waits_for_next_future_slot():
+    timer, starts = run('skip')
+    assert starts == [0.0, 1.0, 4.0, 5.0]
+    assert (timer.overruns, timer.skipped) == (1, 2)
+    assert timer.lateness.max == 0.0
+
+
+def test_poll_within_interval_is_not_overrun():
+    clock = FakeClock(100.0)
+    timer = FixedRateTimer(0.5, align=False, clock=clock)
+    timer.begin()
+    assert timer.check_overrun(now=100.5) is False
+    assert timer.check_overrun(now=100.51) is True
+
+
+def test_aligned_first_slot_skips_slots_missed_during_setup():
+    clock = FakeClock(1000.0)
+    timer = FixedRateTimer(1.0, align=True, clock=clock)
+    first = timer.next_due
+    assert 1000.0 <= first < 1001.0
+    slot = timer.begin(now=first + 3.25)
+    # tetap di kisi jam dinding, hanya terlambat di dalam slot sekarang
+    assert slot == first + 3.0
+    assert timer.overruns == 0
+    assert timer.lateness.max == pytest.approx(250.0)
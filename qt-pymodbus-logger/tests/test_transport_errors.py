@@ -0,0 +1,62 @@
+import pytest
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from modbus_worker import ModbusPoller
+from rtu_bus import RtuBusArbiter
+
+
+class FakeClient:
+    def __init__(self, exc):
+        self.exc = exc
+
+    def read_holding(self, address, count, unit=1):
+        raise self.exc
+
+
+class FakeConnection:
+    def __init__(self, exc):
+        self.client = FakeClient(exc)
+        self.invalidated = 0
+
+    def acquire(self):
+        return self.client
+
+    def invalidate(self):
+        self.invalidated += 1
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+CASES = [
+    (ModbusIOException('no response'), 0),
+    (ConnectionException('closed'), 1),
+    (ConnectionResetError('reset'), 1),
+    (OSError('serial port gone'), 1),
+]
+
+
+@pytest.mark.parametrize('exc, invalidated', CASES)
+def test_poller_invalidates_shared_connection_only_on_transport_error(exc, invalidated):
+    conn = FakeConnection(exc)
+    poller = ModbusPoller({'name': 'dev', 'type': 'tcp', 'register': '0', 'quantity': '2'}, conn=conn)
+    with pytest.raises(type(exc)):
+        poller.run_once()
+    assert conn.invalidated == invalidated
+
+
+@pytest.mark.parametrize('exc, invalidated', CASES)
+def test_rtu_bus_reopens_port_only_on_transport_error(exc, invalidated):
+    bus = RtuBusArbiter({'port': '/dev/null-test', 'baudrate': '115200'})
+    bus.conn = FakeConnection(exc)
+    bus.start()
+    try:
+        with pytest.raises(type(exc)):
+            bus.call('read_holding', 0, 2, unit=1)
+        assert bus.errors == 1
+    finally:
+        bus.stop()
+    assert bus.conn.invalidated == invalidated
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from bisect import bisect_left
+
+# batas bucket histogram dalam milidetik
+DEFAULT_BOUNDS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Histogram:
+    def __init__(self, bounds_ms=DEFAULT_BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1000.0
+        # indeks bucket pertama dengan batas >= ms
+        self.counts[bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def as_dict(self):
+        labels = [f'<={b}ms' for b in self.bounds_ms] + [f'>{self.bounds_ms[-1]}ms']
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'max_ms': self.max,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class FixedRateTimer:
+    """
+    Jadwal poll dengan laju tetap berbasis time.monotonic().
+    Slot berikutnya = slot sebelumnya + interval (bukan selesai poll + interval),
+    sehingga periode tidak bergeser walau poll memakan waktu.
+
+    align=True: slot pertama jatuh di kelipatan interval jam dinding
+    (contoh interval 1s -> tepat tiap detik).
+    overrun: bila poll melewati slot berikutnya
+        'late' -> jalankan segera sekali, slot lain yang terlewat dibuang
+        'skip' -> tunggu slot berikutnya di masa depan
+    Slot yang terlewat tidak pernah ditumpuk.
+    """
+
+    def __init__(self, interval_s, align=True, overrun='late', clock=time.monotonic):
+        self.interval = max(0.001, float(interval_s))
+        self.overrun_policy = overrun
+        self.align = align
+        # clock bisa diganti (test); default time.monotonic
+        self.clock = clock
+        now = clock()
+        if align:
+            phase = time.time() % self.interval
+            self.next_due = now + (self.interval - phase) % self.interval
+        else:
+            self.next_due = now
+
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.lateness = Histogram()
+        self.jitter = Histogram()
+        self._last_start = None
+
+    def set_interval(self, interval_s):
+        self.interval = max(0.001, float(interval_s))
+
+    def check_overrun(self, now=None):
+        """Panggil setelah poll selesai; geser slot bila poll kebablasan."""
+        if self._last_start is None:
+            # belum ada poll: slot pertama ditetapkan begin()
+            return False
+        now = self.clock() if now is None else now
+        if now <= self.next_due:
+            return False
+        self.overruns += 1
+        missed = int((now - self.next_due) // self.interval)
+        if self.overrun_policy == 'skip':
+            missed += 1
+        self.skipped += missed
+        self.next_due += missed * self.interval
+        return True
+
+    def delay(self, now=None):
+        now = self.clock() if now is None else now
+        return max(0.0, self.next_due - now)
+
+    def begin(self, now=None):
+        """Tandai awal poll untuk slot sekarang dan majukan ke slot berikutnya."""
+        now = self.clock() if now is None else now
+        if self._last_start is None:
+            # poll pertama: jadwal dihitung dari sini, bukan dari saat timer
+            # dibuat (connect / setup sebelum loop tidak dihitung terlambat)
+            if not self.align:
+                self.next_due = now
+            elif now - self.next_due >= self.interval:
+                # tetap di kisi jam dinding, slot yang sudah lewat dilompati
+                self.next_due += (now - self.next_due) // self.interval * self.interval
+        self.lateness.add(max(0.0, now - self.next_due))
+        if self._last_start is not None:
+            self.jitter.add(abs((now - self._last_start) - self.interval))
+        self._last_start = now
+        self.ticks += 1
+        slot = self.next_due
+        self.next_due += self.interval
+        return slot
+
+    def wait(self, stop_event=None):
+        """Tidur sampai slot berikutnya. False bila stop_event di-set."""
+        self.check_overrun()
+        d = self.delay()
+        if d > 0:
+            if stop_event is not None:
+                if stop_event.wait(d):
+                    return False
+            else:
+                time.sleep(d)
+        elif stop_event is not None and stop_event.is_set():
+            return False
+        self.begin()
+        return True
+
+    async def wait_async(self, stop_event=None):
+        """Versi asyncio dari wait(); stop_event berupa asyncio.Event."""
+        self.check_overrun()
+        d = self.delay()
+        if stop_event is not None:
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=d)
+                return False
+            except asyncio.TimeoutError:
+                pass
+        elif d > 0:
+            await asyncio.sleep(d)
+        self.begin()
+        return True
+
+    def stats(self):
+        return {
+            'interval_s': self.interval,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'lateness': self.lateness.as_dict(),
+            'jitter': self.jitter.as_dict(),
+        }
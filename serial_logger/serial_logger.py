@@ -4,6 +4,18 @@ from PyQt5.QtWidgets import QApplication, QWidget, QFileDialog, QMessageBox
 from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtGui import QTextCursor
 
+# RotatingFile dipakai bersama qt-pymodbus-logger (storage/rotating_file.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'qt-pymodbus-logger'))
+from storage.rotating_file import RotatingFile
+
+# segmen log (opt-in): rotasi none/hourly/daily + batas ukuran (0 = tidak),
+# kompresi none/gzip/zstd, segmen lama dihapus setelah KEEP_DAYS hari (0 = simpan semua).
+# Default: satu file sesuai nama yang dipilih, tidak ada yang dihapus.
+ROTATE = "none"
+MAX_BYTES = 0
+COMPRESS = "none"
+KEEP_DAYS = 0
+
 
 # ---------- Thread pembaca serial ----------
 class SerialReader(QThread):
@@ -42,6 +54,7 @@ class SerialLogger(QWidget):
         self.reader = None
         self.logging = False
         self.logfile = None
+        self.segment = None
         self.writer = None
         self.max_lines = 100
         self.lines = []
@@ -107,7 +120,8 @@ class SerialLogger(QWidget):
             return
         try:
             os.makedirs(os.path.dirname(filename), exist_ok=True)
-            self.logfile = open(filename, "a", newline="")
+            self.segment = RotatingFile(filename, ROTATE, MAX_BYTES, COMPRESS, keep_days=KEEP_DAYS)
+            self.logfile = self.segment.open()
             self.writer = csv.writer(self.logfile)
             self.logging = True
             self.startBtn.setText("Stop Logging")
@@ -117,7 +131,8 @@ class SerialLogger(QWidget):
 
     def stop_logging(self):
         if self.logfile:
-            self.logfile.close()
+            self.segment.close()
+            self.logfile = None
         self.logging = False
         self.startBtn.setText("Start Logging")
         self.append_text("[Logging stopped]")
@@ -131,8 +146,14 @@ class SerialLogger(QWidget):
         self.text.setPlainText("\n".join(self.lines))
         self.text.moveCursor(QTextCursor.End)
         if self.logging and self.writer:
+            if self.segment.due():
+                self.logfile = self.segment.rotate_now()
+                self.writer = csv.writer(self.logfile)
             self.writer.writerow([timestamp, line])
             self.logfile.flush()
+            if self.segment.over_size():
+                self.logfile = self.segment.rotate_now()
+                self.writer = csv.writer(self.logfile)
             self.append_text(f"[Wrote to CSV] {line}", debug=True)
 
     def append_text(self, text, debug=False):
@@ -153,7 +174,7 @@ class SerialLogger(QWidget):
             self.reader.stop()
             self.reader.wait()
         if self.logging and self.logfile:
-            self.logfile.close()
+            self.segment.close()
         event.accept()
 
 